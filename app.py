@@ -1,19 +1,38 @@
 import os
-from flask import Flask, render_template, request, redirect, url_for, jsonify, session, flash
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
+import threading
+from flask import Flask, Response, g, render_template, request, redirect, url_for, jsonify, session, flash, stream_with_context
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt, get_jwt_identity
 from datetime import datetime, timedelta
 import sqlite3
 import json
-import requests
-from init_db import init_db, get_db
+from init_db import init_db, init_app, get_db
 
 from models.user import User
 from models.internship import Internship
 from models.application import Application
 from services.recommendation_engine import RecommendationEngine
-from services.external_api import fetch_external_internships
-from utils.helpers import allowed_file, save_file
+from services.ingestion import IngestionWorker
+from services.lifecycle import DEFAULT_ARCHIVE_INTERVAL, ArchiveWorker
+from services.features import user_feature_values
+from services.profile_cache import profile_cache
+from services.catalog import ListingQuery, row_to_dict
+from services import application_stats, recommendation_store, search, startup
+from services.batch_recommendations import (
+    MAX_BATCH_USERS,
+    BatchRecommender,
+    format_recommendation,
+    iter_ndjson as iter_batch_recommendations,
+)
+from services.write_queue import WRITE_DURABLE, WriteTimeout, write_queue
+from services.passwords import (
+    HashQueueFull,
+    login_email_limiter,
+    login_ip_limiter,
+    password_hasher,
+)
+from utils.helpers import MAX_RESUME_SIZE, FileTooLarge, allowed_file, save_file
+from utils import metrics
+from utils.http_cache import catalog_cached, catalog_state
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -21,16 +40,82 @@ app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev_key_for_testing')
 app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt_dev_key')
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
 app.config['UPLOAD_FOLDER'] = 'static/uploads'
+# Reject oversized request bodies from Content-Length before reading them
+app.config['MAX_CONTENT_LENGTH'] = MAX_RESUME_SIZE + 256 * 1024
+# User ids allowed to call /api/recommendations/batch (comma-separated)
+app.config['BATCH_API_USERS'] = {
+    user_id.strip() for user_id in os.environ.get('BATCH_API_USERS', '').split(',') if user_id.strip()
+}
 
 # Initialize JWT
 jwt = JWTManager(app)
 
+# Request/query instrumentation and the /metrics endpoint
+metrics.init_app(app)
+
 # Initialize database
-with app.app_context():
-    init_db()
+init_app(app)
+if startup.INIT_DB_ON_START:
+    with app.app_context():
+        init_db()
+
+# Initialize recommendation engine; under gunicorn --preload the index (or
+# the mapped catalog snapshot) is built once in the master and shared with
+# the workers
+catalog_snapshots = None
+if startup.CATALOG_SNAPSHOT:
+    from services.catalog_snapshot import SnapshotStore
+
+    catalog_snapshots = SnapshotStore()
+recommendation_engine = RecommendationEngine(snapshots=catalog_snapshots)
+batch_recommender = BatchRecommender(recommendation_engine)
+startup.preload(recommendation_engine)
+
+# Periodically ingest external internships into the database
+# (set EXTERNAL_SYNC_INTERVAL to 0 to disable)
+sync_interval = int(os.environ.get('EXTERNAL_SYNC_INTERVAL', '900'))
+ingestion_worker = None
+
+# Periodically move internships past their deadline into internships_archive
+# (set ARCHIVE_INTERVAL to 0 to disable)
+archive_interval = int(os.environ.get('ARCHIVE_INTERVAL', str(DEFAULT_ARCHIVE_INTERVAL)))
+archive_worker = None
+
+def start_background_tasks():
+    """Start the sync and archive threads in the elected process.
+
+    Threads do not survive a fork, so a preloaded app calls this from each
+    worker (see gunicorn.conf.py); only the one holding the background
+    lock starts them.
+    """
+    global ingestion_worker, archive_worker
+    if not startup.elect_leader():
+        return
+    if sync_interval > 0 and ingestion_worker is None:
+        ingestion_worker = IngestionWorker(interval=sync_interval, engine=recommendation_engine)
+        ingestion_worker.start()
+    if archive_interval > 0 and archive_worker is None:
+        archive_worker = ArchiveWorker(interval=archive_interval, engine=recommendation_engine)
+        archive_worker.start()
+
+if not startup.PRELOADED:
+    start_background_tasks()
+    startup.mark_ready()
+
+def issue_access_token(user):
+    # `pv` lets API requests detect a cached profile older than the token
+    return create_access_token(
+        identity=str(user['id']),
+        additional_claims={'pv': user['profile_version']}
+    )
 
-# Initialize recommendation engine
-recommendation_engine = RecommendationEngine()
+def session_user():
+    """The logged-in user's profile, from the profile cache when current."""
+    return profile_cache.get(get_db(), session['user_id'], session.get('profile_version', 0))
+
+def jwt_user():
+    """The token user's profile, from the profile cache when current."""
+    return profile_cache.get(get_db(), get_jwt_identity(), get_jwt().get('pv', 0))
 
 # Routes
 @app.route('/')
@@ -53,8 +138,14 @@ def register():
             flash('Email already registered', 'error')
             return render_template('auth/register.html')
 
+        # Hashing runs in the worker pool; shed load when it is saturated
+        try:
+            hashed_password = password_hasher.hash(password)
+        except HashQueueFull:
+            flash('The server is busy, please try again in a moment', 'error')
+            return render_template('auth/register.html'), 503
+
         # Create new user
-        hashed_password = generate_password_hash(password)
         db.execute(
             'INSERT INTO users (username, email, password) VALUES (?, ?, ?)',
             (username, email, hashed_password)
@@ -72,14 +163,34 @@ def login():
         email = request.form.get('email')
         password = request.form.get('password')
 
+        # Throttle before doing any expensive work
+        if not login_ip_limiter.allow(request.remote_addr) or \
+                not login_email_limiter.allow((email or '').lower()):
+            flash('Too many login attempts, please wait a minute and try again', 'error')
+            return render_template('auth/login.html'), 429
+
         db = get_db()
         user = db.execute('SELECT * FROM users WHERE email = ?', (email,)).fetchone()
 
-        if user and check_password_hash(user['password'], password):
+        try:
+            valid = bool(user) and password_hasher.verify(user['password'], password)
+            # Upgrade hashes made with an older method or cost
+            if valid and password_hasher.needs_rehash(user['password']):
+                db.execute(
+                    'UPDATE users SET password = ? WHERE id = ?',
+                    (password_hasher.hash(password), user['id'])
+                )
+                db.commit()
+        except HashQueueFull:
+            flash('The server is busy, please try again in a moment', 'error')
+            return render_template('auth/login.html'), 503
+
+        if valid:
             # Create access token
-            access_token = create_access_token(identity=user['id'])
+            access_token = issue_access_token(user)
             session['user_id'] = user['id']
             session['username'] = user['username']
+            session['profile_version'] = user['profile_version']
             session['access_token'] = access_token
 
             return redirect(url_for('dashboard'))
@@ -111,6 +222,60 @@ def forgot_password():
 
     return render_template('auth/forgot_password.html')
 
+# Write intents, run by the write queue on its own connection
+def _update_profile(db, user_id, education, skills, interests, location, resume_path):
+    if resume_path:
+        db.execute('UPDATE users SET resume_path = ? WHERE id = ?', (resume_path, user_id))
+    db.execute(
+        '''UPDATE users SET
+           education = ?,
+           skills = ?,
+           interests = ?,
+           location = ?,
+           skill_tokens = ?,
+           interest_tokens = ?,
+           education_tokens = ?,
+           latitude = ?,
+           longitude = ?,
+           profile_version = profile_version + 1
+           WHERE id = ?''',
+        (education, skills, interests, location)
+        + user_feature_values(skills, interests, education, location)
+        + (user_id,)
+    )
+    recommendation_store.invalidate_user(db, user_id)
+
+def _insert_application(db, user_id, internship_id, cover_letter, resume_path, applied_date):
+    # The unique index rejects duplicates, and only the writer inserts
+    cursor = db.execute(
+        'INSERT INTO applications (user_id, internship_id, cover_letter, resume_path, status, applied_date) VALUES (?, ?, ?, ?, ?, ?)',
+        (user_id, internship_id, cover_letter, resume_path, 'Applied', applied_date)
+    )
+    application_stats.record_application(db, cursor.lastrowid)
+    return cursor.lastrowid
+
+# Applications reported as received (WRITE_DURABLE=0) whose batch then
+# failed to commit, per user; the user's next page in this process says so
+_lost_applications = {}
+_lost_applications_lock = threading.Lock()
+
+def _application_lost(user_id, title):
+    def on_failure(error):
+        print(f"Application of user {user_id} to {title!r} was not saved: {error}")
+        with _lost_applications_lock:
+            _lost_applications.setdefault(user_id, []).append(title)
+    return on_failure
+
+@app.before_request
+def _report_lost_applications():
+    user_id = session.get('user_id')
+    if user_id is None or not _lost_applications:
+        return
+    with _lost_applications_lock:
+        titles = _lost_applications.pop(user_id, [])
+    for title in titles:
+        flash(f'Your application for {title} could not be saved. Please apply again.', 'error')
+
 # User profile routes
 @app.route('/profile', methods=['GET', 'POST'])
 def profile():
@@ -126,75 +291,81 @@ def profile():
         skills = request.form.get('skills')
         interests = request.form.get('interests')
         location = request.form.get('location')
+        resume = request.files.get('resume')
 
-        db.execute(
-            '''UPDATE users SET
-               education = ?,
-               skills = ?,
-               interests = ?,
-               location = ?
-               WHERE id = ?''',
-            (education, skills, interests, location, user_id)
-        )
-        db.commit()
+        resume_path = None
+        if resume and allowed_file(resume.filename):
+            try:
+                resume_path = save_file(resume, app.config['UPLOAD_FOLDER'])
+            except FileTooLarge:
+                flash('Resume must be smaller than 5 MB', 'error')
+                return redirect(url_for('profile'))
+
+        try:
+            write_queue.write(
+                _update_profile, user_id, education, skills, interests, location, resume_path
+            )
+        except (WriteTimeout, sqlite3.OperationalError):
+            flash('Your profile could not be saved right now. Please try again.', 'error')
+            return redirect(url_for('profile'))
+
+        profile_cache.invalidate(user_id)
+        user = profile_cache.get(db, user_id)
+        session['profile_version'] = user['profile_version']
+        session['access_token'] = issue_access_token(user)
 
         flash('Profile updated successfully', 'success')
         return redirect(url_for('profile'))
 
     # Get user profile data
-    user = db.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+    user = session_user()
 
     return render_template('profile/profile.html', user=user)
 
 # Internship routes
 @app.route('/internships')
+@catalog_cached(vary=lambda: session.get('user_id'))
 def internships():
     if 'user_id' not in session:
         return redirect(url_for('login'))
 
-    db = get_db()
-    local_internships = db.execute('SELECT * FROM internships').fetchall()
-
-    # Get external internships (in a real app, implement caching)
     try:
-        external_internships = fetch_external_internships()
-    except Exception as e:
-        external_internships = []
-        print(f"Error fetching external internships: {e}")
-
-    all_internships = list(local_internships) + external_internships
+        query = ListingQuery.from_args(request.args)
+    except ValueError as e:
+        flash(str(e), 'error')
+        # Don't replay the flash message from the response cache
+        g.skip_response_cache = True
+        query = ListingQuery()
+    query.fields = ('*',)
+
+    # External listings are ingested into the table by the sync worker
+    db = get_db()
+    all_internships, next_cursor = query.page(db)
 
-    return render_template('internships/list.html', internships=all_internships)
+    return render_template(
+        'internships/list.html',
+        internships=all_internships,
+        next_cursor=next_cursor
+    )
 
 @app.route('/internships/recommendations')
 def recommendations():
     if 'user_id' not in session:
         return redirect(url_for('login'))
 
-    user_id = session['user_id']
-    db = get_db()
-    user = db.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+    user = session_user()
 
     if not user['skills'] or not user['interests']:
         flash('Please complete your profile to get recommendations', 'warning')
         return redirect(url_for('profile'))
 
-    # Get all internships
-    local_internships = db.execute('SELECT * FROM internships').fetchall()
-
-    try:
-        external_internships = fetch_external_internships()
-    except Exception as e:
-        external_internships = []
-        print(f"Error fetching external internships: {e}")
-
-    all_internships = list(local_internships) + external_internships
-
-    # Get recommendations
-    recommended_internships = recommendation_engine.get_recommendations(
+    # Served from user_recommendations unless the profile or catalog changed
+    recommended_internships = recommendation_store.get_recommendations(
+        get_db(),
+        recommendation_engine,
         user,
-        all_internships,
-        limit=5
+        limit=5,
+        catalog_version=catalog_state.get()[0]
     )
 
     return render_template(
@@ -208,7 +379,8 @@ def internship_detail(internship_id):
         return redirect(url_for('login'))
 
     db = get_db()
-    internship = db.execute('SELECT * FROM internships WHERE id = ?', (internship_id,)).fetchone()
+    # Archived internships stay reachable from the applications that link to them
+    internship = db.execute('SELECT * FROM all_internships WHERE id = ?', (internship_id,)).fetchone()
 
     if not internship:
         flash('Internship not found', 'error')
@@ -225,12 +397,16 @@ def apply_internship(internship_id):
     db = get_db()
 
     # Check if internship exists
-    internship = db.execute('SELECT * FROM internships WHERE id = ?', (internship_id,)).fetchone()
+    internship = db.execute('SELECT * FROM all_internships WHERE id = ?', (internship_id,)).fetchone()
 
     if not internship:
         flash('Internship not found', 'error')
         return redirect(url_for('internships'))
 
+    if internship['archived'] or internship['deadline_date'] < datetime.now().strftime('%Y-%m-%d'):
+        flash('This internship is no longer accepting applications', 'warning')
+        return redirect(url_for('internship_detail', internship_id=internship_id))
+
     # Check if already applied
     existing_application = db.execute(
         'SELECT * FROM applications WHERE user_id = ? AND internship_id = ?',
@@ -246,19 +422,36 @@ def apply_internship(internship_id):
         cover_letter = request.form.get('cover_letter')
         resume = request.files.get('resume')
 
-        # Save resume if provided
+        # Save resume if provided (content-addressed, so duplicates are stored once)
         resume_path = None
         if resume and allowed_file(resume.filename):
-            resume_path = save_file(resume, app.config['UPLOAD_FOLDER'])
-
-        # Create application
-        db.execute(
-            'INSERT INTO applications (user_id, internship_id, cover_letter, resume_path, status, applied_date) VALUES (?, ?, ?, ?, ?, ?)',
-            (user_id, internship_id, cover_letter, resume_path, 'Applied', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-        )
-        db.commit()
-
-        flash('Application submitted successfully', 'success')
+            try:
+                resume_path = save_file(resume, app.config['UPLOAD_FOLDER'])
+            except FileTooLarge:
+                flash('Resume must be smaller than 5 MB', 'error')
+                return redirect(url_for('apply_internship', internship_id=internship_id))
+
+        # Create application; the unique index rejects concurrent duplicates
+        # With WRITE_DURABLE=0 this returns before the commit; a commit that
+        # then fails is reported on the user's next page
+        try:
+            write_queue.write(
+                _insert_application, user_id, internship_id, cover_letter, resume_path,
+                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                durable=WRITE_DURABLE,
+                on_failure=_application_lost(user_id, internship['title'])
+            )
+        except sqlite3.IntegrityError:
+            flash('You have already applied for this internship', 'warning')
+            return redirect(url_for('my_applications'))
+        except (WriteTimeout, sqlite3.OperationalError):
+            flash('Your application could not be saved right now. Please try again.', 'error')
+            return redirect(url_for('apply_internship', internship_id=internship_id))
+
+        if WRITE_DURABLE:
+            flash('Application submitted successfully', 'success')
+        else:
+            flash('Application received; it will appear in My Applications shortly', 'success')
         return redirect(url_for('my_applications'))
 
     return render_template('internships/apply.html', internship=internship)
@@ -274,13 +467,14 @@ def my_applications():
     applications = db.execute(
         '''SELECT a.*, i.title, i.company
            FROM applications a
-           JOIN internships i ON a.internship_id = i.id
+           JOIN all_internships i ON a.internship_id = i.id
            WHERE a.user_id = ?
            ORDER BY a.applied_date DESC''',
         (user_id,)
     ).fetchall()
+    stats, _ = application_stats.get_stats(db, user_id)
 
-    return render_template('internships/applications.html', applications=applications)
+    return render_template('internships/applications.html', applications=applications, stats=stats)
 
 # Dashboard route
 @app.route('/dashboard')
@@ -291,30 +485,10 @@ def dashboard():
     user_id = session['user_id']
     db = get_db()
 
-    user = db.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
-
-    # Get application statistics
-    application_stats = db.execute(
-        '''SELECT status, COUNT(*) as count
-           FROM applications
-           WHERE user_id = ?
-           GROUP BY status''',
-        (user_id,)
-    ).fetchall()
+    user = session_user()
 
-    # Convert to dictionary for easier access in template
-    stats = {row['status']: row['count'] for row in application_stats}
-
-    # Get recent applications
-    recent_applications = db.execute(
-        '''SELECT a.*, i.title, i.company
-           FROM applications a
-           JOIN internships i ON a.internship_id = i.id
-           WHERE a.user_id = ?
-           ORDER BY a.applied_date DESC
-           LIMIT 5''',
-        (user_id,)
-    ).fetchall()
+    # Counters and recent applications are maintained on write
+    stats, recent_applications = application_stats.get_stats(db, user_id)
 
     # Check if profile is complete
     profile_complete = all([
@@ -335,79 +509,118 @@ def dashboard():
 # API routes
 @app.route('/api/internships')
 @jwt_required()
+@catalog_cached()
 def api_internships():
+    try:
+        query = ListingQuery.from_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     db = get_db()
-    internships = db.execute('SELECT * FROM internships').fetchall()
 
-    # Convert to list of dicts
-    result = []
-    for internship in internships:
-        result.append({
-            'id': internship['id'],
-            'title': internship['title'],
-            'company': internship['company'],
-            'location': internship['location'],
-            'description': internship['description'],
-            'requirements': internship['requirements'],
-            'stipend': internship['stipend'],
-            'duration': internship['duration'],
-            'deadline': internship['deadline']
-        })
+    # Stream the whole result set as NDJSON in constant memory
+    if request.args.get('format') == 'ndjson':
+        return Response(
+            stream_with_context(query.iter_ndjson(db)),
+            mimetype='application/x-ndjson'
+        )
 
-    return jsonify(result)
+    internships, next_cursor = query.page(db)
+    response = jsonify([row_to_dict(internship, query.fields) for internship in internships])
+
+    if next_cursor is not None:
+        args = request.args.to_dict()
+        args['after'] = next_cursor
+        response.headers['X-Next-Cursor'] = str(next_cursor)
+        response.headers['Link'] = '<{}>; rel="next"'.format(url_for('api_internships', **args))
+
+    return response
+
+@app.route('/api/internships/search')
+@jwt_required()
+def api_search_internships():
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({'error': 'Missing search query'}), 400
+
+    limit = request.args.get('limit', search.DEFAULT_PAGE_SIZE, type=int) or search.DEFAULT_PAGE_SIZE
+    limit = min(max(limit, 1), search.MAX_PAGE_SIZE)
+    page = max(request.args.get('page', 1, type=int) or 1, 1)
+
+    # Fetch one extra row to know whether another page exists
+    rows = search.search_internships(get_db(), q, limit=limit + 1, offset=(page - 1) * limit)
+
+    results = []
+    for row in rows[:limit]:
+        result = row_to_dict(row)
+        result['title_highlight'] = search.render_highlight(row['title_highlight'])
+        result['snippet'] = search.render_highlight(row['snippet'])
+        result['rank'] = row['rank']
+        results.append(result)
+
+    return jsonify({
+        'query': q,
+        'page': page,
+        'next_page': page + 1 if len(rows) > limit else None,
+        'results': results
+    })
 
 @app.route('/api/recommendations')
 @jwt_required()
 def api_recommendations():
-    user_id = get_jwt_identity()
-    db = get_db()
-    user = db.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+    user = jwt_user()
 
     if not user:
         return jsonify({'error': 'User not found'}), 404
 
-    # Get all internships
-    local_internships = db.execute('SELECT * FROM internships').fetchall()
-
-    try:
-        external_internships = fetch_external_internships()
-    except Exception as e:
-        external_internships = []
-        print(f"Error fetching external internships: {e}")
-
-    all_internships = list(local_internships) + external_internships
-
-    # Get recommendations
-    recommended_internships = recommendation_engine.get_recommendations(
+    # Served from user_recommendations unless the profile or catalog changed
+    recommended_internships = recommendation_store.get_recommendations(
+        get_db(),
+        recommendation_engine,
         user,
-        all_internships,
-        limit=5
+        limit=5,
+        catalog_version=catalog_state.get()[0]
     )
 
     # Convert to list of dicts
-    result = []
-    for internship, score in recommended_internships:
-        result.append({
-            'id': internship['id'],
-            'title': internship['title'],
-            'company': internship['company'],
-            'location': internship['location'],
-            'description': internship['description'],
-            'requirements': internship['requirements'],
-            'stipend': internship['stipend'],
-            'duration': internship['duration'],
-            'deadline': internship['deadline'],
-            'match_score': score,
-            'match_reason': internship.get('match_reason', 'Good match based on your profile')
-        })
+    result = [format_recommendation(internship, score)
+              for internship, score in recommended_internships]
 
     return jsonify(result)
 
+@app.route('/api/recommendations/batch', methods=['POST'])
+@jwt_required()
+def api_recommendations_batch():
+    if str(get_jwt_identity()) not in app.config['BATCH_API_USERS']:
+        return jsonify({'error': 'Not allowed to request batch recommendations'}), 403
+
+    data = request.get_json(silent=True) or {}
+    user_ids = data.get('user_ids')
+    if not isinstance(user_ids, list) or not all(isinstance(i, int) for i in user_ids):
+        return jsonify({'error': 'user_ids must be a list of integers'}), 400
+    if len(user_ids) > MAX_BATCH_USERS:
+        return jsonify({'error': f'At most {MAX_BATCH_USERS} user ids per call'}), 400
+
+    limit = data.get('limit', 5)
+    if not isinstance(limit, int) or not 1 <= limit <= 50:
+        return jsonify({'error': 'limit must be between 1 and 50'}), 400
+
+    # One line per user, streamed as soon as each chunk is scored
+    return Response(
+        stream_with_context(iter_batch_recommendations(batch_recommender, get_db(), user_ids, limit)),
+        mimetype='application/x-ndjson'
+    )
+
 # Error handlers
 @app.errorhandler(404)
 def page_not_found(e):
     return render_template('errors/404.html'), 404
 
+@app.errorhandler(413)
+def request_entity_too_large(e):
+    flash('Uploaded file is too large', 'error')
+    return redirect(request.referrer or url_for('index'))
+
 @app.errorhandler(500)
 def internal_server_error(e):
     return render_template('errors/500.html'), 500
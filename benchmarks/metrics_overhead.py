@@ -0,0 +1,207 @@
+"""Measure the cost of the metrics instrumentation on the hot request paths.
+
+Usage:
+    python -m benchmarks.metrics_overhead --internships 10000 --users 1000
+    python -m benchmarks.metrics_overhead --requests 2000 --threshold 0.03
+
+Builds the same synthetic database as benchmarks.run and serves the
+benchmarked paths (listing page, search, my applications, recommendations)
+from two small Flask apps rather than app.py, so both modes run in one
+process (app.py reads METRICS_ENABLED at import): one as if
+METRICS_ENABLED=0 (plain connections, no metrics hooks) and one as if
+METRICS_ENABLED=1 (instrumented connections, the before/after_request hooks
+and the recommendation timer).  Requests alternate between the two so both
+see the same cache and CPU state.  The routes skip templates and
+authentication, so the relative overhead is an upper bound for the real
+pages.  Prints a JSON report with p50/p95 (ms) per path for each mode and
+the added time and relative overhead; exits with 1 when any p50 overhead
+exceeds the threshold.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import nullcontext
+
+from benchmarks.run import REPO_ROOT, percentile, prepare_database
+
+
+def build_app(enabled, engine, users):
+    """A Flask app serving the benchmarked paths with metrics on or off.
+
+    Connections come from a ConnectionPool and are released on teardown,
+    and a session-reading before_request hook runs first, as in app.py.
+    """
+    from flask import Flask, g, jsonify, request, session
+
+    from init_db import DATABASE, HOT_QUERIES, ConnectionPool
+    from services.catalog import ListingQuery
+    from services.search import search_internships
+    from utils import metrics
+
+    # connection_factory() and init_app() read the flag when called, so the
+    # pool's only connection is opened here, with this app's setting
+    metrics.METRICS_ENABLED = enabled
+    pool = ConnectionPool(DATABASE, size=1)
+    pool.release(pool.acquire())
+    app = Flask(f'metrics-{"on" if enabled else "off"}')
+    app.secret_key = 'benchmark'
+    metrics.init_app(app)
+    metrics.METRICS_ENABLED = True
+    timer = metrics.RECOMMENDATION_SECONDS.time if enabled else None
+
+    def get_db():
+        if 'db' not in g:
+            g.db = pool.acquire()
+        return g.db
+
+    @app.teardown_appcontext
+    def close_db(exc):
+        db = g.pop('db', None)
+        if db is not None:
+            pool.release(db)
+
+    @app.before_request
+    def _load_session():
+        session.get('user_id')
+
+    @app.route('/api/internships')
+    def api_internships():
+        rows, cursor = ListingQuery.from_args(request.args).page(get_db())
+        return jsonify(items=[dict(row) for row in rows], next=cursor)
+
+    @app.route('/search')
+    def search():
+        results = search_internships(get_db(), request.args.get('q', ''))
+        return jsonify(count=len(results))
+
+    @app.route('/applications')
+    def my_applications():
+        user_id = request.args.get('user', type=int)
+        db = get_db()
+        rows = db.execute(HOT_QUERIES['my_applications'][0], (user_id,)).fetchall()
+        stats = db.execute(HOT_QUERIES['application_stats'][0], (user_id,)).fetchall()
+        return jsonify(applications=len(rows), stats=[dict(row) for row in stats])
+
+    @app.route('/api/recommendations')
+    def recommendations():
+        user = users[request.args.get('user', type=int)]
+        with timer(mode='single') if timer else nullcontext():
+            results = engine.get_recommendations(user)
+        return jsonify(count=len(results))
+
+    return app
+
+
+def scenario_paths(users, rng):
+    """Map scenario name -> callable() returning one request path."""
+    words = ('python', 'data', 'marketing', 'design', 'finance', 'remote', 'java', 'sales')
+    user_ids = list(users)
+    return {
+        'api_internships': lambda: f'/api/internships?limit=50&after={rng.randint(0, 1000)}',
+        'search': lambda: '/search?q=' + rng.choice(words),
+        'my_applications': lambda: f'/applications?user={rng.choice(user_ids)}',
+        'recommendations': lambda: f'/api/recommendations?user={rng.choice(user_ids)}',
+    }
+
+
+def run_pair(clients, next_path, requests, warmup):
+    """Issue the same paths alternately to both clients; return latencies (ms) per mode."""
+    latencies = {mode: [] for mode in clients}
+    for n in range(warmup + requests):
+        path = next_path()
+        # Alternate which mode goes first so neither always gets a warm cache
+        order = list(clients) if n % 2 == 0 else list(reversed(list(clients)))
+        for mode in order:
+            t0 = time.perf_counter()
+            response = clients[mode].get(path)
+            elapsed = (time.perf_counter() - t0) * 1000
+            if response.status_code >= 400:
+                raise RuntimeError(f'{path} answered {response.status_code} with metrics {mode}')
+            if n >= warmup:
+                latencies[mode].append(elapsed)
+    return latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--internships', type=int, default=10000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=1000, help='requests per scenario and mode')
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--scenario', action='append', help='run only these scenarios')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--vocabulary', type=int,
+                        help='synthetic long-tail skills across all sectors (default 20000)')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--threshold', type=float, default=0.05,
+                        help='allowed relative p50 overhead (default 0.05)')
+    args = parser.parse_args(argv)
+    output_path = os.path.abspath(args.output) if args.output else None
+
+    sys.path.insert(0, REPO_ROOT)
+    workdir = tempfile.mkdtemp(prefix='pm-metrics-')
+    from benchmarks.synthetic import DEFAULT_VOCABULARY_SIZE
+    prepare_database(
+        workdir, args.internships, args.users, args.seed,
+        args.vocabulary or DEFAULT_VOCABULARY_SIZE
+    )
+
+    from init_db import DATABASE, connect
+    from services.recommendation_engine import RecommendationEngine
+
+    conn = connect(DATABASE)
+    users = {row['id']: dict(row) for row in conn.execute('SELECT * FROM users')}
+    engine = RecommendationEngine()
+    engine.refresh(conn)
+    conn.close()
+
+    rng = random.Random(args.seed)
+    clients = {
+        'off': build_app(False, engine, users).test_client(),
+        'on': build_app(True, engine, users).test_client(),
+    }
+    scenarios = scenario_paths(users, rng)
+    selected = args.scenario or list(scenarios)
+
+    report = {
+        'internships': args.internships,
+        'users': args.users,
+        'requests': args.requests,
+        'scenarios': {},
+    }
+    over = []
+    for name in selected:
+        latencies = run_pair(clients, scenarios[name], args.requests, args.warmup)
+        result = {}
+        for mode, samples in latencies.items():
+            result[mode] = {
+                'p50_ms': round(percentile(samples, 50), 3),
+                'p95_ms': round(percentile(samples, 95), 3),
+            }
+        for stat in ('p50', 'p95'):
+            off, on = result['off'][stat + '_ms'], result['on'][stat + '_ms']
+            result[stat + '_added_ms'] = round(on - off, 3)
+            result[stat + '_overhead'] = round((on - off) / off, 4) if off else None
+        if result['p50_overhead'] is not None and result['p50_overhead'] > args.threshold:
+            over.append(f"{name}: p50 overhead {result['p50_overhead']:.1%}")
+        report['scenarios'][name] = result
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if output_path:
+        with open(output_path, 'w') as f:
+            f.write(output + '\n')
+    if over:
+        print('Overhead above threshold:', file=sys.stderr)
+        for line in over:
+            print('  ' + line, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
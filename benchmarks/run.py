@@ -0,0 +1,235 @@
+"""Benchmark the hot request paths against a synthetic catalog.
+
+Usage:
+    python -m benchmarks.run --internships 10000 --users 1000 --output bench.json
+    python -m benchmarks.run --baseline bench.json --threshold 0.15
+
+Runs every scenario through the Flask test client and prints a JSON report
+with p50/p95/p99 latency (ms), throughput (req/s) and peak RSS (MB).  Expired
+synthetic internships are archived before the run, and the time that takes
+is reported; --keep-expired leaves them in the live table instead, so the
+cost of the active-window filter can be compared between the two.  With
+--baseline, scenarios whose p95 grows or throughput drops by more than the
+threshold are reported as regressions and the exit code is 1.  Every run also
+checks the query plans of init_db.HOT_QUERIES against the populated database and
+exits with 1 when any of them scans a whole table.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def prepare_database(workdir, internships, users, seed, vocabulary_size, archive=True):
+    """Create and populate the benchmark database inside `workdir`.
+
+    Returns (populate_seconds, archive_seconds, archived); the archive
+    figures are None when `archive` is false.
+    """
+    from init_db import DATABASE, connect, init_db
+    from benchmarks.synthetic import populate
+    from services.lifecycle import archive_expired
+
+    os.chdir(workdir)
+    init_db()
+    conn = connect(DATABASE)
+    started = time.perf_counter()
+    populate(conn, internships, users, seed=seed, vocabulary_size=vocabulary_size)
+    populate_seconds = time.perf_counter() - started
+
+    archive_seconds = archived = None
+    if archive:
+        started = time.perf_counter()
+        archived = archive_expired(conn)
+        archive_seconds = time.perf_counter() - started
+    conn.close()
+    return populate_seconds, archive_seconds, archived
+
+
+def query_plan_scans():
+    """{name: plan} for every hot query that scans a whole table."""
+    from init_db import DATABASE, check_query_plans, connect
+
+    conn = connect(DATABASE)
+    try:
+        return check_query_plans(conn)
+    finally:
+        conn.close()
+
+
+def scenario_requests(app, user_count, rng):
+    """Map scenario name -> callable(client) issuing one request."""
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        tokens = {
+            uid: create_access_token(identity=str(uid))
+            for uid in range(1, min(user_count, 200) + 1)
+        }
+
+    def auth_headers():
+        return {'Authorization': 'Bearer ' + tokens[rng.choice(list(tokens))]}
+
+    def recommendations(client):
+        return client.get('/api/recommendations', headers=auth_headers())
+
+    def api_internships(client):
+        after = rng.randint(0, 1000)
+        return client.get(f'/api/internships?limit=50&after={after}', headers=auth_headers())
+
+    def as_user(client):
+        with client.session_transaction() as sess:
+            sess['user_id'] = rng.choice(list(tokens))
+
+    def my_applications(client):
+        as_user(client)
+        return client.get('/applications')
+
+    def dashboard(client):
+        as_user(client)
+        return client.get('/dashboard')
+
+    return {
+        'recommendations': recommendations,
+        'api_internships': api_internships,
+        'my_applications': my_applications,
+        'dashboard': dashboard,
+    }
+
+
+def run_scenario(client, issue, requests, warmup):
+    for _ in range(warmup):
+        issue(client)
+
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        response = issue(client)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+    elapsed = time.perf_counter() - started
+
+    return {
+        'requests': requests,
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'throughput_rps': round(requests / elapsed, 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def compare(report, baseline, threshold):
+    """Return a list of human-readable regressions against a baseline report."""
+    regressions = []
+    for name, current in report['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+            regressions.append(
+                f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms"
+            )
+        if current['throughput_rps'] < previous['throughput_rps'] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} req/s"
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--internships', type=int, default=10000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=500, help='requests per scenario')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--scenario', action='append', help='run only these scenarios')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--vocabulary', type=int,
+                        help='synthetic long-tail skills across all sectors (default 20000)')
+    parser.add_argument('--keep-expired', action='store_true',
+                        help='do not archive expired internships before the run')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--baseline', help='compare against a previous JSON report')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='allowed relative regression (default 0.10)')
+    args = parser.parse_args(argv)
+    output_path = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    # The app must not start the external sync worker or touch the real database
+    os.environ.setdefault('EXTERNAL_SYNC_INTERVAL', '0')
+    # Archiving is timed explicitly below, not left to the background worker
+    os.environ.setdefault('ARCHIVE_INTERVAL', '0')
+    sys.path.insert(0, REPO_ROOT)
+    workdir = tempfile.mkdtemp(prefix='pm-bench-')
+    from benchmarks.synthetic import DEFAULT_VOCABULARY_SIZE
+    vocabulary = args.vocabulary or DEFAULT_VOCABULARY_SIZE
+    populate_seconds, archive_seconds, archived = prepare_database(
+        workdir, args.internships, args.users, args.seed, vocabulary,
+        archive=not args.keep_expired
+    )
+
+    from app import app
+    client = app.test_client()
+
+    rng = random.Random(args.seed)
+    scenarios = scenario_requests(app, args.users, rng)
+    selected = args.scenario or list(scenarios)
+
+    report = {
+        'internships': args.internships,
+        'users': args.users,
+        'vocabulary': vocabulary,
+        'populate_seconds': round(populate_seconds, 2),
+        'archive_seconds': None if archive_seconds is None else round(archive_seconds, 3),
+        'archived_internships': archived,
+        'query_plan_scans': query_plan_scans(),
+        'scenarios': {},
+    }
+    for name in selected:
+        report['scenarios'][name] = run_scenario(
+            client, scenarios[name], args.requests, args.warmup
+        )
+
+    # A hot query that scans a table is a regression whatever the timings say
+    status = 1 if report['query_plan_scans'] else 0
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        report['regressions'] = compare(report, baseline, args.threshold)
+        if report['regressions']:
+            status = 1
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if output_path:
+        with open(output_path, 'w') as f:
+            f.write(output + '\n')
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,197 @@
+import random
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+
+from init_db import SAMPLE_COLUMNS, SAMPLE_INTERNSHIPS
+from services import application_stats
+from services.features import (
+    INTERNSHIP_FEATURE_COLUMNS,
+    USER_FEATURE_COLUMNS,
+    internship_feature_values,
+    user_feature_values,
+)
+
+USER_COLUMNS = ('username', 'email', 'password', 'education', 'skills', 'interests', 'location')
+
+# Extra places so the catalog is not limited to the seed cities
+EXTRA_LOCATIONS = [
+    'Nagpur, Maharashtra', 'Surat, Gujarat', 'Patna, Bihar', 'Ranchi, Jharkhand',
+    'Guwahati, Assam', 'Bhopal, Madhya Pradesh', 'Visakhapatnam, Andhra Pradesh',
+    'Kochi, Kerala', 'Chandigarh, Punjab', 'Dehradun, Uttarakhand', 'Raipur, Chhattisgarh',
+    'Shimla, Himachal Pradesh', 'Remote',
+]
+
+USER_EDUCATION = ['B.Tech', 'B.E.', 'BBA', 'MBA', 'B.Com', 'B.Sc', 'M.Tech', 'M.Sc', 'BA']
+
+STATUSES = ['Applied', 'Applied', 'Applied', 'Under Review', 'Shortlisted', 'Rejected', 'Selected']
+
+# Hashes are never checked by the benchmark
+PLACEHOLDER_PASSWORD = 'pbkdf2:sha256:600000$benchmark$0'
+
+# Long-tail skills added to the seed ones; partner catalogs carry tens of
+# thousands of distinct, mostly rare skill tokens
+DEFAULT_VOCABULARY_SIZE = 20000
+
+
+class CatalogModel:
+    """Sector, skill and location distributions derived from the seed rows.
+
+    Each sector also gets an equal share of `vocabulary_size` synthetic
+    skills drawn with Zipf-like weights, so a few are common and most are
+    rare, as in real feeds.
+    """
+
+    def __init__(self, seed_rows=SAMPLE_INTERNSHIPS, vocabulary_size=DEFAULT_VOCABULARY_SIZE):
+        rows = [dict(zip(SAMPLE_COLUMNS, row)) for row in seed_rows]
+        self.rows_by_sector = {}
+        self.skills_by_sector = {}
+        for row in rows:
+            self.rows_by_sector.setdefault(row['sector'], []).append(row)
+            skills = self.skills_by_sector.setdefault(row['sector'], [])
+            for skill in (row['skills_required'] + ', ' + row['requirements']).split(','):
+                skill = skill.strip()
+                if skill and skill not in skills:
+                    skills.append(skill)
+
+        # Sectors are weighted by how often they occur in the seed data
+        self.sectors = [row['sector'] for row in rows]
+        self.all_skills = sorted({s for skills in self.skills_by_sector.values() for s in skills})
+        self.locations = [row['location'] for row in rows] + EXTRA_LOCATIONS
+        self.stipends = [row['stipend'] for row in rows]
+        self.durations = [row['duration'] for row in rows]
+
+        per_sector = vocabulary_size // max(len(self.skills_by_sector), 1)
+        self.tail_weights = list(accumulate(1 / rank for rank in range(1, per_sector + 1)))
+        self.tail_by_sector = {
+            sector: [f'{sector} skill {n}' for n in range(per_sector)]
+            for sector in self.skills_by_sector
+        }
+
+    def tail_skills(self, rng, sector, count):
+        """`count` long-tail skills of `sector` (possibly repeated)."""
+        tail = self.tail_by_sector[sector]
+        if not tail or count <= 0:
+            return []
+        return rng.choices(tail, cum_weights=self.tail_weights, k=count)
+
+
+def generate_internships(count, rng=None, model=None, today=None):
+    """Yield `count` synthetic internship tuples in SAMPLE_COLUMNS order."""
+    rng = rng or random.Random(0)
+    model = model or CatalogModel()
+    today = today or date.today()
+
+    for n in range(count):
+        sector = rng.choice(model.sectors)
+        template = rng.choice(model.rows_by_sector[sector])
+        pool = model.skills_by_sector[sector]
+        skills = rng.sample(pool, min(len(pool), rng.randint(2, 5)))
+        # A little cross-sector noise keeps the token distribution realistic
+        if rng.random() < 0.3:
+            skills.append(rng.choice(model.all_skills))
+        skills.extend(model.tail_skills(rng, sector, rng.randint(1, 4)))
+        deadline = today + timedelta(days=rng.randint(-30, 120))
+
+        yield (
+            f"{template['title']} #{n}",
+            f"{template['company']} {n % 997}",
+            rng.choice(model.locations),
+            template['description'],
+            ', '.join(skills[:3]),
+            rng.choice(model.stipends),
+            rng.choice(model.durations),
+            deadline.isoformat(),
+            sector,
+            ', '.join(skills),
+            template['education_required'],
+        )
+
+
+def generate_users(count, rng=None, model=None):
+    """Yield `count` synthetic user tuples with complete profiles."""
+    rng = rng or random.Random(1)
+    model = model or CatalogModel()
+
+    for n in range(count):
+        sectors = rng.sample(sorted(model.skills_by_sector), rng.randint(1, 3))
+        pool = [s for sector in sectors for s in model.skills_by_sector[sector]]
+        skills = rng.sample(pool, min(len(pool), rng.randint(2, 6)))
+        skills.extend(model.tail_skills(rng, rng.choice(sectors), rng.randint(0, 3)))
+        yield (
+            f'user{n}',
+            f'user{n}@example.com',
+            PLACEHOLDER_PASSWORD,
+            rng.choice(USER_EDUCATION),
+            ', '.join(skills),
+            ', '.join(sectors),
+            rng.choice(model.locations),
+        )
+
+
+def generate_applications(user_count, internship_count, rng=None, max_per_user=10):
+    """Yield application tuples, at most one per (user, internship)."""
+    rng = rng or random.Random(2)
+    now = datetime.now()
+
+    for user_id in range(1, user_count + 1):
+        picks = rng.sample(range(1, internship_count + 1),
+                           min(internship_count, rng.randint(0, max_per_user)))
+        for internship_id in picks:
+            applied = now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+            yield (
+                user_id,
+                internship_id,
+                rng.choice(STATUSES),
+                applied.strftime('%Y-%m-%d %H:%M:%S'),
+            )
+
+
+def _insert_batches(conn, sql, rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            conn.executemany(sql, batch)
+            batch = []
+    if batch:
+        conn.executemany(sql, batch)
+
+
+def populate(conn, internships, users, seed=0, batch_size=5000,
+             vocabulary_size=DEFAULT_VOCABULARY_SIZE):
+    """Fill an empty, migrated database with a synthetic catalog and users.
+
+    Applications go through the same per-row path as the apply route, so
+    user_application_stats is maintained as in production.
+    """
+    rng = random.Random(seed)
+    model = CatalogModel(vocabulary_size=vocabulary_size)
+
+    internship_columns = SAMPLE_COLUMNS + INTERNSHIP_FEATURE_COLUMNS
+    user_columns = USER_COLUMNS + USER_FEATURE_COLUMNS
+
+    with conn:
+        # Features are written alongside each row, as the app does
+        _insert_batches(
+            conn,
+            f'''INSERT INTO internships ({', '.join(internship_columns)})
+                VALUES ({', '.join('?' for _ in internship_columns)})''',
+            (row + internship_feature_values(dict(zip(SAMPLE_COLUMNS, row)))
+             for row in generate_internships(internships, rng, model)),
+            batch_size,
+        )
+        _insert_batches(
+            conn,
+            f'''INSERT INTO users ({', '.join(user_columns)})
+                VALUES ({', '.join('?' for _ in user_columns)})''',
+            (row + user_feature_values(row[4], row[5], row[3], row[6])
+             for row in generate_users(users, rng, model)),
+            batch_size,
+        )
+        for application in generate_applications(users, internships, rng):
+            cursor = conn.execute(
+                '''INSERT INTO applications (user_id, internship_id, status, applied_date)
+                   VALUES (?, ?, ?, ?)''',
+                application
+            )
+            application_stats.record_application(conn, cursor.lastrowid)
@@ -0,0 +1,43 @@
+import os
+import time
+
+_config_loaded = time.perf_counter()
+
+# Import the app once in the master: schema migrations and the catalog index
+# run a single time and workers share the result copy-on-write.
+# Set APP_PRELOAD=0 to have every worker import the app itself.
+preload_app = os.environ.get('APP_PRELOAD', '1') == '1'
+os.environ['APP_PRELOAD'] = '1' if preload_app else '0'
+
+
+def when_ready(server):
+    from services import startup
+
+    rss = startup.rss_bytes()
+    server.log.info(
+        'Master ready in %.2fs%s', time.perf_counter() - _config_loaded,
+        f', RSS {rss / 2**20:.1f} MB' if rss is not None else ''
+    )
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        from services import startup
+
+        startup.freeze()
+
+
+def post_fork(server, worker):
+    from services import startup
+
+    startup.forked()
+
+
+def post_worker_init(worker):
+    # Without preload the app import has already done this in the worker
+    if preload_app:
+        from app import start_background_tasks
+        from services import startup
+
+        start_background_tasks()
+        startup.mark_ready('Worker')
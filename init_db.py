@@ -1,17 +1,547 @@
 import os
+import queue
 import sqlite3
+import threading
 
-def init_db():
-    """Initialize the database with schema."""
-    # Create data directory if it doesn't exist
-    if not os.path.exists('data'):
-        os.makedirs('data')
-    
-    # Connect to database
-    conn = sqlite3.connect('data/internship_recommender.db')
-    db = conn.cursor()
-    
-    # Create tables
+from flask import g
+
+from services.features import (
+    INTERNSHIP_FEATURE_COLUMNS,
+    OPEN_DEADLINE,
+    backfill as backfill_features,
+    internship_feature_values,
+)
+from services.geo import sql_distance_km
+from utils.metrics import connection_factory
+
+DATABASE = os.path.join('data', 'internship_recommender.db')
+
+# Connection settings
+POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '8'))
+POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '10'))
+BUSY_TIMEOUT_MS = 5000
+MMAP_SIZE = 256 * 1024 * 1024
+
+def connect(database=DATABASE):
+    """Open a connection with the pragmas every connection should use."""
+    conn = sqlite3.connect(
+        database,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False,
+        factory=connection_factory()
+    )
+    conn.row_factory = sqlite3.Row
+    # WAL lets readers run alongside the single writer
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute(f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}')
+    conn.execute(f'PRAGMA mmap_size = {MMAP_SIZE}')
+    # Used by radius filters on the internship listing
+    conn.create_function('distance_km', 4, sql_distance_km, deterministic=True)
+    return conn
+
+class ConnectionPool:
+    """A bounded pool of SQLite connections shared by worker threads."""
+
+    def __init__(self, database=DATABASE, size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take an idle connection, opening one if the pool is not full."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return connect(self.database)
+                except Exception:
+                    self._created -= 1
+                    raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise RuntimeError('Timed out waiting for a database connection')
+
+    def release(self, conn):
+        """Return a connection to the pool, discarding any open transaction."""
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def close(self):
+        """Close every idle connection."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Return the process-wide connection pool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+def get_db():
+    """Return the connection for the current app context."""
+    if 'db' not in g:
+        g.db = get_pool().acquire()
+    return g.db
+
+def close_db(e=None):
+    """Hand the app context's connection back to the pool."""
+    db = g.pop('db', None)
+    if db is not None:
+        get_pool().release(db)
+
+def init_app(app):
+    """Register connection teardown with the Flask app."""
+    app.teardown_appcontext(close_db)
+
+def _ensure_column(db, table, column, definition):
+    """Add a column to an existing table if it is missing."""
+    columns = [row[1] for row in db.execute(f'PRAGMA table_info({table})')]
+    if column not in columns:
+        db.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+def _migration_1(db):
+    """External listing sync columns and indexes."""
+    _ensure_column(db, 'internships', 'is_active', 'INTEGER DEFAULT 1')
+    _ensure_column(db, 'internships', 'updated_at', 'TIMESTAMP')
+
+    # External listings are upserted on external_id
+    db.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_internships_external_id
+        ON internships (external_id)
+    ''')
+    db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_internships_updated_at
+        ON internships (updated_at)
+    ''')
+
+def _migration_2(db):
+    """Indexes for the application queries behind the dashboard."""
+    # Drop duplicate applications before enforcing uniqueness
+    db.execute('''
+        DELETE FROM applications
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM applications GROUP BY user_id, internship_id
+        )
+    ''')
+    db.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_applications_user_internship
+        ON applications (user_id, internship_id)
+    ''')
+    db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_applications_user_applied
+        ON applications (user_id, applied_date DESC)
+    ''')
+    db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_applications_user_status
+        ON applications (user_id, status)
+    ''')
+
+def _migration_3(db):
+    """Indexes for the filtered internship listing."""
+    db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_internships_sector
+        ON internships (sector)
+    ''')
+    db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_internships_deadline
+        ON internships (deadline)
+    ''')
+
+def _migration_4(db):
+    """Profile/catalog versions and the materialized recommendations table."""
+    _ensure_column(db, 'users', 'profile_version', 'INTEGER NOT NULL DEFAULT 0')
+
+    # Single-row counter bumped by triggers on every catalog change
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    db.execute('INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0)')
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        db.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS internships_{event.lower()}_catalog_version
+            AFTER {event} ON internships
+            BEGIN
+                UPDATE catalog_version
+                SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE id = 1;
+            END
+        ''')
+
+    # Stamp direct updates so in-process indexes notice them
+    db.execute('''
+        CREATE TRIGGER IF NOT EXISTS internships_touch_updated_at
+        AFTER UPDATE ON internships
+        WHEN NEW.updated_at IS OLD.updated_at
+        BEGIN
+            UPDATE internships
+            SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')
+            WHERE id = NEW.id;
+        END
+    ''')
+
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS user_recommendations (
+            user_id INTEGER PRIMARY KEY,
+            profile_version INTEGER NOT NULL,
+            catalog_version INTEGER NOT NULL,
+            recommendations TEXT NOT NULL,
+            computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+
+def _migration_5(db):
+    """FTS5 full-text index over internships, kept in sync by triggers."""
+    db.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS internships_fts USING fts5(
+            title, company, description, requirements, skills_required,
+            content='internships',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    ''')
+
+    columns = 'title, company, description, requirements, skills_required'
+    new_values = ', '.join('NEW.' + c for c in columns.split(', '))
+    old_values = ', '.join('OLD.' + c for c in columns.split(', '))
+    db.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS internships_fts_insert
+        AFTER INSERT ON internships
+        BEGIN
+            INSERT INTO internships_fts (rowid, {columns})
+            VALUES (NEW.id, {new_values});
+        END
+    ''')
+    db.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS internships_fts_delete
+        AFTER DELETE ON internships
+        BEGIN
+            INSERT INTO internships_fts (internships_fts, rowid, {columns})
+            VALUES ('delete', OLD.id, {old_values});
+        END
+    ''')
+    db.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS internships_fts_update
+        AFTER UPDATE OF {columns} ON internships
+        BEGIN
+            INSERT INTO internships_fts (internships_fts, rowid, {columns})
+            VALUES ('delete', OLD.id, {old_values});
+            INSERT INTO internships_fts (rowid, {columns})
+            VALUES (NEW.id, {new_values});
+        END
+    ''')
+
+    # Index rows that existed before the table was created
+    db.execute("INSERT INTO internships_fts (internships_fts) VALUES ('rebuild')")
+
+def _migration_6(db):
+    """Denormalized per-user application counters for the dashboard."""
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS user_application_stats (
+            user_id INTEGER PRIMARY KEY,
+            status_counts TEXT NOT NULL DEFAULT '{}',
+            recent_applications TEXT NOT NULL DEFAULT '[]',
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+
+    # Backfill from the existing applications
+    db.execute('''
+        INSERT OR REPLACE INTO user_application_stats
+            (user_id, status_counts, recent_applications)
+        SELECT u.user_id,
+               (SELECT json_group_object(status, count)
+                FROM (SELECT status, COUNT(*) AS count
+                      FROM applications
+                      WHERE user_id = u.user_id
+                      GROUP BY status)),
+               (SELECT json_group_array(json_object(
+                           'id', r.id,
+                           'internship_id', r.internship_id,
+                           'status', r.status,
+                           'applied_date', r.applied_date,
+                           'last_updated', r.last_updated,
+                           'title', r.title,
+                           'company', r.company))
+                FROM (SELECT a.*, i.title, i.company
+                      FROM applications a
+                      JOIN internships i ON a.internship_id = i.id
+                      WHERE a.user_id = u.user_id
+                      ORDER BY a.applied_date DESC, a.id DESC
+                      LIMIT 5) r)
+        FROM (SELECT DISTINCT user_id FROM applications) u
+    ''')
+
+def _migration_7(db):
+    """Write-time token, stipend and duration features."""
+    for column in ('skill_tokens', 'sector_tokens', 'education_tokens'):
+        _ensure_column(db, 'internships', column, 'TEXT')
+    for column in ('stipend_min', 'stipend_max', 'duration_months'):
+        _ensure_column(db, 'internships', column, 'INTEGER')
+    for column in ('skill_tokens', 'interest_tokens', 'education_tokens'):
+        _ensure_column(db, 'users', column, 'TEXT')
+
+    # Range filters on the listing
+    db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_internships_stipend_max
+        ON internships (stipend_max)
+    ''')
+    db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_internships_duration_months
+        ON internships (duration_months)
+    ''')
+
+    backfill_features(db)
+
+def _migration_8(db):
+    """Gazetteer coordinates for internships and users."""
+    for table in ('internships', 'users'):
+        _ensure_column(db, table, 'latitude', 'REAL')
+        _ensure_column(db, table, 'longitude', 'REAL')
+
+    # Bounding-box prefilter for radius queries
+    db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_internships_coordinates
+        ON internships (latitude, longitude)
+    ''')
+
+    backfill_features(db)
+
+def _archive_columns(db):
+    """Columns shared by internships and internships_archive, in table order."""
+    archived = {row[1] for row in db.execute('PRAGMA table_info(internships_archive)')}
+    return [row[1] for row in db.execute('PRAGMA table_info(internships)') if row[1] in archived]
+
+def _create_all_internships_view(db):
+    """(Re)create the view over live and archived internships."""
+    columns = ', '.join(_archive_columns(db))
+    # A NULL column would stop SQLite from pushing id lookups into both arms
+    db.execute('DROP VIEW IF EXISTS all_internships')
+    db.execute(f'''
+        CREATE VIEW all_internships AS
+        SELECT {columns}, 0 AS archived FROM internships
+        UNION ALL
+        SELECT {columns}, 1 FROM internships_archive
+    ''')
+
+def _migration_9(db):
+    """Comparable deadline dates and the archive for expired internships."""
+    _ensure_column(db, 'internships', 'deadline_date', f"TEXT NOT NULL DEFAULT '{OPEN_DEADLINE}'")
+
+    # Active-window filter and the archive job both range over it
+    db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_internships_deadline_date
+        ON internships (deadline_date)
+    ''')
+    # Listing filters moved to deadline_date
+    db.execute('DROP INDEX IF EXISTS idx_internships_deadline')
+
+    # Same columns as internships; ids are never reused, so they stay unique
+    db.execute(f'''
+        CREATE TABLE IF NOT EXISTS internships_archive (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            company TEXT NOT NULL,
+            location TEXT NOT NULL,
+            description TEXT NOT NULL,
+            requirements TEXT,
+            stipend TEXT,
+            duration TEXT,
+            deadline TEXT,
+            sector TEXT,
+            skills_required TEXT,
+            education_required TEXT,
+            is_external INTEGER DEFAULT 0,
+            external_id TEXT,
+            external_url TEXT,
+            is_active INTEGER DEFAULT 1,
+            updated_at TIMESTAMP,
+            skill_tokens TEXT,
+            sector_tokens TEXT,
+            education_tokens TEXT,
+            stipend_min INTEGER,
+            stipend_max INTEGER,
+            duration_months INTEGER,
+            latitude REAL,
+            longitude REAL,
+            deadline_date TEXT NOT NULL DEFAULT '{OPEN_DEADLINE}',
+            created_at TIMESTAMP,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # Applications join through the view so archived internships still resolve
+    _create_all_internships_view(db)
+
+    backfill_features(db)
+
+# Sync bookkeeping columns; writing only these is not a catalog change
+SYNC_COLUMNS = ('last_seen_at',)
+
+def _create_catalog_triggers(db):
+    """(Re)create the update triggers so they ignore SYNC_COLUMNS.
+
+    UPDATE OF lists the columns at creation time, so a migration adding
+    internship columns should call this again.
+    """
+    columns = ', '.join(
+        row[1] for row in db.execute('PRAGMA table_info(internships)')
+        if row[1] not in SYNC_COLUMNS
+    )
+    db.execute('DROP TRIGGER IF EXISTS internships_update_catalog_version')
+    db.execute(f'''
+        CREATE TRIGGER internships_update_catalog_version
+        AFTER UPDATE OF {columns} ON internships
+        BEGIN
+            UPDATE catalog_version
+            SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE id = 1;
+        END
+    ''')
+    db.execute('DROP TRIGGER IF EXISTS internships_touch_updated_at')
+    db.execute(f'''
+        CREATE TRIGGER internships_touch_updated_at
+        AFTER UPDATE OF {columns} ON internships
+        WHEN NEW.updated_at IS OLD.updated_at
+        BEGIN
+            UPDATE internships
+            SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')
+            WHERE id = NEW.id;
+        END
+    ''')
+
+def _migration_10(db):
+    """Last-seen timestamps for external listings, outside the catalog version."""
+    _ensure_column(db, 'internships', 'last_seen_at', 'TIMESTAMP')
+    db.execute('UPDATE internships SET last_seen_at = updated_at WHERE is_external = 1')
+
+    # expire_missing looks for external listings not seen in the latest sync
+    db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_internships_last_seen_at
+        ON internships (last_seen_at)
+    ''')
+    _create_catalog_triggers(db)
+
+def _migration_11(db):
+    """Provider-namespaced external ids for synced listings."""
+    # Listings synced before ids carried their provider came from RapidAPI
+    db.execute('''
+        UPDATE internships SET external_id = 'rapidapi:' || external_id
+        WHERE is_external = 1 AND external_id IS NOT NULL AND instr(external_id, ':') = 0
+    ''')
+
+def _migration_12(db):
+    """Source-namespaced external ids for imported listings."""
+    # Feeds imported before ids carried their source get the default one
+    db.execute('''
+        UPDATE internships SET external_id = 'import:partner:' || external_id
+        WHERE is_external IS NOT 1 AND external_id IS NOT NULL
+          AND external_id NOT LIKE 'import:%'
+    ''')
+
+# Schema migrations; PRAGMA user_version records how many have run
+MIGRATIONS = [
+    _migration_1,
+    _migration_2,
+    _migration_3,
+    _migration_4,
+    _migration_5,
+    _migration_6,
+    _migration_7,
+    _migration_8,
+    _migration_9,
+    _migration_10,
+    _migration_11,
+    _migration_12,
+]
+
+def migrate(conn):
+    """Apply pending migrations, each in its own transaction."""
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        conn.execute('BEGIN')
+        try:
+            migration(conn)
+            conn.execute(f'PRAGMA user_version = {number}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"Applied migration {number}: {migration.__doc__}")
+    return len(MIGRATIONS)
+
+# Queries on the request hot path that must never scan a whole table
+HOT_QUERIES = {
+    'user_by_email': ('SELECT * FROM users WHERE email = ?', ('',)),
+    'user_by_id': ('SELECT * FROM users WHERE id = ?', (0,)),
+    'internship_by_id': ('SELECT * FROM internships WHERE id = ?', (0,)),
+    'any_internship_by_id': ('SELECT * FROM all_internships WHERE id = ?', (0,)),
+    'expired_internships': ('SELECT id FROM internships WHERE deadline_date < ?', ('',)),
+    'application_exists': (
+        'SELECT * FROM applications WHERE user_id = ? AND internship_id = ?',
+        (0, 0)
+    ),
+    'application_stats': (
+        '''SELECT status, COUNT(*) as count
+           FROM applications
+           WHERE user_id = ?
+           GROUP BY status''',
+        (0,)
+    ),
+    'user_application_stats': (
+        'SELECT status_counts, recent_applications FROM user_application_stats WHERE user_id = ?',
+        (0,)
+    ),
+    'my_applications': (
+        '''SELECT a.*, i.title, i.company
+           FROM applications a
+           JOIN all_internships i ON a.internship_id = i.id
+           WHERE a.user_id = ?
+           ORDER BY a.applied_date DESC''',
+        (0,)
+    ),
+}
+
+def check_query_plans(conn, queries=None):
+    """Return {name: plan} for every hot query whose plan has a full scan."""
+    failures = {}
+    for name, (sql, params) in (queries or HOT_QUERIES).items():
+        plan = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+        if any(detail.startswith('SCAN') for detail in plan):
+            failures[name] = plan
+    return failures
+
+def create_schema(db):
+    """Create the base tables that MIGRATIONS build on, if missing."""
     db.execute('''
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -23,6 +553,12 @@ def init_db():
             interests TEXT,
             location TEXT,
             resume_path TEXT,
+            profile_version INTEGER NOT NULL DEFAULT 0,
+            skill_tokens TEXT,
+            interest_tokens TEXT,
+            education_tokens TEXT,
+            latitude REAL,
+            longitude REAL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
@@ -44,6 +580,18 @@ def init_db():
             is_external INTEGER DEFAULT 0,
             external_id TEXT,
             external_url TEXT,
+            is_active INTEGER DEFAULT 1,
+            updated_at TIMESTAMP,
+            skill_tokens TEXT,
+            sector_tokens TEXT,
+            education_tokens TEXT,
+            stipend_min INTEGER,
+            stipend_max INTEGER,
+            duration_months INTEGER,
+            latitude REAL,
+            longitude REAL,
+            deadline_date TEXT NOT NULL DEFAULT '9999-12-31',
+            last_seen_at TIMESTAMP,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
@@ -62,7 +610,22 @@ def init_db():
             FOREIGN KEY (internship_id) REFERENCES internships (id)
         )
     ''')
+
+def init_db():
+    """Initialize the database with schema."""
+    # Create data directory if it doesn't exist
+    if not os.path.exists('data'):
+        os.makedirs('data')
     
+    # Connect to database
+    conn = connect(DATABASE)
+    db = conn.cursor()
+    
+    create_schema(db)
+
+    # Bring the schema up to the latest version
+    migrate(conn)
+
     # Insert sample data if the database is empty
     if db.execute('SELECT COUNT(*) FROM internships').fetchone()[0] == 0:
         insert_sample_data(db)
@@ -72,215 +635,281 @@ def init_db():
     
     print("Database initialized successfully!")
 
+# Hand-written seed internships
+SAMPLE_INTERNSHIPS = [
+    (
+        'Software Development Intern', 
+        'TechCorp India', 
+        'Bangalore, Karnataka', 
+        'Join our team to develop cutting-edge web applications using modern technologies.',
+        'Python, JavaScript, React, Node.js',
+        '₹15,000 - ₹20,000 per month',
+        '3 months',
+        '2025-10-15',
+        'Information Technology',
+        'Python, JavaScript, React, Node.js, Git',
+        'B.Tech/B.E. in Computer Science or related field'
+    ),
+    (
+        'Data Science Intern', 
+        'Analytics Hub', 
+        'Hyderabad, Telangana', 
+        'Work on real-world data science projects and gain hands-on experience with machine learning models.',
+        'Python, Statistics, Machine Learning',
+        '₹18,000 - ₹25,000 per month',
+        '6 months',
+        '2025-09-30',
+        'Data Science',
+        'Python, Pandas, NumPy, Scikit-learn, SQL',
+        'B.Tech/B.E./M.Tech in Computer Science, Statistics, or Mathematics'
+    ),
+    (
+        'Marketing Intern', 
+        'BrandMasters', 
+        'Mumbai, Maharashtra', 
+        'Assist in developing and implementing marketing strategies for various clients.',
+        'Social Media Marketing, Content Creation',
+        '₹12,000 - ₹15,000 per month',
+        '3 months',
+        '2025-10-05',
+        'Marketing',
+        'Social Media, Content Writing, Adobe Creative Suite',
+        'BBA/MBA in Marketing or related field'
+    ),
+    (
+        'Finance Intern', 
+        'FinSecure Solutions', 
+        'Delhi, NCR', 
+        'Learn financial analysis, reporting, and investment strategies in a fast-paced environment.',
+        'Financial Analysis, Excel, Accounting',
+        '₹15,000 - ₹18,000 per month',
+        '4 months',
+        '2025-09-25',
+        'Finance',
+        'Excel, Financial Modeling, Accounting Principles',
+        'B.Com/BBA/MBA in Finance or related field'
+    ),
+    (
+        'UI/UX Design Intern', 
+        'DesignWave', 
+        'Pune, Maharashtra', 
+        'Create user-centered designs for web and mobile applications.',
+        'UI Design, UX Research, Prototyping',
+        '₹15,000 - ₹20,000 per month',
+        '3 months',
+        '2025-10-10',
+        'Design',
+        'Figma, Adobe XD, Sketch, User Research',
+        'Bachelor\'s degree in Design, HCI, or related field'
+    ),
+    (
+        'Content Writing Intern', 
+        'ContentCraft', 
+        'Chennai, Tamil Nadu', 
+        'Develop engaging content for various platforms including blogs, social media, and websites.',
+        'Content Writing, SEO Knowledge',
+        '₹10,000 - ₹15,000 per month',
+        '3 months',
+        '2025-09-20',
+        'Content',
+        'Content Writing, SEO, Social Media',
+        'Bachelor\'s degree in English, Journalism, or related field'
+    ),
+    (
+        'HR Intern', 
+        'PeopleFirst', 
+        'Kolkata, West Bengal', 
+        'Assist in recruitment, employee engagement, and HR operations.',
+        'HR Processes, Communication Skills',
+        '₹12,000 - ₹15,000 per month',
+        '4 months',
+        '2025-10-01',
+        'Human Resources',
+        'MS Office, Communication, HR Processes',
+        'BBA/MBA in HR or related field'
+    ),
+    (
+        'Operations Intern', 
+        'SupplyChain Pro', 
+        'Ahmedabad, Gujarat', 
+        'Learn about supply chain management and operations optimization.',
+        'Analytical Skills, Process Optimization',
+        '₹14,000 - ₹18,000 per month',
+        '6 months',
+        '2025-09-15',
+        'Operations',
+        'Excel, Data Analysis, Process Mapping',
+        'B.Tech/BBA/MBA in Operations or related field'
+    ),
+    (
+        'Research Intern', 
+        'InnovateResearch', 
+        'Bhubaneswar, Odisha', 
+        'Conduct research on emerging technologies and market trends.',
+        'Research Methodology, Data Analysis',
+        '₹15,000 - ₹20,000 per month',
+        '6 months',
+        '2025-10-20',
+        'Research',
+        'Research Methods, Data Analysis, Academic Writing',
+        'Master\'s degree in relevant field'
+    ),
+    (
+        'Digital Marketing Intern', 
+        'DigitalEdge', 
+        'Jaipur, Rajasthan', 
+        'Gain hands-on experience in SEO, SEM, social media marketing, and analytics.',
+        'Digital Marketing Tools, Analytics',
+        '₹12,000 - ₹16,000 per month',
+        '3 months',
+        '2025-09-30',
+        'Digital Marketing',
+        'Google Analytics, SEO, SEM, Social Media Marketing',
+        'Bachelor\'s degree in Marketing or related field'
+    ),
+    (
+        'Mechanical Engineering Intern', 
+        'EngineTech Solutions', 
+        'Coimbatore, Tamil Nadu', 
+        'Work on mechanical design and product development projects.',
+        'CAD Software, Mechanical Design',
+        '₹15,000 - ₹20,000 per month',
+        '6 months',
+        '2025-10-15',
+        'Engineering',
+        'AutoCAD, SolidWorks, Mechanical Design',
+        'B.Tech/B.E. in Mechanical Engineering'
+    ),
+    (
+        'Electrical Engineering Intern', 
+        'PowerGrid Solutions', 
+        'Vadodara, Gujarat', 
+        'Assist in electrical system design and implementation.',
+        'Electrical Circuit Design, Power Systems',
+        '₹15,000 - ₹20,000 per month',
+        '4 months',
+        '2025-09-25',
+        'Engineering',
+        'Electrical Design, Circuit Analysis, AutoCAD Electrical',
+        'B.Tech/B.E. in Electrical Engineering'
+    ),
+    (
+        'Civil Engineering Intern', 
+        'BuildRight Constructions', 
+        'Lucknow, Uttar Pradesh', 
+        'Gain experience in construction project management and structural design.',
+        'Structural Analysis, Construction Management',
+        '₹14,000 - ₹18,000 per month',
+        '6 months',
+        '2025-10-10',
+        'Engineering',
+        'AutoCAD, Structural Analysis, Construction Management',
+        'B.Tech/B.E. in Civil Engineering'
+    ),
+    (
+        'Biotechnology Intern', 
+        'BioInnovate Research', 
+        'Mysore, Karnataka', 
+        'Work on biotechnology research projects and laboratory techniques.',
+        'Laboratory Skills, Research Methodology',
+        '₹15,000 - ₹20,000 per month',
+        '6 months',
+        '2025-09-30',
+        'Biotechnology',
+        'Laboratory Techniques, Research Methods, Data Analysis',
+        'B.Tech/B.Sc/M.Sc in Biotechnology or related field'
+    ),
+    (
+        'Graphic Design Intern', 
+        'CreativeVision', 
+        'Indore, Madhya Pradesh', 
+        'Create visual content for various media including print and digital platforms.',
+        'Graphic Design Tools, Visual Communication',
+        '₹12,000 - ₹16,000 per month',
+        '3 months',
+        '2025-10-05',
+        'Design',
+        'Adobe Creative Suite, Visual Design, Typography',
+        'Bachelor\'s degree in Graphic Design or related field'
+    )
+]
+
+# Column order of the tuples in SAMPLE_INTERNSHIPS
+SAMPLE_COLUMNS = (
+    'title', 'company', 'location', 'description', 'requirements', 'stipend',
+    'duration', 'deadline', 'sector', 'skills_required', 'education_required',
+)
+
 def insert_sample_data(db):
     """Insert sample internships into the database."""
-    internships = [
-        (
-            'Software Development Intern', 
-            'TechCorp India', 
-            'Bangalore, Karnataka', 
-            'Join our team to develop cutting-edge web applications using modern technologies.',
-            'Python, JavaScript, React, Node.js',
-            '₹15,000 - ₹20,000 per month',
-            '3 months',
-            '2025-10-15',
-            'Information Technology',
-            'Python, JavaScript, React, Node.js, Git',
-            'B.Tech/B.E. in Computer Science or related field'
-        ),
-        (
-            'Data Science Intern', 
-            'Analytics Hub', 
-            'Hyderabad, Telangana', 
-            'Work on real-world data science projects and gain hands-on experience with machine learning models.',
-            'Python, Statistics, Machine Learning',
-            '₹18,000 - ₹25,000 per month',
-            '6 months',
-            '2025-09-30',
-            'Data Science',
-            'Python, Pandas, NumPy, Scikit-learn, SQL',
-            'B.Tech/B.E./M.Tech in Computer Science, Statistics, or Mathematics'
-        ),
-        (
-            'Marketing Intern', 
-            'BrandMasters', 
-            'Mumbai, Maharashtra', 
-            'Assist in developing and implementing marketing strategies for various clients.',
-            'Social Media Marketing, Content Creation',
-            '₹12,000 - ₹15,000 per month',
-            '3 months',
-            '2025-10-05',
-            'Marketing',
-            'Social Media, Content Writing, Adobe Creative Suite',
-            'BBA/MBA in Marketing or related field'
-        ),
-        (
-            'Finance Intern', 
-            'FinSecure Solutions', 
-            'Delhi, NCR', 
-            'Learn financial analysis, reporting, and investment strategies in a fast-paced environment.',
-            'Financial Analysis, Excel, Accounting',
-            '₹15,000 - ₹18,000 per month',
-            '4 months',
-            '2025-09-25',
-            'Finance',
-            'Excel, Financial Modeling, Accounting Principles',
-            'B.Com/BBA/MBA in Finance or related field'
-        ),
-        (
-            'UI/UX Design Intern', 
-            'DesignWave', 
-            'Pune, Maharashtra', 
-            'Create user-centered designs for web and mobile applications.',
-            'UI Design, UX Research, Prototyping',
-            '₹15,000 - ₹20,000 per month',
-            '3 months',
-            '2025-10-10',
-            'Design',
-            'Figma, Adobe XD, Sketch, User Research',
-            'Bachelor\'s degree in Design, HCI, or related field'
-        ),
-        (
-            'Content Writing Intern', 
-            'ContentCraft', 
-            'Chennai, Tamil Nadu', 
-            'Develop engaging content for various platforms including blogs, social media, and websites.',
-            'Content Writing, SEO Knowledge',
-            '₹10,000 - ₹15,000 per month',
-            '3 months',
-            '2025-09-20',
-            'Content',
-            'Content Writing, SEO, Social Media',
-            'Bachelor\'s degree in English, Journalism, or related field'
-        ),
-        (
-            'HR Intern', 
-            'PeopleFirst', 
-            'Kolkata, West Bengal', 
-            'Assist in recruitment, employee engagement, and HR operations.',
-            'HR Processes, Communication Skills',
-            '₹12,000 - ₹15,000 per month',
-            '4 months',
-            '2025-10-01',
-            'Human Resources',
-            'MS Office, Communication, HR Processes',
-            'BBA/MBA in HR or related field'
-        ),
-        (
-            'Operations Intern', 
-            'SupplyChain Pro', 
-            'Ahmedabad, Gujarat', 
-            'Learn about supply chain management and operations optimization.',
-            'Analytical Skills, Process Optimization',
-            '₹14,000 - ₹18,000 per month',
-            '6 months',
-            '2025-09-15',
-            'Operations',
-            'Excel, Data Analysis, Process Mapping',
-            'B.Tech/BBA/MBA in Operations or related field'
-        ),
-        (
-            'Research Intern', 
-            'InnovateResearch', 
-            'Bhubaneswar, Odisha', 
-            'Conduct research on emerging technologies and market trends.',
-            'Research Methodology, Data Analysis',
-            '₹15,000 - ₹20,000 per month',
-            '6 months',
-            '2025-10-20',
-            'Research',
-            'Research Methods, Data Analysis, Academic Writing',
-            'Master\'s degree in relevant field'
-        ),
-        (
-            'Digital Marketing Intern', 
-            'DigitalEdge', 
-            'Jaipur, Rajasthan', 
-            'Gain hands-on experience in SEO, SEM, social media marketing, and analytics.',
-            'Digital Marketing Tools, Analytics',
-            '₹12,000 - ₹16,000 per month',
-            '3 months',
-            '2025-09-30',
-            'Digital Marketing',
-            'Google Analytics, SEO, SEM, Social Media Marketing',
-            'Bachelor\'s degree in Marketing or related field'
-        ),
-        (
-            'Mechanical Engineering Intern', 
-            'EngineTech Solutions', 
-            'Coimbatore, Tamil Nadu', 
-            'Work on mechanical design and product development projects.',
-            'CAD Software, Mechanical Design',
-            '₹15,000 - ₹20,000 per month',
-            '6 months',
-            '2025-10-15',
-            'Engineering',
-            'AutoCAD, SolidWorks, Mechanical Design',
-            'B.Tech/B.E. in Mechanical Engineering'
-        ),
-        (
-            'Electrical Engineering Intern', 
-            'PowerGrid Solutions', 
-            'Vadodara, Gujarat', 
-            'Assist in electrical system design and implementation.',
-            'Electrical Circuit Design, Power Systems',
-            '₹15,000 - ₹20,000 per month',
-            '4 months',
-            '2025-09-25',
-            'Engineering',
-            'Electrical Design, Circuit Analysis, AutoCAD Electrical',
-            'B.Tech/B.E. in Electrical Engineering'
-        ),
-        (
-            'Civil Engineering Intern', 
-            'BuildRight Constructions', 
-            'Lucknow, Uttar Pradesh', 
-            'Gain experience in construction project management and structural design.',
-            'Structural Analysis, Construction Management',
-            '₹14,000 - ₹18,000 per month',
-            '6 months',
-            '2025-10-10',
-            'Engineering',
-            'AutoCAD, Structural Analysis, Construction Management',
-            'B.Tech/B.E. in Civil Engineering'
-        ),
-        (
-            'Biotechnology Intern', 
-            'BioInnovate Research', 
-            'Mysore, Karnataka', 
-            'Work on biotechnology research projects and laboratory techniques.',
-            'Laboratory Skills, Research Methodology',
-            '₹15,000 - ₹20,000 per month',
-            '6 months',
-            '2025-09-30',
-            'Biotechnology',
-            'Laboratory Techniques, Research Methods, Data Analysis',
-            'B.Tech/B.Sc/M.Sc in Biotechnology or related field'
-        ),
-        (
-            'Graphic Design Intern', 
-            'CreativeVision', 
-            'Indore, Madhya Pradesh', 
-            'Create visual content for various media including print and digital platforms.',
-            'Graphic Design Tools, Visual Communication',
-            '₹12,000 - ₹16,000 per month',
-            '3 months',
-            '2025-10-05',
-            'Design',
-            'Adobe Creative Suite, Visual Design, Typography',
-            'Bachelor\'s degree in Graphic Design or related field'
-        )
-    ]
+    internships = SAMPLE_INTERNSHIPS
+    columns = SAMPLE_COLUMNS + INTERNSHIP_FEATURE_COLUMNS
     
     for internship in internships:
+        features = internship_feature_values(dict(zip(SAMPLE_COLUMNS, internship)))
         db.execute(
-            '''INSERT INTO internships 
-               (title, company, location, description, requirements, stipend, duration, deadline, sector, skills_required, education_required) 
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-            internship
+            '''INSERT INTO internships ({}) VALUES ({})'''.format(
+                ', '.join(columns), ', '.join('?' for _ in columns)
+            ),
+            internship + features
         )
     
     print(f"Added {len(internships)} sample internships to the database")
 
 if __name__ == "__main__":
-    init_db()
\ No newline at end of file
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Initialize and maintain the database.')
+    parser.add_argument('--check-plans', action='store_true',
+                        help='fail if a hot query plan uses a full table scan')
+    parser.add_argument('--gc-uploads', metavar='FOLDER', nargs='?', const='static/uploads',
+                        help='delete uploaded files no longer referenced')
+    parser.add_argument('--sync-external', action='store_true',
+                        help='fetch the external providers once and upsert their listings')
+    parser.add_argument('--archive-expired', action='store_true',
+                        help='move internships past their deadline into internships_archive')
+    parser.add_argument('--warm-recommendations', action='store_true',
+                        help='precompute stored recommendations for every complete profile')
+    args = parser.parse_args()
+
+    init_db()
+
+    if args.sync_external:
+        from services.ingestion import IngestionWorker
+
+        changed, expired = IngestionWorker(database=DATABASE).run_once()
+        print(f"External sync: {len(changed)} changed, {len(expired)} expired")
+
+    if args.archive_expired:
+        from services.lifecycle import archive_expired
+
+        conn = connect(DATABASE)
+        archived = archive_expired(conn)
+        conn.close()
+        print(f"Archived {archived} expired internships")
+
+    if args.warm_recommendations:
+        from services.recommendation_engine import RecommendationEngine
+        from services.recommendation_store import warm_recommendations
+
+        conn = connect(DATABASE)
+        warmed = warm_recommendations(conn, RecommendationEngine())
+        conn.close()
+        print(f"Stored recommendations for {warmed} users")
+
+    if args.gc_uploads:
+        from utils.helpers import collect_unreferenced_blobs
+
+        conn = connect(DATABASE)
+        removed = collect_unreferenced_blobs(conn, args.gc_uploads)
+        conn.close()
+        print(f"Removed {len(removed)} unreferenced uploads")
+
+    if args.check_plans:
+        conn = connect(DATABASE)
+        failures = check_query_plans(conn)
+        conn.close()
+        for name, plan in failures.items():
+            print(f"Full table scan in {name}: {'; '.join(plan)}")
+        sys.exit(1 if failures else 0)
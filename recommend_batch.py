@@ -0,0 +1,69 @@
+"""Offline batch recommendations.
+
+    python recommend_batch.py --all --output recommendations.ndjson
+    python recommend_batch.py --user-ids ids.txt --workers 8 --limit 10
+
+Writes one NDJSON line per user in the same format as
+POST /api/recommendations/batch.
+"""
+import argparse
+import sys
+import time
+
+from init_db import DATABASE, connect
+from services.batch_recommendations import BATCH_WORKERS, BatchRecommender, iter_ndjson
+from services.recommendation_engine import RecommendationEngine
+
+
+def read_user_ids(path):
+    """Read one user id per line ('-' for stdin), skipping blank lines."""
+    stream = sys.stdin if path == '-' else open(path)
+    try:
+        return [int(line) for line in stream if line.strip()]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Score many users at once and write NDJSON.')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--all', action='store_true',
+                        help='every user with skills and interests filled in')
+    source.add_argument('--user-ids', metavar='FILE',
+                        help="file with one user id per line, or '-' for stdin")
+    parser.add_argument('--limit', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=BATCH_WORKERS)
+    parser.add_argument('--database', default=DATABASE)
+    parser.add_argument('--output', default='-', help="output file, or '-' for stdout")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.database)
+    if args.all:
+        user_ids = [row[0] for row in conn.execute(
+            'SELECT id FROM users WHERE skills IS NOT NULL AND interests IS NOT NULL ORDER BY id'
+        )]
+    else:
+        user_ids = read_user_ids(args.user_ids)
+
+    recommender = BatchRecommender(RecommendationEngine(), workers=args.workers)
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    started = time.perf_counter()
+    written = 0
+    try:
+        for line in iter_ndjson(recommender, conn, user_ids, args.limit):
+            out.write(line)
+            written += 1
+    finally:
+        recommender.shutdown()
+        conn.close()
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Scored {written} users in {elapsed:.2f}s "
+          f"({written / elapsed if elapsed else 0:.0f} users/s)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+import json
+from datetime import datetime
+
+# Applications kept in the dashboard's "recent" list
+RECENT_LIMIT = 5
+
+# Columns copied into each recent-application entry
+RECENT_FIELDS = (
+    'id', 'internship_id', 'status', 'applied_date', 'last_updated', 'title', 'company',
+)
+
+
+def get_stats(db, user_id):
+    """Return (status_counts, recent_applications) with one primary-key lookup."""
+    row = db.execute(
+        '''SELECT status_counts, recent_applications
+           FROM user_application_stats
+           WHERE user_id = ?''',
+        (user_id,)
+    ).fetchone()
+    if row is None:
+        return {}, []
+    return json.loads(row['status_counts']), json.loads(row['recent_applications'])
+
+
+def _save(db, user_id, counts, recent):
+    db.execute(
+        '''INSERT OR REPLACE INTO user_application_stats
+           (user_id, status_counts, recent_applications, updated_at)
+           VALUES (?, ?, ?, CURRENT_TIMESTAMP)''',
+        (user_id, json.dumps(counts), json.dumps(recent))
+    )
+
+
+def record_application(db, application_id):
+    """Fold a newly inserted application into its user's stats.
+
+    Call it after the INSERT and before the commit, so the counters change
+    in the same transaction (which already holds the write lock).
+    """
+    application = db.execute(
+        '''SELECT a.*, i.title, i.company
+           FROM applications a
+           JOIN all_internships i ON a.internship_id = i.id
+           WHERE a.id = ?''',
+        (application_id,)
+    ).fetchone()
+    user_id = application['user_id']
+    counts, recent = get_stats(db, user_id)
+
+    counts[application['status']] = counts.get(application['status'], 0) + 1
+    recent.insert(0, {field: application[field] for field in RECENT_FIELDS})
+    recent.sort(key=lambda entry: (entry['applied_date'] or '', entry['id']), reverse=True)
+    _save(db, user_id, counts, recent[:RECENT_LIMIT])
+
+
+def update_status(db, application_id, status):
+    """Change an application's status and keep the stats in step.
+
+    The caller commits, like record_application.
+    """
+    application = db.execute(
+        'SELECT user_id, status FROM applications WHERE id = ?', (application_id,)
+    ).fetchone()
+    if application is None or application['status'] == status:
+        return False
+
+    # Only apply the change if nobody else changed the status meanwhile
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    old_status = application['status']
+    updated = db.execute(
+        'UPDATE applications SET status = ?, last_updated = ? WHERE id = ? AND status = ?',
+        (status, now, application_id, old_status)
+    ).rowcount
+    if not updated:
+        return False
+
+    user_id = application['user_id']
+    counts, recent = get_stats(db, user_id)
+    counts[old_status] = counts.get(old_status, 0) - 1
+    if counts[old_status] <= 0:
+        del counts[old_status]
+    counts[status] = counts.get(status, 0) + 1
+    for entry in recent:
+        if entry['id'] == application_id:
+            entry['status'] = status
+            entry['last_updated'] = now
+    _save(db, user_id, counts, recent)
+    return True
@@ -0,0 +1,320 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+
+from utils.metrics import EXTERNAL_FETCH_ERRORS, EXTERNAL_FETCH_SECONDS
+
+from services.external_api import (
+    EXTERNAL_API_URL,
+    RAPIDAPI_HOST,
+    RAPIDAPI_KEY,
+    normalize_internship,
+)
+
+# Fetcher defaults (seconds unless noted)
+PROVIDER_TIMEOUT = float(os.environ.get('EXTERNAL_PROVIDER_TIMEOUT', '5'))
+PROVIDER_MAX_PAGES = int(os.environ.get('EXTERNAL_MAX_PAGES', '10'))
+MAX_CONCURRENCY = int(os.environ.get('EXTERNAL_MAX_CONCURRENCY', '8'))
+MAX_RETRIES = 2
+BACKOFF_BASE = 0.2
+BACKOFF_MAX = 2.0
+BREAKER_THRESHOLD = 5
+BREAKER_RESET = 60.0
+
+
+class CircuitOpenError(Exception):
+    """Raised when a provider's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures; retries after `reset_timeout`.
+
+    Once the timeout has passed the breaker is half-open: allow() admits a
+    single probe, and its outcome closes or re-opens the breaker.  Used
+    from the fetcher's event loop only, so it needs no lock.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset_timeout=BREAKER_RESET,
+                 clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        """Whether a call may go through (half-open lets one probe through)."""
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'half-open' and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold or self.probing:
+            self.opened_at = self.clock()
+        self.probing = False
+
+    def release_probe(self):
+        """Let another probe through after one ended without a result (e.g. cancelled)."""
+        self.probing = False
+
+
+def _retryable(error):
+    """Timeouts, connection errors, 429 and 5xx are worth retrying; other errors are not."""
+    import aiohttp
+
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+
+class Provider:
+    """An external internship source."""
+
+    def __init__(self, name, url, headers=None, params=None, timeout=PROVIDER_TIMEOUT,
+                 page_size=100, max_pages=1, normalize=normalize_internship):
+        self.name = name
+        self.url = url
+        self.headers = headers or {}
+        self.params = params or {}
+        self.timeout = timeout
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.normalize = normalize
+
+
+def providers_from_env():
+    """Build providers from the RapidAPI settings and EXTERNAL_PROVIDERS.
+
+    EXTERNAL_PROVIDERS is an optional JSON list of objects with `name`,
+    `url` and optionally `headers`, `params`, `timeout` and `max_pages`.
+    """
+    providers = []
+    if RAPIDAPI_KEY or not EXTERNAL_API_URL.startswith('https://internships-api.p.rapidapi.com'):
+        providers.append(Provider(
+            'rapidapi',
+            EXTERNAL_API_URL,
+            headers={'X-RapidAPI-Key': RAPIDAPI_KEY, 'X-RapidAPI-Host': RAPIDAPI_HOST},
+            max_pages=PROVIDER_MAX_PAGES,
+        ))
+    for config in json.loads(os.environ.get('EXTERNAL_PROVIDERS', '[]')):
+        providers.append(Provider(**config))
+    return providers
+
+
+class FetchResult(list):
+    """Merged internships plus whether every provider finished successfully."""
+
+    def __init__(self, internships=(), complete=True):
+        super().__init__(internships)
+        self.complete = complete
+
+
+def merge_results(results):
+    """Concatenate (provider, internships) results, keeping the first listing per id.
+
+    Providers number their listings independently, so the same
+    external_id from two providers names two different listings.
+    """
+    merged = {}
+    for provider, internships in results:
+        for internship in internships:
+            merged.setdefault((provider, internship['external_id']), internship)
+    return list(merged.values())
+
+
+class AsyncFetcher:
+    """Concurrent multi-provider fetcher with retries and circuit breakers.
+
+    All providers are queried concurrently over one pooled keep-alive
+    session.  fetch_all() returns whatever arrived within the latency
+    budget; slower providers are cancelled.  fetch() is a blocking wrapper
+    for synchronous callers that runs the coroutine on a background loop.
+    """
+
+    def __init__(self, providers, concurrency=MAX_CONCURRENCY, retries=MAX_RETRIES,
+                 backoff=BACKOFF_BASE, breaker_threshold=BREAKER_THRESHOLD,
+                 breaker_reset=BREAKER_RESET):
+        self.providers = list(providers)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.breakers = {
+            p.name: CircuitBreaker(breaker_threshold, breaker_reset) for p in self.providers
+        }
+        self._session = None
+        self._semaphore = None
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    async def _get_session(self):
+        # Imported on first fetch so web workers that never sync skip it
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    async def _get_json(self, session, provider, params):
+        """GET one page with retries and jittered exponential backoff."""
+        import aiohttp
+
+        breaker = self.breakers[provider.name]
+        attempt = 0
+        while True:
+            probe = breaker.state == 'half-open'
+            if not breaker.allow():
+                EXTERNAL_FETCH_ERRORS.inc(provider=provider.name, error='circuit_open')
+                raise CircuitOpenError(provider.name)
+            started = time.perf_counter()
+            try:
+                async with self._semaphore:
+                    async with session.get(
+                        provider.url,
+                        headers=provider.headers,
+                        params=params,
+                        timeout=aiohttp.ClientTimeout(total=provider.timeout),
+                    ) as response:
+                        response.raise_for_status()
+                        data = await response.json(content_type=None)
+                breaker.record_success()
+                EXTERNAL_FETCH_SECONDS.observe(time.perf_counter() - started, provider=provider.name)
+                return data
+            except asyncio.CancelledError:
+                # Cut off by the fetch budget; the probe never got an answer
+                if probe:
+                    breaker.release_probe()
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                EXTERNAL_FETCH_SECONDS.observe(time.perf_counter() - started, provider=provider.name)
+                EXTERNAL_FETCH_ERRORS.inc(provider=provider.name, error=type(e).__name__)
+                if not _retryable(e):
+                    # The provider answered; retrying the same request will not help
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                if attempt >= self.retries:
+                    raise
+                delay = min(BACKOFF_MAX, self.backoff * 2 ** attempt)
+                await asyncio.sleep(random.uniform(0, delay))
+                attempt += 1
+
+    async def _fetch_provider(self, session, provider, collected):
+        """Fetch every page from one provider into `collected`.
+
+        Returns False when max_pages was reached with more pages likely left.
+        """
+        for page in range(provider.max_pages):
+            params = dict(provider.params)
+            if provider.max_pages > 1:
+                params.update(offset=page * provider.page_size, limit=provider.page_size)
+            data = await self._get_json(session, provider, params)
+            if isinstance(data, dict):
+                data = data.get('data') or data.get('results') or []
+            items = [provider.normalize(item) for item in data if item]
+            # Listings without an id cannot be upserted or expired, so they
+            # are dropped; the rest are namespaced so providers' ids cannot
+            # collide on the external_id index
+            for item in items:
+                if item.get('external_id'):
+                    item['external_id'] = f"{provider.name}:{item['external_id']}"
+                    collected.append(item)
+            if len(items) < provider.page_size:
+                return True
+        return False
+
+    async def fetch_all(self, budget):
+        """Query every provider and return the merged results within `budget`."""
+        session = await self._get_session()
+        collected = {p.name: [] for p in self.providers}
+        tasks = {
+            asyncio.ensure_future(self._fetch_provider(session, p, collected[p.name])): p
+            for p in self.providers
+        }
+        if not tasks:
+            return FetchResult()
+
+        done, pending = await asyncio.wait(tasks, timeout=budget)
+        complete = not pending
+        for task in pending:
+            task.cancel()
+        for task in done:
+            if task.exception() is not None:
+                complete = False
+                print(f"Error fetching from {tasks[task].name}: {task.exception()!r}")
+            elif not task.result():
+                complete = False
+
+        # Pages that arrived before the deadline are kept even for slow providers
+        return FetchResult(
+            merge_results((p.name, collected[p.name]) for p in self.providers),
+            complete=complete
+        )
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name='external-fetcher', daemon=True
+                )
+                self._thread.start()
+        return self._loop
+
+    def fetch(self, budget):
+        """Blocking fetch_all() that never waits much longer than `budget`."""
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self.fetch_all(budget), loop)
+        try:
+            return future.result(timeout=budget + 0.5)
+        except TimeoutError:
+            future.cancel()
+            return FetchResult(complete=False)
+
+    def close(self):
+        """Close the HTTP session and stop the background loop."""
+        if self._loop is None:
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop = None
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher():
+    """Return the process-wide fetcher for the configured providers."""
+    global _fetcher
+    if _fetcher is None:
+        with _fetcher_lock:
+            if _fetcher is None:
+                _fetcher = AsyncFetcher(providers_from_env())
+    return _fetcher
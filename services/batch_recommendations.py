@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from services.recommendation_engine import RecommendationEngine
+
+BATCH_WORKERS = int(os.environ.get('BATCH_RECOMMEND_WORKERS', str(os.cpu_count() or 2)))
+# Users sent to a worker process at a time
+CHUNK_SIZE = 200
+# Most user ids accepted by one /api/recommendations/batch call
+MAX_BATCH_USERS = 10000
+
+RESULT_FIELDS = (
+    'id', 'title', 'company', 'location', 'description', 'requirements',
+    'stipend', 'duration', 'deadline',
+)
+
+# Per-process state for pool workers, set by _init_worker
+_worker_scorer = None
+_worker_engine = None
+
+
+def format_recommendation(internship, score):
+    """API representation of one recommended internship."""
+    result = {field: internship[field] for field in RESULT_FIELDS}
+    result['match_score'] = score
+    result['match_reason'] = internship.get('match_reason', 'Good match based on your profile')
+    return result
+
+
+def _init_worker(scorer_class, source):
+    global _worker_scorer, _worker_engine
+    # A BatchScorer is rebuilt from rows, a CatalogSnapshot maps its file
+    _worker_scorer = scorer_class.load(source)
+    _worker_engine = RecommendationEngine()
+
+
+def _score_chunk(users, limit):
+    results = _worker_scorer.recommend_many(users, _worker_engine, limit)
+    return [(user['id'], results[user['id']]) for user in users]
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class BatchRecommender:
+    """Scores many users against one catalog snapshot across CPU cores.
+
+    Worker processes load their scorer once from the catalog they were
+    started with; the pool is replaced when the engine's catalog
+    changes.  With one worker (or a small batch) scoring runs inline.
+    """
+
+    def __init__(self, engine, workers=BATCH_WORKERS, chunk_size=CHUNK_SIZE):
+        self.engine = engine
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._pool = None
+        self._pool_scorer = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self, scorer):
+        # Created lazily so each forked web worker gets its own pool
+        with self._lock:
+            if self._pool_scorer is not scorer:
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_worker,
+                    initargs=(type(scorer), scorer.source)
+                )
+                self._pool_scorer = scorer
+            return self._pool
+
+    def iter_recommendations(self, users, limit=5):
+        """Yield (user_id, [(internship, score), ...]) in the order of `users`."""
+        scorer = self.engine.batch_scorer()
+        users = [dict(user) for user in users]
+
+        if self.workers <= 1 or len(users) <= self.chunk_size:
+            for chunk in _chunks(users, self.chunk_size):
+                results = scorer.recommend_many(chunk, self.engine, limit)
+                for user in chunk:
+                    yield user['id'], results[user['id']]
+            return
+
+        pool = self._get_pool(scorer)
+        chunks = pool.map(partial(_score_chunk, limit=limit), _chunks(users, self.chunk_size))
+        for chunk in chunks:
+            yield from chunk
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+                self._pool_scorer = None
+
+
+def load_users(db, user_ids):
+    """Fetch users by id, keyed by id; missing ids are left out."""
+    users = {}
+    # Stay well under SQLite's bound-parameter limit
+    for chunk in _chunks(list(user_ids), 500):
+        placeholders = ', '.join('?' * len(chunk))
+        for row in db.execute(f'SELECT * FROM users WHERE id IN ({placeholders})', chunk):
+            users[row['id']] = row
+    return users
+
+
+def iter_ndjson(recommender, db, user_ids, limit=5):
+    """Yield one NDJSON line per distinct user id.
+
+    Unknown ids are reported first; the rest follow in request order.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    recommender.engine.refresh(db)
+    users = load_users(db, user_ids)
+
+    found = []
+    for user_id in user_ids:
+        if user_id not in users:
+            yield json.dumps({'user_id': user_id, 'error': 'User not found'}) + '\n'
+        else:
+            found.append(users[user_id])
+
+    for user_id, recommendations in recommender.iter_recommendations(found, limit):
+        yield json.dumps({
+            'user_id': user_id,
+            'recommendations': [
+                format_recommendation(internship, score)
+                for internship, score in recommendations
+            ]
+        }) + '\n'
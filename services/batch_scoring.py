@@ -0,0 +1,283 @@
+from datetime import date
+
+import numpy as np
+
+from services.geo import EARTH_RADIUS_KM, HALF_CREDIT_KM, NEARBY_KM, SAME_CITY_KM
+from services.recommendation_engine import (
+    EDUCATION_WEIGHT,
+    LOCATION_WEIGHT,
+    SAME_STATE_CREDIT,
+    SECTOR_WEIGHT,
+    SKILL_WEIGHT,
+    internship_features,
+    user_features,
+)
+
+# Day number of listings that never expire
+OPEN_DEADLINE_DAYS = date.max.toordinal()
+
+def _encode(values, vocab):
+    """Map each value to an integer id, growing the vocabulary as needed."""
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        codes[i] = vocab.setdefault(value, len(vocab))
+    return codes
+
+
+def _deadline_days(internship):
+    """deadline_date as a day number, so expiry can be checked on arrays."""
+    deadline = internship.get('deadline_date')
+    if not deadline:
+        return OPEN_DEADLINE_DAYS
+    return min(date.fromisoformat(deadline).toordinal(), OPEN_DEADLINE_DAYS)
+
+
+def _token_pairs(token_sets, vocab):
+    """(row, token id) for every token of every row, as two int arrays."""
+    rows = []
+    token_ids = []
+    for row, tokens in enumerate(token_sets):
+        for token in tokens:
+            rows.append(row)
+            token_ids.append(vocab[token])
+    return np.array(rows, dtype=np.int32), np.array(token_ids, dtype=np.int64)
+
+
+def _postings(token_sets, vocab):
+    """Posting lists in CSR form: token t occurs in rows[offsets[t]:offsets[t + 1]]."""
+    rows, token_ids = _token_pairs(token_sets, vocab)
+    order = np.lexsort((rows, token_ids))
+    counts = np.bincount(token_ids, minlength=len(vocab))
+    offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets, rows[order]
+
+
+class BatchScorer:
+    """Scores a whole catalog at once from NumPy arrays.
+
+    The catalog is encoded once: every token gets a posting list of the
+    rows it occurs in (and of the rows requiring it as a skill), sector,
+    location and education become integer codes, and coordinates become
+    radian arrays plus a latitude-sorted order for vectorized distances.
+    Only the rows reached through the user's posting lists or the
+    latitude band around them are scored, so the cost follows the number
+    of candidates rather than catalog size times vocabulary.  Scores
+    match RecommendationEngine.score_internship.
+    Scoring only reads the arrays and vocabularies set up here, so
+    CatalogSnapshot can provide them from a memory-mapped file instead.
+    """
+
+    def __init__(self, internships):
+        self.internships = [dict(i) for i in internships]
+        self.ids = np.array([i['id'] for i in self.internships], dtype=np.int64)
+        self.deadline_days = np.array(
+            [_deadline_days(i) for i in self.internships], dtype=np.int32
+        )
+
+        required_sets = []
+        all_sets = []
+        sectors = []
+        educations = []
+        cities = []
+        states = []
+        points = []
+        for internship in self.internships:
+            required, sector, education, (city, state, point) = internship_features(internship)
+            required_sets.append(required)
+            all_sets.append(required | sector | education)
+            sectors.append(frozenset(sector))
+            educations.append(frozenset(education))
+            cities.append(city)
+            states.append(state)
+            points.append(point or (np.nan, np.nan))
+
+        # Token vocabulary shared by both sets of posting lists
+        self.token_ids = {}
+        for tokens in all_sets:
+            for token in sorted(tokens):
+                self.token_ids.setdefault(token, len(self.token_ids))
+        self.posting_offsets, self.posting_rows = _postings(all_sets, self.token_ids)
+        self.skill_offsets, self.skill_rows = _postings(required_sets, self.token_ids)
+        self.required_counts = np.array(
+            [len(tokens) for tokens in required_sets], dtype=np.float64
+        )
+
+        # Sector and education codes, with the token set behind each code
+        sector_ids = {}
+        self.sector_codes = _encode(sectors, sector_ids)
+        self.sector_tokens = list(sector_ids)
+        education_ids = {}
+        self.education_codes = _encode(educations, education_ids)
+        self.education_tokens = list(education_ids)
+
+        # City and state share one vocabulary; -1 marks an empty part
+        self.place_ids = {}
+        self.city_codes = np.array(
+            [self.place_ids.setdefault(c, len(self.place_ids)) if c else -1
+             for c in cities], dtype=np.int32
+        )
+        self.state_codes = np.array(
+            [self.place_ids.setdefault(s, len(self.place_ids)) if s else -1
+             for s in states], dtype=np.int32
+        )
+
+        # Coordinates in radians; NaN where the place is unknown
+        coordinates = np.radians(np.array(points, dtype=np.float64).reshape(-1, 2))
+        self.latitudes = coordinates[:, 0]
+        self.longitudes = coordinates[:, 1]
+        self.cos_latitudes = np.cos(self.latitudes)
+        # Unknown (NaN) latitudes sort last and never fall inside a band
+        self.latitude_order = np.argsort(self.latitudes, kind='stable').astype(np.int32)
+        self.sorted_latitudes = self.latitudes[self.latitude_order]
+
+    @classmethod
+    def load(cls, source):
+        """Rebuild a scorer from `source`, e.g. in a pool worker process."""
+        return cls(source)
+
+    @property
+    def source(self):
+        """What load() needs to rebuild this scorer."""
+        return self.internships
+
+    def __len__(self):
+        return len(self.ids)
+
+    def internship(self, position):
+        """The catalog row at `position` as a dict."""
+        return dict(self.internships[position])
+
+    def _token_ids(self, tokens):
+        ids = [self.token_ids[t] for t in tokens if t in self.token_ids]
+        return np.array(ids, dtype=np.int64)
+
+    def _distances(self, point, positions):
+        """Great-circle distance in km from `point` to the internships at `positions`."""
+        lat, lon = np.radians(point)
+        a = (np.sin((self.latitudes[positions] - lat) / 2) ** 2
+             + np.cos(lat) * self.cos_latitudes[positions]
+             * np.sin((self.longitudes[positions] - lon) / 2) ** 2)
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    def _posting_rows(self, offsets, rows, tokens):
+        """Concatenated posting lists of `tokens`; a row repeats once per token."""
+        postings = [rows[offsets[t]:offsets[t + 1]] for t in self._token_ids(tokens)]
+        if not postings:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(postings).astype(np.int64)
+
+    def _token_candidates(self, tokens):
+        """Rows sharing at least one token, from the posting lists."""
+        return np.unique(self._posting_rows(self.posting_offsets, self.posting_rows, tokens))
+
+    def _nearby_candidates(self, point):
+        """Rows within NEARBY_KM of `point`, searching only its latitude band."""
+        lat = np.radians(point[0])
+        band = NEARBY_KM / EARTH_RADIUS_KM
+        start, end = np.searchsorted(self.sorted_latitudes, (lat - band, lat + band), side='left')
+        positions = np.sort(self.latitude_order[start:end]).astype(np.int64)
+        return positions[self._distances(point, positions) <= NEARBY_KM]
+
+    def _matching_codes(self, code_tokens, tokens):
+        """Boolean lookup table: does code i share a token with `tokens`?"""
+        return np.array(
+            [bool(t & tokens) for t in code_tokens] or [False], dtype=bool
+        )
+
+    def score(self, user):
+        """Return (positions, scores) arrays over the user's candidate rows."""
+        if len(self) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        skills, interests, education, (user_city, user_state, user_point) = user_features(user)
+
+        # Only internships sharing a token with the user or near them are candidates
+        positions = self._token_candidates(skills | interests | education)
+        if user_point is not None:
+            positions = np.union1d(positions, self._nearby_candidates(user_point))
+        # Listings whose deadline passed since the catalog was encoded
+        positions = positions[self.deadline_days[positions] >= date.today().toordinal()]
+
+        n = len(positions)
+        scores = np.zeros(n, dtype=np.float64)
+        if n == 0:
+            return positions, scores
+
+        # Skills match
+        if skills:
+            # A row appears in one skill posting list per required skill the user has
+            matched = np.bincount(
+                self._posting_rows(self.skill_offsets, self.skill_rows, skills),
+                minlength=len(self)
+            )[positions]
+            required_counts = self.required_counts[positions]
+            ratio = np.divide(
+                matched, required_counts,
+                out=np.zeros(n), where=required_counts > 0
+            )
+            scores += SKILL_WEIGHT * ratio
+
+        # Sector/interest alignment
+        sector_match = self._matching_codes(self.sector_tokens, interests)
+        scores += SECTOR_WEIGHT * sector_match[self.sector_codes[positions]]
+
+        # Location preference
+        city_code = self.place_ids.get(user_city, -2) if user_city else -2
+        state_code = self.place_ids.get(user_state, -2) if user_state else -2
+        city_codes = self.city_codes[positions]
+        state_codes = self.state_codes[positions]
+        credit = ((city_codes == city_code) | (state_codes == city_code)).astype(np.float64)
+        if user_point is not None:
+            distances = self._distances(user_point, positions)
+            # Same decay as geo.distance_credit
+            with np.errstate(invalid='ignore'):
+                decayed = np.where(
+                    distances <= SAME_CITY_KM, 1.0,
+                    0.5 ** ((distances - SAME_CITY_KM) / HALF_CREDIT_KM)
+                )
+                decayed[~(distances < NEARBY_KM)] = 0.0
+            credit = np.maximum(credit, decayed)
+        same_state = state_codes == state_code
+        credit = np.where(same_state & (credit < 1.0), np.maximum(credit, SAME_STATE_CREDIT), credit)
+        scores += LOCATION_WEIGHT * credit
+
+        # Education level
+        education_match = self._matching_codes(self.education_tokens, education)
+        scores += EDUCATION_WEIGHT * education_match[self.education_codes[positions]]
+
+        return positions, scores
+
+    def top_k(self, user, limit=5):
+        """Return the catalog positions of the top `limit` internships."""
+        positions, scores = self.score(user)
+        keep = scores > 0
+        positions, scores = positions[keep], scores[keep]
+        k = min(limit, len(scores))
+        if k <= 0:
+            return []
+
+        # Keep every row tied with the k-th best so ordering stays stable
+        if k < len(scores):
+            threshold = scores[np.argpartition(-scores, k - 1)[k - 1]]
+            tied = scores >= threshold
+            positions, scores = positions[tied], scores[tied]
+        order = np.lexsort((positions, -scores))[:k]
+        return [(int(positions[i]), float(scores[i])) for i in order]
+
+    def recommend(self, user, engine, limit=5):
+        """Top-k (internship, score) pairs in get_recommendations format."""
+        features = user_features(user)
+        result = []
+        for position, score in self.top_k(user, limit):
+            internship = self.internship(position)
+            _, internship['match_reason'] = engine.score_internship(user, internship, features)
+            result.append((internship, round(score, 2)))
+        return result
+
+    def recommend_many(self, users, engine, limit=5):
+        """Top-k recommendations for every user, keyed by user id."""
+        return {
+            user['id']: self.recommend(user, engine, limit)
+            for user in users
+        }
@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread-safe mapping that keeps the `max_entries` most recently used keys."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            return self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class _Entry:
+    """A cached value (or error) with its freshness deadlines."""
+
+    def __init__(self, value=None, error=None, fresh_until=0.0, stale_until=0.0):
+        self.value = value
+        self.error = error
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+
+class _Flight:
+    """An in-progress load that concurrent callers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class RefreshingCache:
+    """Thread-safe TTL cache with single-flight loads and stale-while-revalidate.
+
+    - Fresh entries (younger than `ttl`) are returned directly.
+    - Stale entries (younger than `ttl + stale_ttl`) are returned immediately
+      while one background thread reloads them.
+    - Concurrent misses for the same key share a single call to `loader`.
+    - Failures are cached for `error_ttl` seconds; if a stale value exists it
+      keeps being served instead of the error.
+    """
+
+    def __init__(self, ttl=300, stale_ttl=3600, error_ttl=30, clock=time.monotonic):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.error_ttl = error_ttl
+        self.clock = clock
+        self._entries = {}
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        """Return the cached value for `key`, calling `loader()` as needed."""
+        with self._lock:
+            now = self.clock()
+            entry = self._entries.get(key)
+
+            if entry is not None and now < entry.fresh_until:
+                if entry.error is not None:
+                    raise entry.error
+                return entry.value
+
+            if entry is not None and entry.error is None and now < entry.stale_until:
+                # Serve stale and revalidate in the background
+                if key not in self._flights:
+                    flight = self._flights[key] = _Flight()
+                    threading.Thread(
+                        target=self._load, args=(key, loader, flight), daemon=True
+                    ).start()
+                return entry.value
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if leader:
+            self._load(key, loader, flight)
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def _load(self, key, loader, flight):
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+
+        with self._lock:
+            now = self.clock()
+            previous = self._entries.get(key)
+            if flight.error is None:
+                self._entries[key] = _Entry(
+                    value=flight.value,
+                    fresh_until=now + self.ttl,
+                    stale_until=now + self.ttl + self.stale_ttl,
+                )
+            elif previous is not None and previous.error is None and now < previous.stale_until:
+                # Keep serving the stale value; retry after error_ttl
+                previous.fresh_until = now + self.error_ttl
+                flight.value, flight.error = previous.value, None
+            else:
+                self._entries[key] = _Entry(
+                    error=flight.error,
+                    fresh_until=now + self.error_ttl,
+                )
+            del self._flights[key]
+        flight.done.set()
+
+    def invalidate(self, key=None):
+        """Drop one key, or every key when `key` is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
@@ -0,0 +1,168 @@
+import json
+from datetime import date
+
+from services.features import parse_deadline
+from services.geo import bounding_box, resolve
+from services.recommendation_engine import location_parts
+
+# Fields exposed by the internships API, in output order
+API_FIELDS = (
+    'id', 'title', 'company', 'location', 'description', 'requirements',
+    'stipend', 'duration', 'deadline',
+)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Radius used by `near` when `radius_km` is not given
+DEFAULT_RADIUS_KM = 50
+MAX_RADIUS_KM = 1000
+
+# Rows fetched per round trip while streaming
+STREAM_BATCH_SIZE = 500
+
+
+class ListingQuery:
+    """Keyset-paginated, filterable query over active internships."""
+
+    def __init__(self, after=0, limit=DEFAULT_PAGE_SIZE, sector=None, location=None,
+                 deadline_after=None, deadline_before=None, min_stipend=None,
+                 max_duration=None, near=None, radius_km=DEFAULT_RADIUS_KM,
+                 fields=API_FIELDS):
+        self.after = after
+        self.limit = limit
+        self.sector = sector
+        self.location = location
+        self.deadline_after = deadline_after
+        self.deadline_before = deadline_before
+        self.min_stipend = min_stipend
+        self.max_duration = max_duration
+        # (lat, lon) from the gazetteer
+        self.near = near
+        self.radius_km = radius_km
+        self.fields = fields
+
+    @classmethod
+    def from_args(cls, args, max_limit=MAX_PAGE_SIZE):
+        """Build a query from request arguments; raises ValueError when invalid."""
+        after = args.get('after', 0, type=int)
+        limit = args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        if limit is None or limit < 1:
+            raise ValueError('limit must be a positive integer')
+        min_stipend = args.get('min_stipend', type=int)
+        if 'min_stipend' in args and min_stipend is None:
+            raise ValueError('min_stipend must be an integer')
+        max_duration = args.get('max_duration', type=int)
+        if 'max_duration' in args and max_duration is None:
+            raise ValueError('max_duration must be an integer')
+        deadlines = {}
+        for name in ('deadline_after', 'deadline_before'):
+            if args.get(name):
+                deadlines[name] = parse_deadline(args[name])
+                if deadlines[name] is None:
+                    raise ValueError(f'{name} must be a date (YYYY-MM-DD)')
+        near = None
+        if args.get('near'):
+            near = resolve(*location_parts(args['near']))
+            if near is None:
+                raise ValueError('Unknown place: ' + args['near'])
+        radius_km = args.get('radius_km', DEFAULT_RADIUS_KM, type=float)
+        if radius_km is None or not 0 < radius_km <= MAX_RADIUS_KM:
+            raise ValueError(f'radius_km must be between 0 and {MAX_RADIUS_KM}')
+        if max_limit is not None:
+            limit = min(limit, max_limit)
+
+        fields = API_FIELDS
+        if args.get('fields'):
+            fields = tuple(f.strip() for f in args['fields'].split(',') if f.strip())
+            unknown = [f for f in fields if f not in API_FIELDS]
+            if unknown:
+                raise ValueError('Unknown fields: ' + ', '.join(unknown))
+            if 'id' not in fields:
+                # The cursor is always derived from id
+                fields = ('id',) + fields
+
+        return cls(
+            after=after or 0,
+            limit=limit,
+            sector=args.get('sector') or None,
+            location=args.get('location') or None,
+            deadline_after=deadlines.get('deadline_after'),
+            deadline_before=deadlines.get('deadline_before'),
+            min_stipend=min_stipend,
+            max_duration=max_duration,
+            near=near,
+            radius_km=radius_km,
+            fields=fields,
+        )
+
+    def sql(self, after, limit):
+        """Return (sql, params) for the page that starts after `after`."""
+        # Postings past their deadline are hidden until the archive job moves them
+        where = ['is_active = 1', 'id > ?', 'deadline_date >= ?']
+        params = [after, date.today().isoformat()]
+        if self.sector:
+            where.append('sector = ?')
+            params.append(self.sector)
+        if self.location:
+            where.append('location LIKE ?')
+            params.append(self.location.replace('%', '') + '%')
+        if self.deadline_after:
+            where.append('deadline_date >= ?')
+            params.append(self.deadline_after)
+        if self.deadline_before:
+            where.append('deadline_date <= ?')
+            params.append(self.deadline_before)
+        # Stipends and durations are parsed into numbers at write time
+        if self.min_stipend is not None:
+            where.append('stipend_max >= ?')
+            params.append(self.min_stipend)
+        if self.max_duration is not None:
+            where.append('duration_months <= ?')
+            params.append(self.max_duration)
+        if self.near is not None:
+            # The bounding box uses the coordinates index; distance_km trims the corners
+            min_lat, max_lat, min_lon, max_lon = bounding_box(self.near, self.radius_km)
+            where.append('latitude BETWEEN ? AND ?')
+            where.append('longitude BETWEEN ? AND ?')
+            where.append('distance_km(latitude, longitude, ?, ?) <= ?')
+            params.extend([min_lat, max_lat, min_lon, max_lon,
+                           self.near[0], self.near[1], self.radius_km])
+
+        sql = 'SELECT {} FROM internships WHERE {} ORDER BY id'.format(
+            ', '.join(self.fields), ' AND '.join(where)
+        )
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return sql, params
+
+    def page(self, db):
+        """Fetch one page; returns (rows, next_cursor)."""
+        sql, params = self.sql(self.after, self.limit + 1)
+        rows = db.execute(sql, params).fetchall()
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            return rows, rows[-1]['id']
+        return rows, None
+
+    def iter_rows(self, db, batch_size=STREAM_BATCH_SIZE):
+        """Yield every matching row in id order, one keyset batch at a time."""
+        after = self.after
+        while True:
+            sql, params = self.sql(after, batch_size)
+            rows = db.execute(sql, params).fetchall()
+            if not rows:
+                return
+            yield from rows
+            after = rows[-1]['id']
+
+    def iter_ndjson(self, db):
+        """Yield matching rows as newline-delimited JSON."""
+        for row in self.iter_rows(db):
+            yield json.dumps(row_to_dict(row, self.fields)) + '\n'
+
+
+def row_to_dict(row, fields=API_FIELDS):
+    """Project a row onto the given API fields."""
+    return {field: row[field] for field in fields}
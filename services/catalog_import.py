@@ -0,0 +1,351 @@
+import csv
+import io
+import json
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from services.features import (
+    INTERNSHIP_FEATURE_COLUMNS,
+    internship_feature_values,
+    parse_deadline,
+)
+
+# Columns accepted from a partner feed
+IMPORT_COLUMNS = (
+    'title', 'company', 'location', 'description', 'requirements', 'stipend',
+    'duration', 'deadline', 'sector', 'skills_required', 'education_required',
+    'external_id', 'external_url',
+)
+REQUIRED_COLUMNS = ('title', 'company', 'location', 'description')
+MAX_FIELD_LENGTH = 20000
+
+DEFAULT_BATCH_SIZE = 5000
+# Batches written per transaction
+DEFAULT_COMMIT_EVERY = 20
+
+WRITE_COLUMNS = IMPORT_COLUMNS + INTERNSHIP_FEATURE_COLUMNS + ('updated_at',)
+
+# Feed ids are stored as 'import:<source>:<id>', apart from the
+# '<provider>:<id>' ids of synced listings, so an import and the external
+# sync never take over (or expire) each other's rows
+DEFAULT_SOURCE = 'partner'
+SOURCE_PATTERN = re.compile(r'[a-z0-9][a-z0-9_-]*')
+
+# Rows with an external_id replace the previous version of the same posting
+UPSERT_SQL = '''
+    INSERT INTO internships ({columns}, is_external, is_active)
+    VALUES ({placeholders}, 0, 1)
+    ON CONFLICT(external_id) DO UPDATE SET
+        {updates},
+        is_external = 0,
+        is_active = 1
+'''.format(
+    columns=', '.join(WRITE_COLUMNS),
+    placeholders=', '.join('?' for _ in WRITE_COLUMNS),
+    updates=',\n        '.join(
+        f'{c} = excluded.{c}' for c in WRITE_COLUMNS if c != 'external_id'
+    ),
+)
+
+# Unique index that upserts rely on; kept during bulk loads
+KEPT_INDEXES = ('idx_internships_external_id',)
+
+
+class InvalidRow(ValueError):
+    """Raised by normalize_record for a row that cannot be imported."""
+
+
+class ImportStats:
+    """Counters for one import run.
+
+    The counters start from a checkpoint's totals when resuming; `rate`
+    only counts the rows written since this run started.
+    """
+
+    def __init__(self, records=0, written=0, rejected=0):
+        self.records = records
+        self.written = written
+        self.rejected = rejected
+        self.resumed_written = written
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self):
+        """Rows written per second by this run."""
+        elapsed = self.elapsed
+        return (self.written - self.resumed_written) / elapsed if elapsed else 0.0
+
+
+def detect_format(path):
+    """'csv' or 'jsonl' from a file name."""
+    name = path.lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    raise ValueError(f'Cannot tell the format of {path}; pass --format')
+
+
+def open_feed(path):
+    """Open a feed as text, transparently decompressing .gz ('-' is stdin)."""
+    if path == '-':
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+    if path.endswith('.gz'):
+        import gzip
+
+        return gzip.open(path, 'rt', encoding='utf-8-sig', newline='')
+    return open(path, encoding='utf-8-sig', newline='')
+
+
+def iter_records(stream, fmt):
+    """Yield one dict per CSV row or JSONL line without reading the whole feed.
+
+    Lines that are not valid JSON objects are yielded as InvalidRow
+    instances so the caller can count and report them in order.
+    """
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield InvalidRow(f'Invalid JSON: {e}')
+            continue
+        if not isinstance(record, dict):
+            yield InvalidRow('Expected a JSON object')
+            continue
+        yield record
+
+
+def namespaced_id(source, external_id):
+    """The stored external_id for a feed id from `source` (None stays None)."""
+    if external_id is None:
+        return None
+    return f'import:{source}:{external_id}'
+
+
+def normalize_deadline(value):
+    """Parse a deadline into an ISO date string; raises InvalidRow."""
+    deadline = parse_deadline(value)
+    if deadline is None:
+        raise InvalidRow(f'Unrecognized deadline: {value!r}')
+    return deadline
+
+
+def normalize_record(record):
+    """Validate a feed record and return its cleaned IMPORT_COLUMNS values."""
+    # Header case and padding vary between partners
+    record = {str(k).strip().lower(): v for k, v in record.items() if k is not None}
+    cleaned = {}
+    for column in IMPORT_COLUMNS:
+        value = record.get(column)
+        if value is None:
+            value = ''
+        elif isinstance(value, list):
+            value = ', '.join(str(v) for v in value)
+        value = str(value).strip()
+        if len(value) > MAX_FIELD_LENGTH:
+            raise InvalidRow(f'{column} is longer than {MAX_FIELD_LENGTH} characters')
+        cleaned[column] = value
+
+    missing = [c for c in REQUIRED_COLUMNS if not cleaned[c]]
+    if missing:
+        raise InvalidRow('Missing ' + ', '.join(missing))
+    if cleaned['deadline']:
+        cleaned['deadline'] = normalize_deadline(cleaned['deadline'])
+    # NULL keeps rows without an id out of the unique external_id index
+    cleaned['external_id'] = cleaned['external_id'] or None
+    return cleaned
+
+
+class Checkpoint:
+    """Progress of an import, saved after every committed transaction.
+
+    Records which feed it belongs to (path, size and mtime) so a resume
+    against a different file is refused, and any schema objects dropped
+    for a bulk load so they can be restored after a crash.
+    """
+
+    def __init__(self, path, feed):
+        self.path = path
+        self.feed = feed
+        self.records = 0
+        self.written = 0
+        self.rejected = 0
+        self.dropped_schema = []
+
+    @staticmethod
+    def _identity(feed):
+        if feed == '-':
+            return {'feed': '-'}
+        stat = os.stat(feed)
+        return {'feed': os.path.abspath(feed), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    @classmethod
+    def load(cls, path, feed):
+        """Load a checkpoint for `feed`, or start a fresh one."""
+        checkpoint = cls(path, feed)
+        if path is None or not os.path.exists(path):
+            return checkpoint
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('identity') != cls._identity(feed):
+            raise ValueError(f'{path} belongs to a different feed; delete it to start over')
+        checkpoint.records = data['records']
+        checkpoint.written = data['written']
+        checkpoint.rejected = data['rejected']
+        checkpoint.dropped_schema = data.get('dropped_schema', [])
+        return checkpoint
+
+    def save(self):
+        if self.path is None:
+            return
+        data = {
+            'identity': self._identity(self.feed),
+            'records': self.records,
+            'written': self.written,
+            'rejected': self.rejected,
+            'dropped_schema': self.dropped_schema,
+        }
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def remove(self):
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+@contextmanager
+def bulk_load(conn, checkpoint):
+    """Drop secondary indexes and internship triggers for the duration of a load.
+
+    They are recreated afterwards, even on failure; the FTS index is
+    rebuilt and the catalog version bumped once instead of per row.
+    """
+    rows = conn.execute(
+        '''SELECT type, name, sql FROM sqlite_master
+           WHERE tbl_name = 'internships' AND type IN ('index', 'trigger')
+             AND sql IS NOT NULL'''
+    ).fetchall()
+    current = [(r['type'], r['name'], r['sql']) for r in rows if r['name'] not in KEPT_INDEXES]
+
+    # Objects dropped by an interrupted run are restored too
+    dropped = {name: (kind, name, sql) for kind, name, sql in checkpoint.dropped_schema}
+    dropped.update({name: (kind, name, sql) for kind, name, sql in current})
+    checkpoint.dropped_schema = list(dropped.values())
+    checkpoint.save()
+
+    with conn:
+        for kind, name, _ in current:
+            conn.execute(f'DROP {kind.upper()} IF EXISTS {name}')
+    try:
+        yield
+    finally:
+        conn.rollback()
+        with conn:
+            for kind, name, sql in checkpoint.dropped_schema:
+                exists = conn.execute(
+                    'SELECT 1 FROM sqlite_master WHERE type = ? AND name = ?', (kind, name)
+                ).fetchone()
+                if not exists:
+                    conn.execute(sql)
+            conn.execute("INSERT INTO internships_fts (internships_fts) VALUES ('rebuild')")
+            conn.execute(
+                '''UPDATE catalog_version
+                   SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+                   WHERE id = 1'''
+            )
+        checkpoint.dropped_schema = []
+        checkpoint.save()
+
+
+def import_feed(conn, feed, fmt=None, batch_size=DEFAULT_BATCH_SIZE,
+                commit_every=DEFAULT_COMMIT_EVERY, checkpoint_path=None,
+                drop_indexes=False, rejects=None, progress=None, source=DEFAULT_SOURCE):
+    """Stream a CSV/JSONL feed into internships with batched upserts.
+
+    Feed ids are namespaced by `source` (see namespaced_id).  Every `commit_every` batches the transaction is committed and the
+    checkpoint saved; a rerun with the same checkpoint skips the records
+    already committed.  Rejected records are written to `rejects` as
+    NDJSON, and `progress(stats)` is called after every commit.
+    Returns the ImportStats.
+    """
+    if not SOURCE_PATTERN.fullmatch(source):
+        raise ValueError(f'Invalid source {source!r}; use lowercase letters, digits, - and _')
+    fmt = fmt or detect_format(feed)
+    checkpoint = Checkpoint.load(checkpoint_path, feed)
+    stats = ImportStats(checkpoint.records, checkpoint.written, checkpoint.rejected)
+    resume_at = checkpoint.records
+    imported_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')
+
+    def commit():
+        conn.commit()
+        checkpoint.records = stats.records
+        checkpoint.written = stats.written
+        checkpoint.rejected = stats.rejected
+        checkpoint.save()
+        if progress is not None:
+            progress(stats)
+
+    def load():
+        batch = []
+        batches = 0
+        with open_feed(feed) as stream:
+            for number, record in enumerate(iter_records(stream, fmt), start=1):
+                if number <= resume_at:
+                    continue
+                stats.records = number
+                try:
+                    if isinstance(record, InvalidRow):
+                        raise record
+                    cleaned = normalize_record(record)
+                    cleaned['external_id'] = namespaced_id(source, cleaned['external_id'])
+                except InvalidRow as e:
+                    stats.rejected += 1
+                    if rejects is not None:
+                        rejects.write(json.dumps({'record': number, 'error': str(e)}) + '\n')
+                    continue
+
+                batch.append(
+                    tuple(cleaned[c] for c in IMPORT_COLUMNS)
+                    + internship_feature_values(cleaned)
+                    + (imported_at,)
+                )
+                if len(batch) >= batch_size:
+                    conn.executemany(UPSERT_SQL, batch)
+                    stats.written += len(batch)
+                    batch = []
+                    batches += 1
+                    if batches % commit_every == 0:
+                        commit()
+
+        if batch:
+            conn.executemany(UPSERT_SQL, batch)
+            stats.written += len(batch)
+        commit()
+
+    if drop_indexes:
+        with bulk_load(conn, checkpoint):
+            load()
+    else:
+        load()
+    checkpoint.remove()
+    return stats
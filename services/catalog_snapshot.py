@@ -0,0 +1,270 @@
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import numpy as np
+
+from init_db import DATABASE, connect
+from services.batch_scoring import BatchScorer
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+SNAPSHOT_PATH = os.environ.get('CATALOG_SNAPSHOT_PATH', os.path.join('data', 'catalog.snapshot'))
+# Seconds before a process tries again to rebuild a snapshot that is still stale
+REBUILD_RETRY = 5.0
+
+MAGIC = b'PMCATSNP'
+FORMAT_VERSION = 2
+# magic, format version, metadata offset, metadata length
+HEADER = struct.Struct('<8sIQQ')
+# Arrays start on cache-line boundaries
+ALIGNMENT = 64
+
+# BatchScorer arrays stored in the snapshot and read back for scoring
+SCORING_ARRAYS = (
+    'ids', 'deadline_days', 'posting_offsets', 'posting_rows', 'skill_offsets',
+    'skill_rows', 'required_counts', 'sector_codes', 'education_codes', 'city_codes', 'state_codes',
+    'latitudes', 'longitudes', 'cos_latitudes', 'latitude_order', 'sorted_latitudes',
+)
+# Parsed numeric features stored alongside; -1 where unknown
+FEATURE_ARRAYS = (
+    ('stipend_min', np.int32),
+    ('stipend_max', np.int32),
+    ('duration_months', np.int16),
+)
+
+
+def _padding(offset):
+    return -offset % ALIGNMENT
+
+
+def write_snapshot(path, rows, catalog_version):
+    """Encode catalog rows into a snapshot file at `path`, replacing it atomically.
+
+    Layout: header, aligned arrays, one compact JSON document per row
+    (decoded only for the rows that are returned), then a JSON trailer
+    with the vocabularies and where each array lives.  Returns the
+    number of rows written.
+    """
+    scorer = BatchScorer(rows)
+    arrays = {name: np.ascontiguousarray(getattr(scorer, name)) for name in SCORING_ARRAYS}
+    for name, dtype in FEATURE_ARRAYS:
+        arrays[name] = np.array(
+            [-1 if row.get(name) is None else row[name] for row in scorer.internships],
+            dtype=dtype
+        )
+
+    meta = {
+        'catalog_version': catalog_version,
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+        'rows': len(scorer),
+        'tokens': list(scorer.token_ids),
+        'sector_tokens': [sorted(tokens) for tokens in scorer.sector_tokens],
+        'education_tokens': [sorted(tokens) for tokens in scorer.education_tokens],
+        'places': list(scorer.place_ids),
+        'arrays': {},
+    }
+
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, 0))
+        for name, array in arrays.items():
+            f.write(b'\0' * _padding(f.tell()))
+            meta['arrays'][name] = (array.dtype.str, array.shape, f.tell())
+            f.write(array.tobytes())
+
+        offsets = [f.tell()]
+        for row in scorer.internships:
+            f.write(json.dumps(row, separators=(',', ':')).encode())
+            offsets.append(f.tell())
+        f.write(b'\0' * _padding(f.tell()))
+        meta['arrays']['row_offsets'] = ('<i8', (len(offsets),), f.tell())
+        f.write(np.array(offsets, dtype='<i8').tobytes())
+
+        meta_offset = f.tell()
+        encoded = json.dumps(meta).encode()
+        f.write(encoded)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, meta_offset, len(encoded)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return len(scorer)
+
+
+class CatalogSnapshot(BatchScorer):
+    """A BatchScorer over a memory-mapped snapshot file.
+
+    Every array is a read-only view into the shared mapping, so workers
+    mapping the same file share its pages and scoring creates no
+    per-row Python objects; rows are decoded only when returned.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, format_version, meta_offset, meta_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION or not meta_offset:
+            raise ValueError(f'{path} is not a catalog snapshot this version can read')
+        meta = json.loads(self._map[meta_offset:meta_offset + meta_length])
+
+        self.catalog_version = meta['catalog_version']
+        self.built_at = meta['built_at']
+        for name, (dtype, shape, offset) in meta['arrays'].items():
+            view = np.frombuffer(self._map, dtype=dtype, count=math.prod(shape), offset=offset)
+            setattr(self, name, view.reshape(shape))
+        self.token_ids = {token: i for i, token in enumerate(meta['tokens'])}
+        self.sector_tokens = [frozenset(tokens) for tokens in meta['sector_tokens']]
+        self.education_tokens = [frozenset(tokens) for tokens in meta['education_tokens']]
+        self.place_ids = {place: i for i, place in enumerate(meta['places'])}
+
+    @classmethod
+    def load(cls, source):
+        return cls(source)
+
+    @property
+    def source(self):
+        return self.path
+
+    def internship(self, position):
+        start, end = self.row_offsets[position], self.row_offsets[position + 1]
+        return json.loads(self._map[start:end])
+
+
+@contextmanager
+def _exclusive(path, blocking=True):
+    """Hold an exclusive lock on `path` across processes (where flock exists).
+
+    Yields whether the lock was taken; with blocking=False that is False
+    when another process holds it.
+    """
+    with open(path, 'a') as f:
+        if fcntl is not None:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+        try:
+            yield True
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class SnapshotStore:
+    """Keeps the mapped snapshot in step with the catalog version.
+
+    When the catalog version changes, requests keep scoring against the
+    mapped snapshot while a background thread rebuilds the file; the
+    first process to take the lock builds it and the others map the
+    result once it has been renamed into place.  Mappings of a replaced
+    file stay valid until nothing references them, so a swap never
+    disturbs requests still scoring against the old one.
+    """
+
+    def __init__(self, path=SNAPSHOT_PATH, database=DATABASE):
+        self.path = path
+        self.database = database
+        self.current = None
+        self._lock = threading.Lock()
+        self._mapped_file = None
+        # pid of the process whose rebuild thread is running; a forked
+        # worker does not inherit the thread
+        self._rebuilder = None
+        self._next_rebuild = 0.0
+
+    def _file_id(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _open(self):
+        try:
+            return CatalogSnapshot(self.path)
+        except (OSError, ValueError):
+            return None
+
+    def _map_latest(self):
+        """Map the file if it was replaced since it was last mapped."""
+        file_id = self._file_id()
+        if file_id is None or file_id == self._mapped_file:
+            return self.current
+        snapshot = self._open()
+        if snapshot is not None:
+            self.current, self._mapped_file = snapshot, file_id
+        return self.current
+
+    def build(self, db):
+        """Write a snapshot of the active catalog; returns its catalog version."""
+        # Read the version first so a concurrent change leaves the snapshot stale
+        version = db.execute('SELECT version FROM catalog_version WHERE id = 1').fetchone()[0]
+        rows = db.execute(
+            '''SELECT * FROM internships
+               WHERE is_active = 1 AND deadline_date >= ?
+               ORDER BY id''',
+            (date.today().isoformat(),)
+        ).fetchall()
+        write_snapshot(self.path, [dict(row) for row in rows], version)
+        return version
+
+    def _rebuild(self):
+        """Build a snapshot for the current version unless another process is."""
+        try:
+            with _exclusive(self.path + '.lock', blocking=False) as locked:
+                if locked:
+                    conn = connect(self.database)
+                    try:
+                        version = conn.execute(
+                            'SELECT version FROM catalog_version WHERE id = 1'
+                        ).fetchone()[0]
+                        snapshot = self._open()
+                        if snapshot is None or snapshot.catalog_version != version:
+                            self.build(conn)
+                    finally:
+                        conn.close()
+            with self._lock:
+                self._map_latest()
+        except Exception as e:
+            print(f"Error rebuilding the catalog snapshot: {e}")
+        finally:
+            self._rebuilder = None
+
+    def refresh(self, db):
+        """Return the newest mapped snapshot, rebuilding in the background when stale.
+
+        Only a process with nothing mapped yet and no file to map (the
+        first start) builds inline; otherwise the caller never waits on
+        the rebuild or its lock and may get the previous version.
+        """
+        version = db.execute('SELECT version FROM catalog_version WHERE id = 1').fetchone()[0]
+        snapshot = self.current
+        if snapshot is not None and snapshot.catalog_version == version:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._map_latest()
+            if snapshot is None:
+                with _exclusive(self.path + '.lock'):
+                    snapshot = self._map_latest()
+                    if snapshot is None:
+                        self.build(db)
+                        snapshot = self._map_latest()
+            if (snapshot.catalog_version != version and self._rebuilder != os.getpid()
+                    and time.monotonic() >= self._next_rebuild):
+                self._rebuilder = os.getpid()
+                self._next_rebuild = time.monotonic() + REBUILD_RETRY
+                threading.Thread(target=self._rebuild, name='snapshot-rebuild', daemon=True).start()
+        return snapshot
@@ -0,0 +1,48 @@
+import os
+
+# RapidAPI settings; EXTERNAL_API_URL can point at a local fake server
+EXTERNAL_API_URL = os.environ.get(
+    'EXTERNAL_API_URL', 'https://internships-api.p.rapidapi.com/active-jb-7d'
+)
+RAPIDAPI_HOST = os.environ.get('RAPIDAPI_HOST', 'internships-api.p.rapidapi.com')
+RAPIDAPI_KEY = os.environ.get('RAPIDAPI_KEY', '')
+
+
+def _first(item, *keys):
+    """Return the first non-empty value among `keys`."""
+    for key in keys:
+        value = item.get(key)
+        if value:
+            return value
+    return ''
+
+
+def normalize_internship(item):
+    """Convert an external listing into the shape of an internships row."""
+    external_id = str(_first(item, 'id', 'external_id', 'job_id'))
+
+    location = _first(item, 'location', 'locations_derived', 'locations_raw')
+    if isinstance(location, list):
+        location = ', '.join(str(l) for l in location if l)
+
+    skills = _first(item, 'skills_required', 'skills')
+    if isinstance(skills, list):
+        skills = ', '.join(skills)
+
+    return {
+        'id': 'ext-' + external_id,
+        'title': _first(item, 'title'),
+        'company': _first(item, 'company', 'organization'),
+        'location': location or 'Remote',
+        'description': _first(item, 'description', 'description_text'),
+        'requirements': _first(item, 'requirements'),
+        'stipend': _first(item, 'stipend', 'salary'),
+        'duration': _first(item, 'duration'),
+        'deadline': _first(item, 'deadline', 'date_validthrough'),
+        'sector': _first(item, 'sector', 'industry'),
+        'skills_required': skills,
+        'education_required': _first(item, 'education_required'),
+        'is_external': 1,
+        'external_id': external_id,
+        'external_url': _first(item, 'external_url', 'url'),
+    }
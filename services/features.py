@@ -0,0 +1,163 @@
+import math
+import re
+from datetime import datetime
+
+from services.geo import resolve
+from services.recommendation_engine import location_parts, tokenize
+
+# Feature columns written next to the free-text fields they are parsed from
+INTERNSHIP_FEATURE_COLUMNS = (
+    'skill_tokens', 'sector_tokens', 'education_tokens',
+    'stipend_min', 'stipend_max', 'duration_months', 'latitude', 'longitude',
+    'deadline_date',
+)
+USER_FEATURE_COLUMNS = (
+    'skill_tokens', 'interest_tokens', 'education_tokens', 'latitude', 'longitude',
+)
+
+AMOUNT_RE = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*(k\b)?', re.IGNORECASE)
+DURATION_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(day|week|month|year)s?', re.IGNORECASE)
+
+# Stipends are stored per month
+STIPEND_PERIODS = (
+    ('week', 52 / 12),
+    ('year', 1 / 12),
+    ('annum', 1 / 12),
+)
+DURATION_MONTHS = {'day': 12 / 365, 'week': 12 / 52, 'month': 1, 'year': 12}
+
+# Deadline spellings seen in listings; stored as ISO dates
+DEADLINE_FORMATS = (
+    '%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%Y/%m/%d',
+    '%d %b %Y', '%d %B %Y', '%b %d, %Y', '%B %d, %Y',
+)
+# deadline_date of listings without a usable deadline, so they never expire
+OPEN_DEADLINE = '9999-12-31'
+
+
+def join_tokens(tokens):
+    """Store a token set as a sorted comma list."""
+    return ','.join(sorted(tokens))
+
+
+def parse_stipend(text):
+    """Parse a stipend like '₹15,000 - ₹20,000 per month' into (min, max) per month.
+
+    Returns (None, None) when no amount can be found.
+    """
+    if not text:
+        return None, None
+    lowered = text.lower()
+    if 'unpaid' in lowered:
+        return 0, 0
+
+    amounts = []
+    for number, thousands in AMOUNT_RE.findall(text):
+        value = float(number.replace(',', ''))
+        if thousands:
+            value *= 1000
+        amounts.append(value)
+    if not amounts:
+        return None, None
+
+    factor = 1
+    for period, period_factor in STIPEND_PERIODS:
+        if period in lowered:
+            factor = period_factor
+            break
+    return round(min(amounts) * factor), round(max(amounts) * factor)
+
+
+def parse_duration(text):
+    """Parse a duration like '3 months' or '8 weeks' into whole months.
+
+    Ranges ('3-6 months') resolve to their upper bound.  Returns None when
+    no duration can be found.
+    """
+    months = [
+        float(number) * DURATION_MONTHS[unit.lower()]
+        for number, unit in DURATION_RE.findall(text or '')
+    ]
+    if not months:
+        return None
+    return max(1, math.ceil(max(months) - 1e-9))
+
+
+def parse_deadline(text):
+    """Parse a deadline like '2025-09-30' or '30 Sep 2025' into an ISO date.
+
+    Returns None when the text is empty or not a recognized date.
+    """
+    text = (text or '').strip()
+    for fmt in DEADLINE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def coordinates(location):
+    """(latitude, longitude) of a free-text location, or (None, None) when unknown."""
+    point = resolve(*location_parts(location))
+    return point if point is not None else (None, None)
+
+
+def internship_feature_values(internship):
+    """Feature values for an internship dict, in INTERNSHIP_FEATURE_COLUMNS order."""
+    required = tokenize(internship.get('skills_required'))
+    required |= tokenize(internship.get('requirements'))
+    stipend_min, stipend_max = parse_stipend(internship.get('stipend'))
+    return (
+        join_tokens(required),
+        join_tokens(tokenize(internship.get('sector'))),
+        join_tokens(tokenize(internship.get('education_required'))),
+        stipend_min,
+        stipend_max,
+        parse_duration(internship.get('duration')),
+    ) + coordinates(internship.get('location')) + (
+        parse_deadline(internship.get('deadline')) or OPEN_DEADLINE,
+    )
+
+
+def user_feature_values(skills, interests, education, location):
+    """Feature values for a profile, in USER_FEATURE_COLUMNS order."""
+    return (
+        join_tokens(tokenize(skills)),
+        join_tokens(tokenize(interests)),
+        join_tokens(tokenize(education)),
+    ) + coordinates(location)
+
+
+def _present(db, table, columns):
+    """Positions of `columns` that exist in `table`, so older migrations can backfill."""
+    existing = {row[1] for row in db.execute(f'PRAGMA table_info({table})')}
+    return [i for i, column in enumerate(columns) if column in existing]
+
+
+def backfill(db):
+    """Write feature columns for every internship and user; returns (internships, users)."""
+    positions = _present(db, 'internships', INTERNSHIP_FEATURE_COLUMNS)
+    internships = []
+    for row in db.execute('SELECT * FROM internships'):
+        values = internship_feature_values(dict(row))
+        internships.append(tuple(values[i] for i in positions) + (row['id'],))
+    db.executemany(
+        'UPDATE internships SET {} WHERE id = ?'.format(
+            ', '.join(INTERNSHIP_FEATURE_COLUMNS[i] + ' = ?' for i in positions)
+        ),
+        internships
+    )
+
+    positions = _present(db, 'users', USER_FEATURE_COLUMNS)
+    users = []
+    for row in db.execute('SELECT id, skills, interests, education, location FROM users'):
+        values = user_feature_values(row['skills'], row['interests'], row['education'], row['location'])
+        users.append(tuple(values[i] for i in positions) + (row['id'],))
+    db.executemany(
+        'UPDATE users SET {} WHERE id = ?'.format(
+            ', '.join(USER_FEATURE_COLUMNS[i] + ' = ?' for i in positions)
+        ),
+        users
+    )
+    return len(internships), len(users)
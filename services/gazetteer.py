@@ -0,0 +1,268 @@
+# Offline gazetteer of Indian cities and district headquarters as
+# (name, state, latitude, longitude); coordinates are rounded city centres
+
+CITIES = (
+    # Andhra Pradesh
+    ('Visakhapatnam', 'Andhra Pradesh', 17.69, 83.22),
+    ('Vijayawada', 'Andhra Pradesh', 16.51, 80.65),
+    ('Guntur', 'Andhra Pradesh', 16.31, 80.44),
+    ('Nellore', 'Andhra Pradesh', 14.44, 79.99),
+    ('Kurnool', 'Andhra Pradesh', 15.83, 78.04),
+    ('Tirupati', 'Andhra Pradesh', 13.63, 79.42),
+    ('Kakinada', 'Andhra Pradesh', 16.99, 82.25),
+    ('Rajahmundry', 'Andhra Pradesh', 17.00, 81.80),
+    ('Anantapur', 'Andhra Pradesh', 14.68, 77.60),
+    ('Amaravati', 'Andhra Pradesh', 16.57, 80.36),
+    # Arunachal Pradesh
+    ('Itanagar', 'Arunachal Pradesh', 27.08, 93.61),
+    # Assam
+    ('Guwahati', 'Assam', 26.14, 91.74),
+    ('Dibrugarh', 'Assam', 27.47, 94.91),
+    ('Silchar', 'Assam', 24.83, 92.78),
+    ('Jorhat', 'Assam', 26.75, 94.20),
+    ('Tezpur', 'Assam', 26.63, 92.80),
+    # Bihar
+    ('Patna', 'Bihar', 25.59, 85.14),
+    ('Gaya', 'Bihar', 24.79, 85.00),
+    ('Bhagalpur', 'Bihar', 25.24, 86.97),
+    ('Muzaffarpur', 'Bihar', 26.12, 85.39),
+    ('Darbhanga', 'Bihar', 26.15, 85.90),
+    ('Purnia', 'Bihar', 25.78, 87.47),
+    # Chhattisgarh
+    ('Raipur', 'Chhattisgarh', 21.25, 81.63),
+    ('Bhilai', 'Chhattisgarh', 21.21, 81.38),
+    ('Bilaspur', 'Chhattisgarh', 22.08, 82.15),
+    ('Korba', 'Chhattisgarh', 22.36, 82.75),
+    ('Jagdalpur', 'Chhattisgarh', 19.08, 82.02),
+    # Goa
+    ('Panaji', 'Goa', 15.49, 73.83),
+    ('Margao', 'Goa', 15.27, 73.96),
+    # Gujarat
+    ('Ahmedabad', 'Gujarat', 23.02, 72.57),
+    ('Surat', 'Gujarat', 21.17, 72.83),
+    ('Vadodara', 'Gujarat', 22.31, 73.18),
+    ('Rajkot', 'Gujarat', 22.30, 70.80),
+    ('Gandhinagar', 'Gujarat', 23.22, 72.65),
+    ('Bhavnagar', 'Gujarat', 21.76, 72.15),
+    ('Jamnagar', 'Gujarat', 22.47, 70.06),
+    ('Junagadh', 'Gujarat', 21.52, 70.46),
+    ('Anand', 'Gujarat', 22.56, 72.95),
+    ('Bhuj', 'Gujarat', 23.24, 69.67),
+    # Haryana
+    ('Gurugram', 'Haryana', 28.46, 77.03),
+    ('Faridabad', 'Haryana', 28.41, 77.32),
+    ('Panipat', 'Haryana', 29.39, 76.97),
+    ('Ambala', 'Haryana', 30.38, 76.78),
+    ('Hisar', 'Haryana', 29.15, 75.72),
+    ('Rohtak', 'Haryana', 28.90, 76.61),
+    ('Karnal', 'Haryana', 29.69, 76.99),
+    ('Sonipat', 'Haryana', 28.99, 77.02),
+    # Himachal Pradesh
+    ('Shimla', 'Himachal Pradesh', 31.10, 77.17),
+    ('Dharamshala', 'Himachal Pradesh', 32.22, 76.32),
+    ('Mandi', 'Himachal Pradesh', 31.71, 76.93),
+    ('Solan', 'Himachal Pradesh', 30.90, 77.10),
+    # Jharkhand
+    ('Ranchi', 'Jharkhand', 23.34, 85.31),
+    ('Jamshedpur', 'Jharkhand', 22.80, 86.20),
+    ('Dhanbad', 'Jharkhand', 23.80, 86.43),
+    ('Bokaro', 'Jharkhand', 23.67, 86.15),
+    ('Hazaribagh', 'Jharkhand', 23.99, 85.36),
+    # Karnataka
+    ('Bengaluru', 'Karnataka', 12.97, 77.59),
+    ('Mysuru', 'Karnataka', 12.30, 76.64),
+    ('Mangaluru', 'Karnataka', 12.91, 74.86),
+    ('Hubballi', 'Karnataka', 15.36, 75.12),
+    ('Dharwad', 'Karnataka', 15.46, 75.01),
+    ('Belagavi', 'Karnataka', 15.85, 74.50),
+    ('Kalaburagi', 'Karnataka', 17.33, 76.83),
+    ('Ballari', 'Karnataka', 15.14, 76.92),
+    ('Davanagere', 'Karnataka', 14.46, 75.92),
+    ('Shivamogga', 'Karnataka', 13.93, 75.57),
+    ('Tumakuru', 'Karnataka', 13.34, 77.10),
+    ('Udupi', 'Karnataka', 13.34, 74.75),
+    ('Hassan', 'Karnataka', 13.01, 76.10),
+    # Kerala
+    ('Thiruvananthapuram', 'Kerala', 8.52, 76.94),
+    ('Kochi', 'Kerala', 9.93, 76.27),
+    ('Kozhikode', 'Kerala', 11.26, 75.78),
+    ('Thrissur', 'Kerala', 10.53, 76.21),
+    ('Kollam', 'Kerala', 8.89, 76.61),
+    ('Kannur', 'Kerala', 11.87, 75.37),
+    ('Kottayam', 'Kerala', 9.59, 76.52),
+    ('Palakkad', 'Kerala', 10.79, 76.65),
+    ('Alappuzha', 'Kerala', 9.50, 76.34),
+    ('Malappuram', 'Kerala', 11.07, 76.07),
+    # Madhya Pradesh
+    ('Indore', 'Madhya Pradesh', 22.72, 75.86),
+    ('Bhopal', 'Madhya Pradesh', 23.26, 77.41),
+    ('Jabalpur', 'Madhya Pradesh', 23.18, 79.99),
+    ('Gwalior', 'Madhya Pradesh', 26.22, 78.18),
+    ('Ujjain', 'Madhya Pradesh', 23.18, 75.78),
+    ('Sagar', 'Madhya Pradesh', 23.84, 78.74),
+    ('Satna', 'Madhya Pradesh', 24.60, 80.83),
+    ('Rewa', 'Madhya Pradesh', 24.53, 81.30),
+    # Maharashtra
+    ('Mumbai', 'Maharashtra', 19.08, 72.88),
+    ('Pune', 'Maharashtra', 18.52, 73.86),
+    ('Nagpur', 'Maharashtra', 21.15, 79.09),
+    ('Nashik', 'Maharashtra', 20.00, 73.79),
+    ('Thane', 'Maharashtra', 19.22, 72.98),
+    ('Navi Mumbai', 'Maharashtra', 19.03, 73.03),
+    ('Aurangabad', 'Maharashtra', 19.88, 75.34),
+    ('Solapur', 'Maharashtra', 17.66, 75.91),
+    ('Kolhapur', 'Maharashtra', 16.70, 74.24),
+    ('Amravati', 'Maharashtra', 20.93, 77.75),
+    ('Nanded', 'Maharashtra', 19.14, 77.32),
+    ('Sangli', 'Maharashtra', 16.85, 74.58),
+    ('Jalgaon', 'Maharashtra', 21.00, 75.56),
+    ('Akola', 'Maharashtra', 20.70, 77.00),
+    ('Latur', 'Maharashtra', 18.40, 76.56),
+    ('Ratnagiri', 'Maharashtra', 16.99, 73.30),
+    # Manipur, Meghalaya, Mizoram, Nagaland, Sikkim, Tripura
+    ('Imphal', 'Manipur', 24.82, 93.94),
+    ('Shillong', 'Meghalaya', 25.58, 91.89),
+    ('Aizawl', 'Mizoram', 23.73, 92.72),
+    ('Kohima', 'Nagaland', 25.67, 94.11),
+    ('Dimapur', 'Nagaland', 25.91, 93.73),
+    ('Gangtok', 'Sikkim', 27.33, 88.61),
+    ('Agartala', 'Tripura', 23.83, 91.28),
+    # Odisha
+    ('Bhubaneswar', 'Odisha', 20.30, 85.82),
+    ('Cuttack', 'Odisha', 20.46, 85.88),
+    ('Rourkela', 'Odisha', 22.26, 84.85),
+    ('Berhampur', 'Odisha', 19.31, 84.79),
+    ('Sambalpur', 'Odisha', 21.47, 83.97),
+    ('Puri', 'Odisha', 19.81, 85.83),
+    ('Balasore', 'Odisha', 21.49, 86.93),
+    # Punjab
+    ('Ludhiana', 'Punjab', 30.90, 75.86),
+    ('Amritsar', 'Punjab', 31.63, 74.87),
+    ('Jalandhar', 'Punjab', 31.33, 75.58),
+    ('Patiala', 'Punjab', 30.34, 76.39),
+    ('Bathinda', 'Punjab', 30.21, 74.95),
+    ('Mohali', 'Punjab', 30.70, 76.72),
+    # Rajasthan
+    ('Jaipur', 'Rajasthan', 26.91, 75.79),
+    ('Jodhpur', 'Rajasthan', 26.24, 73.02),
+    ('Udaipur', 'Rajasthan', 24.59, 73.71),
+    ('Kota', 'Rajasthan', 25.21, 75.86),
+    ('Ajmer', 'Rajasthan', 26.45, 74.64),
+    ('Bikaner', 'Rajasthan', 28.02, 73.31),
+    ('Alwar', 'Rajasthan', 27.55, 76.60),
+    ('Bhilwara', 'Rajasthan', 25.35, 74.63),
+    ('Sikar', 'Rajasthan', 27.61, 75.14),
+    ('Jaisalmer', 'Rajasthan', 26.92, 70.91),
+    # Tamil Nadu
+    ('Chennai', 'Tamil Nadu', 13.08, 80.27),
+    ('Coimbatore', 'Tamil Nadu', 11.02, 76.96),
+    ('Madurai', 'Tamil Nadu', 9.93, 78.12),
+    ('Tiruchirappalli', 'Tamil Nadu', 10.79, 78.70),
+    ('Salem', 'Tamil Nadu', 11.66, 78.15),
+    ('Tirunelveli', 'Tamil Nadu', 8.71, 77.76),
+    ('Vellore', 'Tamil Nadu', 12.92, 79.13),
+    ('Erode', 'Tamil Nadu', 11.34, 77.72),
+    ('Tiruppur', 'Tamil Nadu', 11.11, 77.34),
+    ('Thanjavur', 'Tamil Nadu', 10.79, 79.14),
+    ('Thoothukudi', 'Tamil Nadu', 8.76, 78.13),
+    ('Kanchipuram', 'Tamil Nadu', 12.83, 79.70),
+    ('Hosur', 'Tamil Nadu', 12.74, 77.83),
+    # Telangana
+    ('Hyderabad', 'Telangana', 17.39, 78.49),
+    ('Warangal', 'Telangana', 17.97, 79.59),
+    ('Nizamabad', 'Telangana', 18.67, 78.09),
+    ('Karimnagar', 'Telangana', 18.44, 79.13),
+    ('Khammam', 'Telangana', 17.25, 80.15),
+    # Uttar Pradesh
+    ('Lucknow', 'Uttar Pradesh', 26.85, 80.95),
+    ('Kanpur', 'Uttar Pradesh', 26.45, 80.33),
+    ('Noida', 'Uttar Pradesh', 28.54, 77.39),
+    ('Ghaziabad', 'Uttar Pradesh', 28.67, 77.45),
+    ('Agra', 'Uttar Pradesh', 27.18, 78.01),
+    ('Varanasi', 'Uttar Pradesh', 25.32, 82.97),
+    ('Prayagraj', 'Uttar Pradesh', 25.44, 81.85),
+    ('Meerut', 'Uttar Pradesh', 28.98, 77.71),
+    ('Bareilly', 'Uttar Pradesh', 28.37, 79.43),
+    ('Aligarh', 'Uttar Pradesh', 27.88, 78.08),
+    ('Moradabad', 'Uttar Pradesh', 28.84, 78.77),
+    ('Gorakhpur', 'Uttar Pradesh', 26.76, 83.37),
+    ('Jhansi', 'Uttar Pradesh', 25.45, 78.57),
+    ('Ayodhya', 'Uttar Pradesh', 26.80, 82.20),
+    ('Mathura', 'Uttar Pradesh', 27.49, 77.67),
+    ('Saharanpur', 'Uttar Pradesh', 29.96, 77.55),
+    # Uttarakhand
+    ('Dehradun', 'Uttarakhand', 30.32, 78.03),
+    ('Haridwar', 'Uttarakhand', 29.95, 78.16),
+    ('Roorkee', 'Uttarakhand', 29.85, 77.89),
+    ('Haldwani', 'Uttarakhand', 29.22, 79.51),
+    ('Nainital', 'Uttarakhand', 29.38, 79.46),
+    # West Bengal
+    ('Kolkata', 'West Bengal', 22.57, 88.36),
+    ('Howrah', 'West Bengal', 22.59, 88.31),
+    ('Durgapur', 'West Bengal', 23.52, 87.31),
+    ('Asansol', 'West Bengal', 23.68, 86.98),
+    ('Siliguri', 'West Bengal', 26.73, 88.40),
+    ('Kharagpur', 'West Bengal', 22.35, 87.23),
+    ('Darjeeling', 'West Bengal', 27.04, 88.26),
+    ('Bardhaman', 'West Bengal', 23.23, 87.86),
+    ('Malda', 'West Bengal', 25.01, 88.14),
+    # Union territories
+    ('Delhi', 'Delhi', 28.61, 77.21),
+    ('New Delhi', 'Delhi', 28.61, 77.21),
+    ('Chandigarh', 'Chandigarh', 30.73, 76.78),
+    ('Puducherry', 'Puducherry', 11.94, 79.81),
+    ('Srinagar', 'Jammu and Kashmir', 34.08, 74.80),
+    ('Jammu', 'Jammu and Kashmir', 32.73, 74.86),
+    ('Leh', 'Ladakh', 34.15, 77.58),
+    ('Port Blair', 'Andaman and Nicobar Islands', 11.62, 92.73),
+    ('Silvassa', 'Dadra and Nagar Haveli and Daman and Diu', 20.27, 73.01),
+    ('Kavaratti', 'Lakshadweep', 10.57, 72.64),
+)
+
+# Former and alternate names, mapped to the name used in CITIES
+ALIASES = {
+    'Bangalore': 'Bengaluru',
+    'Mysore': 'Mysuru',
+    'Mangalore': 'Mangaluru',
+    'Hubli': 'Hubballi',
+    'Belgaum': 'Belagavi',
+    'Gulbarga': 'Kalaburagi',
+    'Bellary': 'Ballari',
+    'Shimoga': 'Shivamogga',
+    'Tumkur': 'Tumakuru',
+    'Bombay': 'Mumbai',
+    'Poona': 'Pune',
+    'Madras': 'Chennai',
+    'Calcutta': 'Kolkata',
+    'Gurgaon': 'Gurugram',
+    'Baroda': 'Vadodara',
+    'Trivandrum': 'Thiruvananthapuram',
+    'Cochin': 'Kochi',
+    'Ernakulam': 'Kochi',
+    'Calicut': 'Kozhikode',
+    'Trichur': 'Thrissur',
+    'Quilon': 'Kollam',
+    'Alleppey': 'Alappuzha',
+    'Trichy': 'Tiruchirappalli',
+    'Tuticorin': 'Thoothukudi',
+    'Pondicherry': 'Puducherry',
+    'Allahabad': 'Prayagraj',
+    'Banaras': 'Varanasi',
+    'Benares': 'Varanasi',
+    'Faizabad': 'Ayodhya',
+    'Vizag': 'Visakhapatnam',
+    'Rajamahendravaram': 'Rajahmundry',
+    'Cawnpore': 'Kanpur',
+    'Sambhajinagar': 'Aurangabad',
+    'Chhatrapati Sambhajinagar': 'Aurangabad',
+    'Bhilai Nagar': 'Bhilai',
+    'Panjim': 'Panaji',
+    'Madgaon': 'Margao',
+    'Secunderabad': 'Hyderabad',
+    'Cyberabad': 'Hyderabad',
+    'Greater Noida': 'Noida',
+    'Sas Nagar': 'Mohali',
+    'Burdwan': 'Bardhaman',
+    'Gauhati': 'Guwahati',
+    'NCR': 'Delhi',
+}
@@ -0,0 +1,134 @@
+import math
+
+from services.gazetteer import ALIASES, CITIES
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.2
+
+# Internships this close get full location credit
+SAME_CITY_KM = 15.0
+# Every HALF_CREDIT_KM beyond that halves the credit
+HALF_CREDIT_KM = 60.0
+# No distance credit beyond this; also the radius for location candidates
+NEARBY_KM = 200.0
+
+# Grid cells are half a degree (about 55 km) on each side
+GRID_CELL_DEGREES = 0.5
+
+# Suffixes dropped when a place is not found as written
+PLACE_SUFFIXES = (' district', ' city', ' rural', ' urban')
+
+
+def _key(name):
+    return ' '.join(name.lower().split()).strip(' .')
+
+
+def _build_places():
+    places = {}
+    for name, state, lat, lon in CITIES:
+        places.setdefault(_key(name), []).append((_key(state), (lat, lon)))
+    for alias, name in ALIASES.items():
+        places[_key(alias)] = places[_key(name)]
+    return places
+
+
+# Normalized place name -> [(normalized state, (lat, lon)), ...]
+PLACES = _build_places()
+
+
+def resolve(city, state=''):
+    """Coordinates for a normalized (city, state) pair, or None when unknown."""
+    for name in (city, state):
+        if not name:
+            continue
+        entries = PLACES.get(name)
+        if entries is None:
+            for suffix in PLACE_SUFFIXES:
+                if name.endswith(suffix):
+                    entries = PLACES.get(name[:-len(suffix)])
+                    break
+        if entries:
+            for entry_state, point in entries:
+                if entry_state == state:
+                    return point
+            return entries[0][1]
+    return None
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def sql_distance_km(lat1, lon1, lat2, lon2):
+    """haversine_km for SQLite, returning NULL when a coordinate is missing."""
+    if None in (lat1, lon1, lat2, lon2):
+        return None
+    return haversine_km(lat1, lon1, lat2, lon2)
+
+
+def distance_credit(km):
+    """Share of the location weight earned at a given distance."""
+    if km <= SAME_CITY_KM:
+        return 1.0
+    if km >= NEARBY_KM:
+        return 0.0
+    return 0.5 ** ((km - SAME_CITY_KM) / HALF_CREDIT_KM)
+
+
+def bounding_box(point, radius_km):
+    """(min_lat, max_lat, min_lon, max_lon) enclosing a circle around `point`."""
+    lat, lon = point
+    dlat = radius_km / KM_PER_DEGREE
+    dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+class GridIndex:
+    """Points bucketed into fixed lat/lon cells for radius queries."""
+
+    def __init__(self, cell_degrees=GRID_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.cells = {}
+        self.points = {}
+
+    def __len__(self):
+        return len(self.points)
+
+    def _cell(self, lat, lon):
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def add(self, key, point):
+        """Index `key` at `point`, replacing any previous position."""
+        self.remove(key)
+        self.points[key] = point
+        self.cells.setdefault(self._cell(*point), set()).add(key)
+
+    def remove(self, key):
+        point = self.points.pop(key, None)
+        if point is None:
+            return
+        cell = self._cell(*point)
+        keys = self.cells.get(cell)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.cells[cell]
+
+    def within(self, point, radius_km):
+        """Return {key: distance_km} for every point within `radius_km`."""
+        min_lat, max_lat, min_lon, max_lon = bounding_box(point, radius_km)
+        low_row, low_col = self._cell(min_lat, min_lon)
+        high_row, high_col = self._cell(max_lat, max_lon)
+
+        found = {}
+        for row in range(low_row, high_row + 1):
+            for col in range(low_col, high_col + 1):
+                for key in self.cells.get((row, col), ()):
+                    km = haversine_km(point[0], point[1], *self.points[key])
+                    if km <= radius_km:
+                        found[key] = km
+        return found
@@ -0,0 +1,188 @@
+import os
+import threading
+from datetime import date, datetime
+
+from init_db import DATABASE, connect
+from services.async_fetcher import get_fetcher
+from services.cache import RefreshingCache
+from services.features import INTERNSHIP_FEATURE_COLUMNS, internship_feature_values
+
+# Columns written for every external listing
+EXTERNAL_COLUMNS = (
+    'title', 'company', 'location', 'description', 'requirements', 'stipend',
+    'duration', 'deadline', 'sector', 'skills_required', 'education_required',
+    'external_id', 'external_url',
+)
+
+# Columns written on upsert, including the parsed features
+WRITE_COLUMNS = EXTERNAL_COLUMNS + INTERNSHIP_FEATURE_COLUMNS
+DEADLINE_DATE = INTERNSHIP_FEATURE_COLUMNS.index('deadline_date')
+EXTERNAL_ID = EXTERNAL_COLUMNS.index('external_id')
+
+# Existing rows are only rewritten when a written column actually changed,
+# so an unchanged feed does not bump the catalog version
+UPSERT_SQL = '''
+    INSERT INTO internships ({columns}, is_external, is_active, updated_at, last_seen_at)
+    VALUES ({placeholders}, 1, 1, ?, ?)
+    ON CONFLICT(external_id) DO UPDATE SET
+        {updates},
+        is_external = 1,
+        is_active = 1,
+        updated_at = excluded.updated_at
+    WHERE internships.is_active IS NOT 1
+       OR internships.is_external IS NOT 1
+       OR {changed}
+'''.format(
+    columns=', '.join(WRITE_COLUMNS),
+    placeholders=', '.join('?' for _ in WRITE_COLUMNS),
+    updates=',\n        '.join(
+        f'{c} = excluded.{c}' for c in WRITE_COLUMNS if c != 'external_id'
+    ),
+    changed='\n       OR '.join(
+        f'internships.{c} IS NOT excluded.{c}' for c in WRITE_COLUMNS if c != 'external_id'
+    ),
+)
+
+# last_seen_at is left out of the catalog triggers (see init_db.SYNC_COLUMNS)
+MARK_SEEN_SQL = 'UPDATE internships SET last_seen_at = ? WHERE external_id = ?'
+
+
+# Time allowed for one sync to fetch from every provider (seconds)
+SYNC_BUDGET = 60.0
+
+# Upstream results shared by overlapping syncs in this process (seconds).  The
+# TTL is kept below the sync interval so periodic syncs still fetch; a stale
+# window lets a sync write the last result while a background thread refetches
+external_cache = RefreshingCache(
+    ttl=float(os.environ.get('EXTERNAL_CACHE_TTL', '60')),
+    stale_ttl=float(os.environ.get('EXTERNAL_CACHE_STALE_TTL', '0')),
+    error_ttl=float(os.environ.get('EXTERNAL_CACHE_ERROR_TTL', '30')),
+)
+
+
+def iter_external_pages(fetch_page, page_size=100, max_pages=50):
+    """Yield pages of normalized external internships."""
+    for page in range(max_pages):
+        items = fetch_page(params={'offset': page * page_size, 'limit': page_size})
+        if not items:
+            break
+        yield items
+        if len(items) < page_size:
+            break
+
+
+def dedupe(internships):
+    """Keep the last listing seen for each external_id."""
+    unique = {}
+    for internship in internships:
+        if internship.get('external_id'):
+            unique[internship['external_id']] = internship
+    return list(unique.values())
+
+
+def upsert_external_internships(conn, internships, synced_at):
+    """Bulk upsert listings on external_id; the caller owns the transaction.
+
+    Listings already past their deadline are skipped rather than written
+    only to be archived again.  Every written listing gets last_seen_at =
+    `synced_at`, while updated_at only moves for rows that changed.
+    """
+    today = date.today().isoformat()
+    rows = []
+    for internship in internships:
+        features = internship_feature_values(internship)
+        if features[DEADLINE_DATE] < today:
+            continue
+        rows.append(
+            tuple(internship.get(c) or '' for c in EXTERNAL_COLUMNS)
+            + features
+            + (synced_at, synced_at)
+        )
+    conn.executemany(UPSERT_SQL, rows)
+    conn.executemany(MARK_SEEN_SQL, [(synced_at, row[EXTERNAL_ID]) for row in rows])
+    return len(rows)
+
+
+def expire_missing(conn, synced_at):
+    """Deactivate external listings that were not part of the latest sync."""
+    expired = [row[0] for row in conn.execute(
+        '''SELECT id FROM internships
+           WHERE is_external = 1 AND is_active = 1
+             AND (last_seen_at IS NULL OR last_seen_at < ?)''',
+        (synced_at,)
+    )]
+    conn.executemany(
+        'UPDATE internships SET is_active = 0, updated_at = ? WHERE id = ?',
+        [(synced_at, internship_id) for internship_id in expired]
+    )
+    return expired
+
+
+def sync_external_internships(conn, pages, expire=True):
+    """Write every page in a single transaction and expire vanished listings.
+
+    Pass expire=False when the fetch was partial, so listings that simply
+    were not fetched are not mistaken for vanished ones.
+    Returns (changed_ids, expired_ids): listings inserted or rewritten
+    because their content changed, and listings deactivated.
+    """
+    internships = dedupe(item for page in pages for item in page)
+    synced_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')
+
+    with conn:
+        upsert_external_internships(conn, internships, synced_at)
+        # Only expire when the upstream actually returned something
+        expired = expire_missing(conn, synced_at) if internships and expire else []
+        changed = [row[0] for row in conn.execute(
+            'SELECT id FROM internships WHERE updated_at = ? AND is_active = 1',
+            (synced_at,)
+        )]
+    return changed, expired
+
+
+class IngestionWorker(threading.Thread):
+    """Background thread that periodically syncs the external feed."""
+
+    def __init__(self, interval=900, database=DATABASE, engine=None,
+                 fetch_page=None, fetcher=None, budget=SYNC_BUDGET):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.database = database
+        self.engine = engine
+        self.fetch_page = fetch_page
+        self.fetcher = fetcher
+        self.budget = budget
+        self._stop_event = threading.Event()
+
+    def fetch(self):
+        """Return (pages, complete) from a single-source pager or the async fetcher."""
+        if self.fetch_page is not None:
+            return list(iter_external_pages(self.fetch_page)), True
+        fetcher = self.fetcher or get_fetcher()
+        result = external_cache.get(fetcher, lambda: fetcher.fetch(self.budget))
+        return [result], result.complete
+
+    def run_once(self):
+        """Fetch all pages, write them and update the engine's index."""
+        pages, complete = self.fetch()
+
+        conn = connect(self.database)
+        try:
+            changed, expired = sync_external_internships(conn, pages, expire=complete)
+            if self.engine is not None:
+                self.engine.refresh(conn)
+        finally:
+            conn.close()
+        return changed, expired
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                changed, expired = self.run_once()
+                print(f"External sync: {len(changed)} changed, {len(expired)} expired")
+            except Exception as e:
+                print(f"Error syncing external internships: {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
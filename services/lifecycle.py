@@ -0,0 +1,85 @@
+import threading
+from datetime import date, datetime, timedelta
+
+from init_db import DATABASE, _archive_columns, connect
+
+# Seconds between archive runs; a run also happens just after midnight
+DEFAULT_ARCHIVE_INTERVAL = 3600
+
+
+def today():
+    """Today's date as stored in deadline_date."""
+    return date.today().isoformat()
+
+
+def archive_expired(conn, as_of=None):
+    """Move internships whose deadline is before `as_of` into internships_archive.
+
+    Rows are copied and deleted in one transaction that takes the write
+    lock up front, so concurrent runs (say the app's thread and cron)
+    are serialized and the second finds nothing left to move.  A row
+    already in the archive keeps its archived_at unless its id now
+    belongs to a different posting.  The delete triggers update the FTS
+    index and bump the catalog version.  Returns the number of
+    internships archived.
+    """
+    as_of = as_of or today()
+    columns = _archive_columns(conn)
+    updates = ', '.join(f'{c} = excluded.{c}' for c in columns if c != 'id')
+    columns = ', '.join(columns)
+    with conn:
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute(
+            f'''INSERT INTO internships_archive ({columns}, archived_at)
+                SELECT {columns}, CURRENT_TIMESTAMP FROM internships
+                WHERE deadline_date < ?
+                ON CONFLICT(id) DO UPDATE SET {updates}, archived_at = excluded.archived_at
+                WHERE internships_archive.created_at IS NOT excluded.created_at''',
+            (as_of,)
+        )
+        archived = conn.execute(
+            'DELETE FROM internships WHERE deadline_date < ?', (as_of,)
+        ).rowcount
+    return archived
+
+
+def seconds_until_next_run(interval, now=None):
+    """Wait `interval` seconds, but no later than just after the next midnight."""
+    now = now or datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return min(interval, (midnight - now).total_seconds() + 1)
+
+
+class ArchiveWorker(threading.Thread):
+    """Background thread that archives expired internships."""
+
+    def __init__(self, interval=DEFAULT_ARCHIVE_INTERVAL, database=DATABASE, engine=None):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.database = database
+        self.engine = engine
+        self._stop_event = threading.Event()
+
+    def run_once(self):
+        """Archive expired rows and drop them from the engine's index."""
+        conn = connect(self.database)
+        try:
+            archived = archive_expired(conn)
+            if self.engine is not None:
+                self.engine.refresh(conn)
+        finally:
+            conn.close()
+        return archived
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                archived = self.run_once()
+                if archived:
+                    print(f"Archived {archived} expired internships")
+            except Exception as e:
+                print(f"Error archiving expired internships: {e}")
+            self._stop_event.wait(seconds_until_next_run(self.interval))
+
+    def stop(self):
+        self._stop_event.set()
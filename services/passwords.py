@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from utils.metrics import registry
+
+# Hash method for new hashes, e.g. 'pbkdf2:sha256:600000' or 'scrypt:32768:8:1'
+HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 2)))
+# Hash jobs allowed to wait for a worker before callers are turned away
+HASH_QUEUE_SIZE = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', '64'))
+HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', '5'))
+
+# Token buckets: sustained attempts per minute and burst size
+LOGIN_IP_RATE = float(os.environ.get('LOGIN_IP_RATE', '20'))
+LOGIN_IP_BURST = int(os.environ.get('LOGIN_IP_BURST', '30'))
+LOGIN_EMAIL_RATE = float(os.environ.get('LOGIN_EMAIL_RATE', '5'))
+LOGIN_EMAIL_BURST = int(os.environ.get('LOGIN_EMAIL_BURST', '10'))
+
+
+class HashQueueFull(Exception):
+    """Raised when the hashing pool is saturated; callers should back off."""
+
+
+class HashMetrics:
+    """Counters for the hashing pool."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queue_depth = 0
+        self.jobs = 0
+        self.rejected = 0
+        self.seconds = 0.0
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'queue_depth': self.queue_depth,
+                'jobs': self.jobs,
+                'rejected': self.rejected,
+                'seconds': self.seconds,
+            }
+
+
+class PasswordHasher:
+    """Runs Werkzeug hashing in a process pool behind a bounded queue."""
+
+    def __init__(self, method=HASH_METHOD, workers=HASH_WORKERS,
+                 queue_size=HASH_QUEUE_SIZE, timeout=HASH_TIMEOUT):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self.metrics = HashMetrics()
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self):
+        # Created lazily so each forked web worker gets its own pool
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self.metrics.lock:
+                self.metrics.rejected += 1
+            raise HashQueueFull()
+
+        with self.metrics.lock:
+            self.metrics.queue_depth += 1
+        started = time.perf_counter()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._finish(started)
+            raise
+        # The slot is held until the job itself finishes, not until the
+        # caller stops waiting, so timed-out jobs still count against the queue
+        future.add_done_callback(lambda _: self._finish(started))
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # Drop it if no worker has picked it up yet
+            future.cancel()
+            raise HashQueueFull()
+
+    def _finish(self, started):
+        with self.metrics.lock:
+            self.metrics.queue_depth -= 1
+            self.metrics.jobs += 1
+            self.metrics.seconds += time.perf_counter() - started
+        self._slots.release()
+
+    def hash(self, password):
+        """Hash a password with the configured method."""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored_hash, password):
+        """Check a password against a stored hash."""
+        return self._run(check_password_hash, stored_hash, password)
+
+    def needs_rehash(self, stored_hash):
+        """Whether a stored hash was made with a different method or cost."""
+        return stored_hash.split('$', 1)[0] != self.method
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `rate` tokens per second."""
+
+    def __init__(self, rate, capacity, now):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class RateLimiter:
+    """In-memory token buckets keyed by client IP, email, etc.
+
+    Keeps at most `max_keys` buckets, evicting the least recently used.
+    """
+
+    def __init__(self, per_minute, burst, max_keys=100000, clock=time.monotonic):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        """Take one token for `key`; False means the caller is throttled."""
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst, now)
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket.take(now)
+
+
+password_hasher = PasswordHasher()
+login_ip_limiter = RateLimiter(LOGIN_IP_RATE, LOGIN_IP_BURST)
+login_email_limiter = RateLimiter(LOGIN_EMAIL_RATE, LOGIN_EMAIL_BURST)
+
+registry.gauge(
+    'password_hash_pool', 'Password hashing pool: queue depth, jobs, rejections and seconds spent',
+    ('stat',),
+    lambda: {(stat,): value for stat, value in password_hasher.metrics.snapshot().items()},
+)
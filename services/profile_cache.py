@@ -0,0 +1,59 @@
+import os
+import time
+
+from services.cache import LRUCache
+from services.recommendation_engine import user_features
+from utils.metrics import CACHE_REQUESTS
+
+PROFILE_CACHE_SIZE = int(os.environ.get('PROFILE_CACHE_SIZE', '10000'))
+# Upper bound on how long another process's profile update can go unseen
+PROFILE_CACHE_TTL = float(os.environ.get('PROFILE_CACHE_TTL', '60'))
+
+
+class UserProfile(dict):
+    """A users row without the password hash, plus parsed scoring features."""
+
+    def __init__(self, row):
+        super().__init__(row)
+        self.pop('password', None)
+        self.features = user_features(self)
+
+
+class ProfileCache:
+    """Per-process cache of user profiles keyed by user id.
+
+    Callers pass the newest profile version they know about (from the
+    session or the JWT `pv` claim); an entry older than that, or older
+    than `ttl` seconds, is reloaded.  Otherwise no query is made.
+    """
+
+    def __init__(self, max_entries=PROFILE_CACHE_SIZE, ttl=PROFILE_CACHE_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = LRUCache(max_entries)
+
+    def get(self, db, user_id, min_version=0):
+        """Return the UserProfile for `user_id`, or None if the user does not exist."""
+        user_id = int(user_id)
+        now = self.clock()
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            loaded, profile = entry
+            if profile['profile_version'] >= min_version and now - loaded < self.ttl:
+                CACHE_REQUESTS.inc(cache='profiles', result='hit')
+                return profile
+
+        CACHE_REQUESTS.inc(cache='profiles', result='miss')
+        row = db.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+        if row is None:
+            self._entries.pop(user_id)
+            return None
+        profile = UserProfile(row)
+        self._entries.put(user_id, (now, profile))
+        return profile
+
+    def invalidate(self, user_id):
+        self._entries.pop(int(user_id))
+
+
+profile_cache = ProfileCache()
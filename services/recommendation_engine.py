@@ -0,0 +1,428 @@
+import heapq
+import re
+import threading
+from datetime import date
+
+from services.geo import NEARBY_KM, GridIndex, distance_credit, haversine_km, resolve
+
+# Weights for the heuristic score (they add up to 100)
+SKILL_WEIGHT = 50.0
+SECTOR_WEIGHT = 25.0
+LOCATION_WEIGHT = 15.0
+EDUCATION_WEIGHT = 10.0
+
+# Partial credit when only the state matches the user's location
+SAME_STATE_CREDIT = 0.5
+
+TOKEN_SPLIT_RE = re.compile(r'[,/;|\n]+')
+
+# Spellings folded into one canonical token, keyed by normalized form
+SYNONYMS = {
+    'ml': 'machine learning',
+    'ai': 'artificial intelligence',
+    'dl': 'deep learning',
+    'nlp': 'natural language processing',
+    'js': 'javascript',
+    'ts': 'typescript',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'nodejs': 'node.js',
+    'node': 'node.js',
+    'ms excel': 'excel',
+    'microsoft excel': 'excel',
+    'seo knowledge': 'seo',
+    'b.e': 'b.tech',
+    'be': 'b.tech',
+    'btech': 'b.tech',
+    'b tech': 'b.tech',
+    'mtech': 'm.tech',
+    'm tech': 'm.tech',
+    'm.e': 'm.tech',
+    'bsc': 'b.sc',
+    'msc': 'm.sc',
+    'bcom': 'b.com',
+}
+
+
+def _field(row, name):
+    """Read a column from a sqlite3.Row or a dict, returning '' when missing."""
+    try:
+        value = row[name]
+    except (KeyError, IndexError):
+        return ''
+    return value or ''
+
+
+def normalize_token(token):
+    """Lowercase a token and collapse its whitespace."""
+    return ' '.join(token.lower().split()).strip(' .')
+
+
+def tokenize(text):
+    """Split a free-text comma list into a set of normalized tokens."""
+    if not text:
+        return set()
+    tokens = set()
+    for part in TOKEN_SPLIT_RE.split(text):
+        token = normalize_token(part)
+        if token:
+            tokens.add(SYNONYMS.get(token, token))
+    return tokens
+
+
+def _stored_tokens(row, column):
+    """Read a precomputed token column, or None when it was never written."""
+    try:
+        value = row[column]
+    except (KeyError, IndexError):
+        return None
+    if value is None:
+        return None
+    return set(value.split(',')) if value else set()
+
+
+def _tokens(row, column, *sources):
+    """Tokens from a feature column, falling back to tokenizing `sources`."""
+    tokens = _stored_tokens(row, column)
+    if tokens is not None:
+        return tokens
+    tokens = set()
+    for source in sources:
+        tokens |= tokenize(_field(row, source))
+    return tokens
+
+
+def location_parts(text):
+    """Split a location like 'Bangalore, Karnataka' into (city, state)."""
+    parts = [normalize_token(p) for p in (text or '').split(',')]
+    parts = [p for p in parts if p]
+    city = parts[0] if parts else ''
+    state = parts[-1] if len(parts) > 1 else ''
+    return city, state
+
+
+def place(row):
+    """(city, state, point) for a row's location; point is (lat, lon) or None.
+
+    Uses the coordinates written at insert time when they are present and
+    falls back to the gazetteer otherwise.
+    """
+    city, state = location_parts(_field(row, 'location'))
+    try:
+        point = (row['latitude'], row['longitude'])
+    except (KeyError, IndexError):
+        point = (None, None)
+    if None in point:
+        point = resolve(city, state)
+    return city, state, point
+
+
+def is_expired(row, today):
+    """Has the row's stored deadline_date passed?  Rows without one never expire."""
+    try:
+        deadline = row['deadline_date']
+    except (KeyError, IndexError):
+        return False
+    return deadline is not None and deadline < today
+
+
+def internship_features(internship):
+    """Parsed internship fields used for scoring.
+
+    Returns (required, sector, education, (city, state, point)), read from
+    the feature columns written at insert time when they are present.
+    """
+    return (
+        _tokens(internship, 'skill_tokens', 'skills_required', 'requirements'),
+        _tokens(internship, 'sector_tokens', 'sector'),
+        _tokens(internship, 'education_tokens', 'education_required'),
+        place(internship),
+    )
+
+
+def internship_tokens(internship):
+    """Tokens an internship is indexed under."""
+    required, sector, education, _ = internship_features(internship)
+    return required | sector | education
+
+
+def user_features(user):
+    """Parsed user fields used for scoring.
+
+    Returns (skills, interests, education, (city, state, point)).  Cached
+    profiles carry these precomputed as a `features` attribute; otherwise
+    the feature columns written by profile updates are used.
+    """
+    features = getattr(user, 'features', None)
+    if features is not None:
+        return features
+    return (
+        _tokens(user, 'skill_tokens', 'skills'),
+        _tokens(user, 'interest_tokens', 'interests'),
+        _tokens(user, 'education_tokens', 'education'),
+        place(user),
+    )
+
+
+def _is_candidate(internship, tokens, point):
+    """Does an unindexed internship share a token with, or lie near, the user?"""
+    required, sector, education, (_, _, internship_point) = internship_features(internship)
+    if tokens & (required | sector | education):
+        return True
+    if point is None or internship_point is None:
+        return False
+    return haversine_km(point[0], point[1], internship_point[0], internship_point[1]) <= NEARBY_KM
+
+
+def user_tokens(user):
+    """Tokens used to look up candidate internships for a user."""
+    skills, interests, education, _ = user_features(user)
+    return skills | interests | education
+
+
+class SkillIndex:
+    """Inverted index from normalized tokens to internship ids."""
+
+    def __init__(self):
+        self.postings = {}
+        self.internships = {}
+        self._tokens = {}
+        self.grid = GridIndex()
+
+    def __len__(self):
+        return len(self.internships)
+
+    def add(self, internship):
+        """Index an internship, replacing any previous version of it."""
+        internship_id = internship['id']
+        if internship_id in self.internships:
+            self.remove(internship_id)
+
+        required, sector, education, (_, _, point) = internship_features(internship)
+        tokens = required | sector | education
+        for token in tokens:
+            self.postings.setdefault(token, set()).add(internship_id)
+        self._tokens[internship_id] = tokens
+        if point is not None:
+            self.grid.add(internship_id, point)
+        self.internships[internship_id] = dict(internship)
+
+    def remove(self, internship_id):
+        """Drop an internship from the index."""
+        for token in self._tokens.pop(internship_id, ()):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            posting.discard(internship_id)
+            if not posting:
+                del self.postings[token]
+        self.internships.pop(internship_id, None)
+        self.grid.remove(internship_id)
+
+    def candidates(self, tokens, point=None):
+        """Return the internships sharing at least one token or near `point`."""
+        ids = set()
+        for token in tokens:
+            ids |= self.postings.get(token, set())
+        if point is not None:
+            ids.update(self.grid.within(point, NEARBY_KM))
+        return [self.internships[i] for i in sorted(ids)]
+
+
+class RecommendationEngine:
+    """Heuristic recommender backed by an in-process inverted index.
+
+    Given a SnapshotStore it keeps no index of its own: catalog requests
+    are scored from the memory-mapped snapshot, which refresh() keeps at
+    the current catalog version.
+    """
+
+    def __init__(self, snapshots=None):
+        self.snapshots = snapshots
+        self.index = SkillIndex()
+        self._last_id = 0
+        self._last_updated = ''
+        self._lock = threading.Lock()
+        self._version = 0
+        self._batch_scorer = None
+        self._batch_version = -1
+        # Day up to which expired internships have been evicted
+        self._expired_through = ''
+
+    def add_internship(self, internship):
+        """Add or update a single internship in the index."""
+        with self._lock:
+            self.index.add(internship)
+            self._last_id = max(self._last_id, internship['id'])
+            self._version += 1
+
+    def remove_internship(self, internship_id):
+        """Remove an internship from the index."""
+        with self._lock:
+            self.index.remove(internship_id)
+            self._last_id = max(self._last_id, internship_id)
+            self._version += 1
+
+    def expire(self, today=None):
+        """Drop indexed internships whose deadline has passed; returns how many."""
+        today = today or date.today().isoformat()
+        with self._lock:
+            expired = [internship_id
+                       for internship_id, internship in self.index.internships.items()
+                       if is_expired(internship, today)]
+            for internship_id in expired:
+                self.index.remove(internship_id)
+            if expired:
+                self._version += 1
+            self._expired_through = today
+        return len(expired)
+
+    def refresh(self, db):
+        """Index internships inserted or updated since the last refresh.
+
+        Internships past their deadline are left out, and once a day the
+        ones already indexed are evicted as their deadline passes (the
+        archive job deletes them without touching updated_at).
+        """
+        if self.snapshots is not None:
+            return len(self.snapshots.refresh(db))
+
+        today = date.today().isoformat()
+        if self._expired_through != today:
+            self.expire(today)
+        rows = db.execute(
+            'SELECT * FROM internships WHERE id > ? OR updated_at > ? ORDER BY id',
+            (self._last_id, self._last_updated)
+        ).fetchall()
+        for row in rows:
+            if row['is_active'] == 0 or is_expired(row, today):
+                self.remove_internship(row['id'])
+            else:
+                self.add_internship(row)
+            if row['updated_at'] and row['updated_at'] > self._last_updated:
+                self._last_updated = row['updated_at']
+        return len(rows)
+
+    def score_internship(self, user, internship, features=None):
+        """Score an internship for a user; returns (score, match_reason).
+
+        `features` is user_features(user), passed in when scoring many
+        internships for the same user.
+        """
+        if features is None:
+            features = user_features(user)
+        skills, interests, education, (user_city, user_state, user_point) = features
+        required, sector, required_education, (city, state, point) = internship_features(internship)
+        reasons = []
+        score = 0.0
+
+        # Skills match
+        if skills and required:
+            matched = skills & required
+            if matched:
+                score += SKILL_WEIGHT * len(matched) / len(required)
+                reasons.append('Matches your skills: ' + ', '.join(sorted(matched)))
+
+        # Sector/interest alignment
+        if interests & sector:
+            score += SECTOR_WEIGHT
+            reasons.append('Aligned with your interest in ' + _field(internship, 'sector'))
+
+        # Location preference, decaying with distance when both places are known
+        credit = 0.0
+        if user_city and user_city in (city, state):
+            credit = 1.0
+        elif user_point is not None and point is not None:
+            km = haversine_km(user_point[0], user_point[1], point[0], point[1])
+            credit = distance_credit(km)
+        if credit == 1.0:
+            reasons.append('Located in ' + _field(internship, 'location'))
+        elif user_state and user_state == state and credit <= SAME_STATE_CREDIT:
+            credit = SAME_STATE_CREDIT
+            reasons.append('In your state')
+        elif credit > 0:
+            reasons.append(f'About {km:.0f} km from you')
+        score += LOCATION_WEIGHT * credit
+
+        # Education level
+        if education & required_education:
+            score += EDUCATION_WEIGHT
+            reasons.append('Fits your education')
+
+        if reasons:
+            reason = '; '.join(reasons)
+        else:
+            reason = 'Good match based on your profile'
+        return score, reason
+
+    def scored_version(self):
+        """Catalog version the snapshot scores against, or None without one.
+
+        The snapshot may lag the database while it is rebuilt in the
+        background; the in-memory index is brought up to date by refresh().
+        """
+        if self.snapshots is None or self.snapshots.current is None:
+            return None
+        return self.snapshots.current.catalog_version
+
+    def get_recommendations(self, user, internships=None, limit=5, extra=None):
+        """Return the top `limit` (internship, score) pairs for a user.
+
+        When `internships` is None only the indexed internships sharing a
+        token with the user or within NEARBY_KM of them are scored (from the
+        snapshot, when there is one).  `extra` internships (e.g. external
+        listings that are not indexed) are filtered and scored as well.
+        """
+        if internships is None and not extra and self.snapshots is not None:
+            snapshot = self.snapshots.current
+            if snapshot is not None:
+                return snapshot.recommend(user, self, limit)
+
+        features = user_features(user)
+        skills, interests, education, (_, _, point) = features
+        tokens = skills | interests | education
+
+        if internships is None:
+            with self._lock:
+                candidates = self.index.candidates(tokens, point)
+        else:
+            candidates = [dict(i) for i in internships
+                          if _is_candidate(i, tokens, point)]
+        if extra:
+            candidates.extend(dict(i) for i in extra
+                              if _is_candidate(i, tokens, point))
+
+        scored = []
+        for position, internship in enumerate(candidates):
+            score, reason = self.score_internship(user, internship, features)
+            if score <= 0:
+                continue
+            scored.append((score, -position, internship, reason))
+
+        top = heapq.nlargest(limit, scored, key=lambda item: (item[0], item[1]))
+
+        result = []
+        for score, _, internship, reason in top:
+            internship = dict(internship)
+            internship['match_reason'] = reason
+            result.append((internship, round(score, 2)))
+        return result
+
+    def batch_scorer(self):
+        """Return a BatchScorer over the indexed catalog, rebuilt on change."""
+        if self.snapshots is not None and self.snapshots.current is not None:
+            return self.snapshots.current
+
+        from services.batch_scoring import BatchScorer
+
+        with self._lock:
+            if self._batch_version != self._version:
+                catalog = [self.index.internships[i]
+                           for i in sorted(self.index.internships)]
+                self._batch_scorer = BatchScorer(catalog)
+                self._batch_version = self._version
+            return self._batch_scorer
+
+    def get_recommendations_batch(self, users, limit=5):
+        """Vectorized get_recommendations for many users, keyed by user id."""
+        return self.batch_scorer().recommend_many(users, self, limit)
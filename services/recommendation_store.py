@@ -0,0 +1,165 @@
+import json
+
+from services import search
+from services.cache import LRUCache
+from services.recommendation_engine import user_tokens
+from services.write_queue import write_queue
+from utils.metrics import CACHE_REQUESTS, RECOMMENDATION_SECONDS
+
+# Users warmed per batch by warm_recommendations
+WARM_BATCH_SIZE = 500
+# Length of every stored list; smaller limits are served as a prefix of it
+STORED_LIMIT = 20
+# Recently served lists per (user, profile version, catalog version, limit)
+MEMORY_ENTRIES = 10000
+
+_memory = LRUCache(MEMORY_ENTRIES)
+
+
+def get_catalog_version(db):
+    """Return the current catalog version counter."""
+    row = db.execute('SELECT version FROM catalog_version WHERE id = 1').fetchone()
+    return row[0] if row else 0
+
+
+def load_recommendations(db, user):
+    """Return the stored (internship, score) list if it is still current.
+
+    Returns None when nothing is stored or the user's profile or the
+    catalog changed since it was computed.
+    """
+    row = db.execute(
+        '''SELECT r.recommendations
+           FROM user_recommendations r
+           JOIN catalog_version c ON c.id = 1
+           WHERE r.user_id = ?
+             AND r.profile_version = ?
+             AND r.catalog_version = c.version''',
+        (user['id'], user['profile_version'])
+    ).fetchone()
+    if row is None:
+        return None
+    return [(item['internship'], item['score']) for item in json.loads(row[0])]
+
+
+def save_recommendations(db, user, recommendations, catalog_version):
+    """Store a user's recommendations for their current profile version."""
+    payload = json.dumps([
+        {'internship': dict(internship), 'score': score}
+        for internship, score in recommendations
+    ])
+    db.execute(
+        '''INSERT OR REPLACE INTO user_recommendations
+           (user_id, profile_version, catalog_version, recommendations, computed_at)
+           VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)''',
+        (user['id'], user['profile_version'], catalog_version, payload)
+    )
+
+
+def invalidate_user(db, user_id):
+    """Drop a user's stored recommendations."""
+    db.execute('DELETE FROM user_recommendations WHERE user_id = ?', (user_id,))
+
+
+def text_match_recommendations(db, engine, user, limit):
+    """Full-text matches for a profile with no token or location hits.
+
+    The profile's skills, interests and education are looked up in the
+    FTS index, so postings that only mention them in free text are still
+    suggested, in BM25 order.
+    """
+    result = []
+    for row in search.candidate_internships(db, user_tokens(user), limit=limit):
+        score, reason = engine.score_internship(user, row)
+        internship = dict(row)
+        internship['match_reason'] = reason if score > 0 else 'Mentions your skills or interests'
+        result.append((internship, round(score, 2)))
+    return result
+
+
+def compute_recommendations(db, engine, user, limit):
+    """Score the catalog for a user, falling back to full-text matches."""
+    with RECOMMENDATION_SECONDS.time(mode='single'):
+        engine.refresh(db)
+        recommendations = engine.get_recommendations(user, limit=limit)
+        if not recommendations:
+            recommendations = text_match_recommendations(db, engine, user, limit)
+    return recommendations
+
+
+def get_recommendations(db, engine, user, limit=5, catalog_version=None):
+    """Serve stored recommendations, computing and storing them on a miss.
+
+    Profiles with no token or location hits get full-text matches
+    instead.  Stored lists hold STORED_LIMIT entries and are sliced to `limit`;
+    larger limits are computed without being stored.  Misses are saved
+    through the write queue without waiting for the commit, unless they
+    were scored from a snapshot older than the catalog.  When the caller
+    already knows the catalog version, repeat calls for an unchanged
+    profile are answered from memory without a query.
+    """
+    if limit > STORED_LIMIT:
+        return compute_recommendations(db, engine, user, limit)
+
+    if catalog_version is not None:
+        key = (user['id'], user['profile_version'], catalog_version, limit)
+        recommendations = _memory.get(key)
+        if recommendations is not None:
+            CACHE_REQUESTS.inc(cache='recommendations_memory', result='hit')
+            return recommendations
+        CACHE_REQUESTS.inc(cache='recommendations_memory', result='miss')
+
+    current = True
+    recommendations = load_recommendations(db, user)
+    if recommendations is not None:
+        CACHE_REQUESTS.inc(cache='user_recommendations', result='hit')
+    else:
+        CACHE_REQUESTS.inc(cache='user_recommendations', result='miss')
+
+        # Read the version first so a concurrent catalog change leaves it stale
+        stored_version = get_catalog_version(db)
+        recommendations = compute_recommendations(db, engine, user, STORED_LIMIT)
+        # A snapshot still being rebuilt scored an older catalog; serve the
+        # result but keep it out of both caches
+        scored = engine.scored_version()
+        current = scored is None or scored >= max(stored_version, catalog_version or 0)
+        if current:
+            # Only a cache: the request does not wait for (or fail with) the write
+            write_queue.submit(save_recommendations, dict(user), recommendations, stored_version)
+
+    recommendations = recommendations[:limit]
+    if catalog_version is not None and current:
+        _memory.put(key, recommendations)
+    return recommendations
+
+
+def warm_recommendations(db, engine, batch_size=WARM_BATCH_SIZE):
+    """Precompute recommendations for every user with a complete profile.
+
+    Runs offline (python init_db.py --warm-recommendations) on its own
+    connection; returns the number of users warmed.
+    """
+    catalog_version = get_catalog_version(db)
+    engine.refresh(db)
+
+    warmed = 0
+    after = 0
+    while True:
+        users = db.execute(
+            '''SELECT * FROM users
+               WHERE id > ? AND skills != '' AND interests != ''
+               ORDER BY id LIMIT ?''',
+            (after, batch_size)
+        ).fetchall()
+        if not users:
+            break
+
+        with RECOMMENDATION_SECONDS.time(mode='batch'):
+            results = engine.get_recommendations_batch(users, limit=STORED_LIMIT)
+        for user in users:
+            save_recommendations(db, user, results[user['id']], catalog_version)
+        db.commit()
+
+        warmed += len(users)
+        after = users[-1]['id']
+    return warmed
@@ -0,0 +1,97 @@
+import html
+import re
+from datetime import date
+
+from services.catalog import API_FIELDS
+
+# BM25 column weights: title, company, description, requirements, skills_required
+BM25_WEIGHTS = (10.0, 5.0, 1.0, 2.0, 4.0)
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Candidates pulled from the index for a recommendation request
+CANDIDATE_LIMIT = 500
+
+# FTS5 wraps matches in these private-use characters; render_highlight
+# escapes the text and only then turns them into <mark> tags
+MARK_START = '\ue000'
+MARK_END = '\ue001'
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+SEARCH_SQL = '''
+    SELECT {fields},
+           highlight(internships_fts, 0, '{start}', '{end}') AS title_highlight,
+           snippet(internships_fts, -1, '{start}', '{end}', '…', 12) AS snippet,
+           bm25(internships_fts, {weights}) AS rank
+    FROM internships_fts
+    JOIN internships i ON i.id = internships_fts.rowid
+    WHERE internships_fts MATCH ? AND i.is_active = 1 AND i.deadline_date >= ?
+    ORDER BY rank
+    LIMIT ? OFFSET ?
+'''.format(
+    fields=', '.join('i.' + f for f in API_FIELDS),
+    weights=', '.join(str(w) for w in BM25_WEIGHTS),
+    start=MARK_START,
+    end=MARK_END,
+)
+
+
+def build_match_query(text, prefix=True, operator='AND'):
+    """Turn free text into a safe FTS5 MATCH expression.
+
+    Every word is quoted so FTS5 syntax in user input is treated literally;
+    with `prefix` each term also matches as a prefix ("pyth" -> python).
+    """
+    terms = TERM_RE.findall(text or '')
+    if not terms:
+        return None
+    suffix = '*' if prefix else ''
+    return f' {operator} '.join(f'"{term}"{suffix}' for term in terms)
+
+
+def render_highlight(text):
+    """HTML for a highlight()/snippet() result: escaped text with <mark> around matches."""
+    if not text:
+        return ''
+    return html.escape(text).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+def search_internships(db, text, limit=DEFAULT_PAGE_SIZE, offset=0):
+    """Return BM25-ranked active internships matching `text`.
+
+    title_highlight and snippet are raw text with MARK_START/MARK_END
+    around matches; pass them through render_highlight before use as HTML.
+    """
+    match = build_match_query(text)
+    if match is None:
+        return []
+    return db.execute(
+        SEARCH_SQL, (match, date.today().isoformat(), limit, offset)
+    ).fetchall()
+
+
+def candidate_internships(db, tokens, limit=CANDIDATE_LIMIT):
+    """Full rows for the internships best matching any of the given tokens.
+
+    Used as a candidate generator for recommendations: it also finds
+    postings that only mention a skill in their title or description.
+    """
+    phrases = []
+    for token in tokens:
+        terms = TERM_RE.findall(token)
+        if terms:
+            phrases.append('"' + ' '.join(terms) + '"')
+    if not phrases:
+        return []
+
+    return db.execute(
+        f'''SELECT i.*
+            FROM internships_fts
+            JOIN internships i ON i.id = internships_fts.rowid
+            WHERE internships_fts MATCH ? AND i.is_active = 1 AND i.deadline_date >= ?
+            ORDER BY bm25(internships_fts, {', '.join(str(w) for w in BM25_WEIGHTS)})
+            LIMIT ?''',
+        (' OR '.join(phrases), date.today().isoformat(), limit)
+    ).fetchall()
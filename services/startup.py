@@ -0,0 +1,145 @@
+import gc
+import os
+import time
+
+from init_db import DATABASE, connect
+from utils.metrics import registry
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Set when gunicorn preloads the app in the master and forks workers from it
+PRELOADED = os.environ.get('APP_PRELOAD', '0') == '1'
+# Set to 0 when migrations run as a separate release step (python init_db.py)
+INIT_DB_ON_START = os.environ.get('INIT_DB_ON_START', '1') == '1'
+# Also build the vectorized batch scorer before forking
+PRELOAD_BATCH_SCORER = os.environ.get('PRELOAD_BATCH_SCORER', '0') == '1'
+# Score recommendations from a memory-mapped catalog snapshot shared by all workers
+CATALOG_SNAPSHOT = os.environ.get('CATALOG_SNAPSHOT', '1') == '1'
+# Where the sync and archive threads run: 'auto' elects one process per host
+# through a lock file, '1' always runs them here, '0' leaves them to cron/CLI
+BACKGROUND_TASKS = os.environ.get('BACKGROUND_TASKS', 'auto')
+BACKGROUND_LOCK_PATH = os.environ.get('BACKGROUND_LOCK_PATH', DATABASE + '.background.lock')
+
+_started = time.perf_counter()
+_startup_seconds = None
+_leader_lock = None
+
+
+def rss_bytes():
+    """Resident set size of this process, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def private_bytes():
+    """Memory only this process maps, i.e. what is no longer shared copy-on-write."""
+    try:
+        total = 0
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                if line.startswith(('Private_Clean:', 'Private_Dirty:')):
+                    total += int(line.split()[1]) * 1024
+        return total
+    except (OSError, ValueError):
+        return None
+
+
+def preload(engine, database=DATABASE, batch_scorer=PRELOAD_BATCH_SCORER):
+    """Build the engine's catalog structures from a short-lived connection.
+
+    Under gunicorn's preload_app this runs once in the master, and workers
+    inherit the result copy-on-write.  The connection is closed so no
+    SQLite handle crosses the fork.
+    """
+    conn = connect(database)
+    try:
+        count = engine.refresh(conn)
+    finally:
+        conn.close()
+    if batch_scorer:
+        engine.batch_scorer()
+    return count
+
+
+def freeze():
+    """Move every live object out of the collector's reach before forking.
+
+    Otherwise the first collection in each worker writes to the headers of
+    the inherited objects and unshares their pages.
+    """
+    gc.collect()
+    gc.freeze()
+
+
+def forked():
+    """Restart the startup clock in a freshly forked worker."""
+    global _started, _startup_seconds
+    _started = time.perf_counter()
+    _startup_seconds = None
+
+
+def elect_leader(mode=BACKGROUND_TASKS, path=BACKGROUND_LOCK_PATH):
+    """Whether this process should run the background tasks.
+
+    In 'auto' mode the first process to take a non-blocking flock on
+    `path` wins and holds it until it exits; the worker gunicorn starts
+    in its place then takes over.  Without flock every process runs them.
+    """
+    global _leader_lock
+    if mode != 'auto':
+        return mode == '1'
+    if _leader_lock is not None or fcntl is None:
+        return True
+    f = open(path, 'a')
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return False
+    _leader_lock = f
+    return True
+
+
+def mark_ready(label='App'):
+    """Record and log how long this process took to become ready."""
+    global _startup_seconds
+    _startup_seconds = time.perf_counter() - _started
+    rss = rss_bytes()
+    private = private_bytes()
+    memory = ''
+    if rss is not None:
+        memory = f', RSS {rss / 2**20:.1f} MB'
+    if private is not None:
+        memory += f' ({private / 2**20:.1f} MB private)'
+    print(f"{label} {os.getpid()} ready in {_startup_seconds:.2f}s{memory}")
+    return _startup_seconds
+
+
+def _startup_samples():
+    if _startup_seconds is None:
+        return {}
+    return {(): _startup_seconds}
+
+
+def _memory_samples():
+    samples = {}
+    for kind, value in (('rss', rss_bytes()), ('private', private_bytes())):
+        if value is not None:
+            samples[(kind,)] = value
+    return samples
+
+
+registry.gauge(
+    'process_startup_seconds', 'Seconds this process took to become ready',
+    (), _startup_samples
+)
+registry.gauge(
+    'process_memory_bytes', 'Resident and private (unshared) memory of this process',
+    ('kind',), _memory_samples
+)
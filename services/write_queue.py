@@ -0,0 +1,176 @@
+import os
+import queue
+import threading
+import time
+
+from init_db import DATABASE, connect
+from utils.metrics import registry
+
+# Most intents committed in one transaction
+WRITE_BATCH_SIZE = int(os.environ.get('WRITE_BATCH_SIZE', '64'))
+# Longest an intent waits for others to join its batch (seconds)
+WRITE_BATCH_DELAY = float(os.environ.get('WRITE_BATCH_DELAY_MS', '2')) / 1000
+# Longest a handler waits for its intent before giving up (seconds)
+WRITE_TIMEOUT = float(os.environ.get('WRITE_TIMEOUT', '10'))
+# With 0, handlers that allow it return once their write ran in the batch
+# transaction, and learn of a failed commit through a callback afterwards
+WRITE_DURABLE = os.environ.get('WRITE_DURABLE', '1') == '1'
+
+WRITE_BATCH_INTENTS = registry.histogram(
+    'write_queue_batch_intents', 'Write intents committed per transaction',
+    (), buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+WRITE_SECONDS = registry.histogram(
+    'write_queue_seconds', 'Time from submitting a write intent to its commit',
+    ('intent',),
+)
+WRITE_ERRORS = registry.counter(
+    'write_queue_errors_total', 'Write intents that raised or whose batch failed to commit',
+    ('intent',),
+)
+
+
+class WriteTimeout(RuntimeError):
+    """Raised when a write intent was not applied within the timeout."""
+
+
+class WriteIntent:
+    """One queued write: `fn(conn, *args)` run on the writer's connection.
+
+    `applied` is set once the function ran inside the batch transaction
+    (its result or exception is known); `committed` once that
+    transaction is durable or has failed.  If the commit fails after the
+    function succeeded, `on_failure(error)` is called on the writer
+    thread, since a caller that did not wait for the commit has already
+    moved on.
+    """
+
+    def __init__(self, fn, args, on_failure=None):
+        self.fn = fn
+        self.args = args
+        self.on_failure = on_failure
+        self.name = fn.__name__.lstrip('_')
+        self.submitted = time.perf_counter()
+        self.applied = threading.Event()
+        self.committed = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self, durable=True, timeout=WRITE_TIMEOUT):
+        """Return the function's result, re-raising its exception.
+
+        With durable=False this returns as soon as the write ran in the
+        writer's transaction, before the batch is committed: the caller
+        knows the write was received, and a failed commit is reported to
+        `on_failure` instead.
+        """
+        event = self.committed if durable else self.applied
+        if not event.wait(timeout):
+            raise WriteTimeout(f'{self.name} was not written within {timeout}s')
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class WriteQueue:
+    """A single writer thread that applies write intents in group commits.
+
+    Handlers submit intents instead of writing on their own connection,
+    so concurrent writers never contend for SQLite's write lock.  The
+    writer takes the first waiting intent, gathers any others that arrive
+    within `max_delay` (up to `max_batch`) and runs them in one
+    transaction, each inside a savepoint so a failing intent (e.g. a
+    unique-index violation) is rolled back alone.
+    """
+
+    def __init__(self, database=DATABASE, max_batch=WRITE_BATCH_SIZE, max_delay=WRITE_BATCH_DELAY):
+        self.database = database
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Threads do not survive a fork, so each worker process starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, name='write-queue', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def submit(self, fn, *args, on_failure=None):
+        """Queue `fn(conn, *args)` and return its WriteIntent without waiting."""
+        self._ensure_started()
+        intent = WriteIntent(fn, args, on_failure)
+        self._queue.put(intent)
+        return intent
+
+    def write(self, fn, *args, durable=True, timeout=WRITE_TIMEOUT, on_failure=None):
+        """Queue `fn(conn, *args)` and wait for it; returns its result."""
+        return self.submit(fn, *args, on_failure=on_failure).wait(durable=durable, timeout=timeout)
+
+    def _collect(self):
+        """Block for one intent, then gather more until the batch is full or the delay ends."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0
+                             else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _apply(self, conn, batch):
+        conn.execute('BEGIN IMMEDIATE')
+        for intent in batch:
+            conn.execute('SAVEPOINT intent')
+            try:
+                intent.result = intent.fn(conn, *intent.args)
+                conn.execute('RELEASE intent')
+            except Exception as e:
+                conn.execute('ROLLBACK TO intent')
+                conn.execute('RELEASE intent')
+                intent.error = e
+                WRITE_ERRORS.inc(intent=intent.name)
+            intent.applied.set()
+        conn.commit()
+
+    def _run(self):
+        conn = connect(self.database)
+        while True:
+            batch = self._collect()
+            lost = []
+            try:
+                self._apply(conn, batch)
+            except Exception as e:
+                if conn.in_transaction:
+                    conn.rollback()
+                for intent in batch:
+                    if intent.error is None:
+                        if intent.applied.is_set():
+                            # Already reported as received; only the callback can tell
+                            lost.append(intent)
+                        intent.error = e
+                        WRITE_ERRORS.inc(intent=intent.name)
+                    intent.applied.set()
+            WRITE_BATCH_INTENTS.observe(len(batch))
+            now = time.perf_counter()
+            for intent in batch:
+                WRITE_SECONDS.observe(now - intent.submitted, intent=intent.name)
+                intent.committed.set()
+            for intent in lost:
+                if intent.on_failure is not None:
+                    try:
+                        intent.on_failure(intent.error)
+                    except Exception as e:
+                        print(f"Error reporting a failed {intent.name} write: {e}")
+
+
+write_queue = WriteQueue()
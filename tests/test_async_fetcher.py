@@ -0,0 +1,121 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from services.async_fetcher import AsyncFetcher, CircuitBreaker, Provider, merge_results
+
+pytest.importorskip('aiohttp')
+
+LISTINGS = [
+    {'id': 1, 'title': 'Data Intern', 'company': 'Acme'},
+    {'title': 'No id', 'company': 'Acme'},
+    {'title': 'No id either', 'company': 'Acme'},
+]
+
+
+class StubProvider(BaseHTTPRequestHandler):
+    """Answers /<status> with that status; 200 carries LISTINGS."""
+
+    hits = {}
+
+    def do_GET(self):
+        status = int(self.path.split('?')[0].strip('/'))
+        self.hits[status] = self.hits.get(status, 0) + 1
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        if status == 200:
+            self.wfile.write(json.dumps(LISTINGS).encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    StubProvider.hits = {}
+    server = HTTPServer(('127.0.0.1', 0), StubProvider)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fetcher_for(stub_url):
+    fetchers = []
+
+    def build(*statuses, **kwargs):
+        fetcher = AsyncFetcher(
+            [Provider(f'p{status}', f'{stub_url}/{status}') for status in statuses],
+            backoff=0.01, **kwargs
+        )
+        fetchers.append(fetcher)
+        return fetcher
+
+    yield build
+    for fetcher in fetchers:
+        fetcher.close()
+
+
+def test_ids_are_namespaced_and_id_less_listings_dropped(fetcher_for):
+    fetcher = fetcher_for(200)
+    result = fetcher.fetch(5)
+    assert result.complete
+    assert [item['external_id'] for item in result] == ['p200:1']
+
+
+def test_same_id_from_two_providers_is_kept_twice(stub_url):
+    fetcher = AsyncFetcher([Provider('a', f'{stub_url}/200'), Provider('b', f'{stub_url}/200')])
+    try:
+        result = fetcher.fetch(5)
+    finally:
+        fetcher.close()
+    assert sorted(item['external_id'] for item in result) == ['a:1', 'b:1']
+
+
+def test_client_errors_are_not_retried_or_counted(fetcher_for):
+    fetcher = fetcher_for(404, retries=2)
+    result = fetcher.fetch(5)
+    assert not result.complete
+    assert StubProvider.hits == {404: 1}
+    assert fetcher.breakers['p404'].failures == 0
+
+
+def test_server_errors_are_retried_and_open_the_breaker(fetcher_for):
+    fetcher = fetcher_for(500, retries=2, breaker_threshold=3)
+    assert not fetcher.fetch(5).complete
+    assert StubProvider.hits == {500: 3}
+    assert fetcher.breakers['p500'].state == 'open'
+
+    # An open breaker fails fast without calling the provider
+    fetcher.fetch(5)
+    assert StubProvider.hits == {500: 3}
+
+
+def test_half_open_breaker_admits_a_single_probe():
+    now = [0.0]
+    breaker = CircuitBreaker(threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] = 11.0
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+
+    now[0] = 22.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.allow()
+
+
+def test_merge_keys_on_provider_and_id():
+    merged = merge_results([
+        ('a', [{'external_id': 'a:1', 'title': 'first'}, {'external_id': 'a:1', 'title': 'dup'}]),
+        ('b', [{'external_id': 'b:1', 'title': 'other'}]),
+    ])
+    assert [item['title'] for item in merged] == ['first', 'other']
@@ -0,0 +1,86 @@
+import random
+from datetime import date
+
+import pytest
+
+from benchmarks.synthetic import USER_COLUMNS, CatalogModel, generate_internships, generate_users
+from init_db import SAMPLE_COLUMNS
+from services.batch_scoring import BatchScorer
+from services.catalog_snapshot import CatalogSnapshot, write_snapshot
+from services.features import (
+    INTERNSHIP_FEATURE_COLUMNS,
+    USER_FEATURE_COLUMNS,
+    internship_feature_values,
+    user_feature_values,
+)
+from services.recommendation_engine import RecommendationEngine
+
+INTERNSHIPS = 3000
+USERS = 300
+LIMIT = 5
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    """Active synthetic internships as the engine indexes them."""
+    model = CatalogModel(vocabulary_size=2000)
+    today = date.today().isoformat()
+    rows = []
+    for n, values in enumerate(generate_internships(INTERNSHIPS, random.Random(5), model), start=1):
+        row = dict(zip(SAMPLE_COLUMNS, values))
+        row.update(zip(INTERNSHIP_FEATURE_COLUMNS, internship_feature_values(row)))
+        row.update(id=n, is_active=1, updated_at='')
+        if row['deadline_date'] >= today:
+            rows.append(row)
+    return rows
+
+
+@pytest.fixture(scope='module')
+def users():
+    model = CatalogModel(vocabulary_size=2000)
+    result = []
+    for n, values in enumerate(generate_users(USERS, random.Random(9), model), start=1):
+        user = dict(zip(USER_COLUMNS, values))
+        user.update(zip(USER_FEATURE_COLUMNS, user_feature_values(
+            user['skills'], user['interests'], user['education'], user['location']
+        )))
+        user['id'] = n
+        result.append(user)
+    return result
+
+
+@pytest.fixture(scope='module')
+def engine(catalog):
+    engine = RecommendationEngine()
+    for row in catalog:
+        engine.add_internship(row)
+    return engine
+
+
+def assert_same(actual, expected):
+    assert [i['id'] for i, _ in actual] == [i['id'] for i, _ in expected]
+    assert [i['match_reason'] for i, _ in actual] == [i['match_reason'] for i, _ in expected]
+    assert [s for _, s in actual] == pytest.approx([s for _, s in expected])
+
+
+def test_batch_scorer_matches_engine(catalog, users, engine):
+    scorer = BatchScorer(catalog)
+    for user in users:
+        assert_same(scorer.recommend(user, engine, LIMIT),
+                    engine.get_recommendations(user, limit=LIMIT))
+
+
+def test_recommend_many_matches_engine(catalog, users, engine):
+    results = BatchScorer(catalog).recommend_many(users, engine, LIMIT)
+    for user in users:
+        assert_same(results[user['id']], engine.get_recommendations(user, limit=LIMIT))
+
+
+def test_snapshot_matches_engine(tmp_path, catalog, users, engine):
+    path = str(tmp_path / 'catalog.snapshot')
+    assert write_snapshot(path, catalog, 7) == len(catalog)
+    snapshot = CatalogSnapshot(path)
+    assert snapshot.catalog_version == 7
+    for user in users:
+        assert_same(snapshot.recommend(user, engine, LIMIT),
+                    engine.get_recommendations(user, limit=LIMIT))
@@ -0,0 +1,58 @@
+import pytest
+
+from benchmarks.synthetic import populate
+from init_db import MIGRATIONS, check_query_plans, connect, create_schema, migrate
+from services.lifecycle import archive_expired
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = connect(str(tmp_path / 'test.db'))
+    create_schema(conn)
+    yield conn
+    conn.close()
+
+
+def insert_internship(conn, title, **columns):
+    columns = dict(title=title, company='Acme', location='Pune, Maharashtra',
+                   description='d', **columns)
+    conn.execute(
+        f'''INSERT INTO internships ({', '.join(columns)})
+            VALUES ({', '.join('?' for _ in columns)})''',
+        tuple(columns.values())
+    )
+
+
+def test_migrations_run_once_to_the_latest_version(conn):
+    assert migrate(conn) == len(MIGRATIONS)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == len(MIGRATIONS)
+    # A second run has nothing left to apply
+    migrate(conn)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == len(MIGRATIONS)
+
+
+def test_legacy_external_ids_are_namespaced(conn):
+    with conn:
+        insert_internship(conn, 'Synced', is_external=1, external_id='123')
+        insert_internship(conn, 'Imported', external_id='9')
+        insert_internship(conn, 'Local')
+    migrate(conn)
+    ids = dict(conn.execute('SELECT title, external_id FROM internships').fetchall())
+    assert ids == {'Synced': 'rapidapi:123', 'Imported': 'import:partner:9', 'Local': None}
+
+
+def test_hot_queries_use_indexes(conn):
+    migrate(conn)
+    populate(conn, internships=500, users=50, vocabulary_size=200)
+    archive_expired(conn)
+    assert check_query_plans(conn) == {}
+
+
+def test_plan_check_reports_full_scans(conn):
+    migrate(conn)
+    failures = check_query_plans(conn, {
+        'by_description': ('SELECT * FROM internships WHERE description = ?', ('',)),
+        'by_id': ('SELECT * FROM internships WHERE id = ?', (0,)),
+    })
+    assert list(failures) == ['by_description']
+    assert any(detail.startswith('SCAN') for detail in failures['by_description'])
@@ -0,0 +1,92 @@
+import hashlib
+import os
+import tempfile
+import time
+
+ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx'}
+
+# Uploads are read and hashed in fixed-size chunks
+CHUNK_SIZE = 64 * 1024
+MAX_RESUME_SIZE = 5 * 1024 * 1024
+
+# Unreferenced blobs younger than this are kept; their upload may not be committed yet
+GC_GRACE_SECONDS = 3600
+
+
+class FileTooLarge(Exception):
+    """Raised when an upload exceeds the allowed size."""
+
+
+def allowed_file(filename):
+    """Check whether a filename has an allowed extension."""
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def save_file(file, folder, max_size=MAX_RESUME_SIZE):
+    """Store an uploaded file under its SHA-256 digest and return its path.
+
+    The upload is streamed to a temporary file in `folder` chunk by chunk
+    while being hashed, then moved to `folder/<ab>/<digest>.<ext>`.
+    Identical files are stored once.
+    """
+    extension = file.filename.rsplit('.', 1)[1].lower()
+    os.makedirs(folder, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.upload-')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = file.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise FileTooLarge(f'File exceeds {max_size} bytes')
+                digest.update(chunk)
+                out.write(chunk)
+
+        name = digest.hexdigest()
+        shard = os.path.join(folder, name[:2])
+        os.makedirs(shard, exist_ok=True)
+        path = os.path.join(shard, f'{name}.{extension}')
+
+        if os.path.exists(path):
+            # Same content already stored; refresh its age for the collector
+            os.utime(path)
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+        return path
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def collect_unreferenced_blobs(db, folder, grace_seconds=GC_GRACE_SECONDS, dry_run=False):
+    """Delete stored files no application or user references; returns their paths."""
+    referenced = set()
+    for table in ('applications', 'users'):
+        for row in db.execute(f'SELECT DISTINCT resume_path FROM {table} WHERE resume_path IS NOT NULL'):
+            referenced.add(os.path.normpath(row[0]))
+
+    cutoff = time.time() - grace_seconds
+    removed = []
+    for root, _, files in os.walk(folder):
+        for filename in files:
+            path = os.path.join(root, filename)
+            # Only touch content-addressed blobs and abandoned temp files
+            name = filename.split('.', 1)[0]
+            is_blob = len(name) == 64 and os.path.basename(root) == name[:2]
+            if not is_blob and not filename.startswith('.upload-'):
+                continue
+            if os.path.normpath(path) in referenced:
+                continue
+            if os.path.getmtime(path) > cutoff:
+                continue
+            if not dry_run:
+                os.remove(path)
+            removed.append(path)
+    return removed
@@ -0,0 +1,257 @@
+import gzip
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, time as day_time, timezone
+from functools import wraps
+
+from flask import current_app, g, request, session
+
+from init_db import get_db
+from utils.metrics import CACHE_REQUESTS
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# How long the catalog version is trusted before it is read again; within
+# this window conditional requests are answered without touching SQLite
+CATALOG_VERSION_TTL = float(os.environ.get('CATALOG_VERSION_TTL', '1.0'))
+RESPONSE_CACHE_ENTRIES = int(os.environ.get('RESPONSE_CACHE_ENTRIES', '256'))
+RESPONSE_CACHE_BYTES = int(os.environ.get('RESPONSE_CACHE_BYTES', str(64 * 1024 * 1024)))
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Response headers kept with a cached body
+CACHED_HEADERS = ('X-Next-Cursor', 'Link')
+
+
+class CatalogState:
+    """The catalog version and its modification time, re-read at most every `ttl` seconds."""
+
+    def __init__(self, ttl=CATALOG_VERSION_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._value = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, db_getter=get_db):
+        now = self.clock()
+        with self._lock:
+            if self._value is not None and now - self._checked < self.ttl:
+                return self._value
+
+        row = db_getter().execute(
+            'SELECT version, updated_at FROM catalog_version WHERE id = 1'
+        ).fetchone()
+        if row is None:
+            value = (0, None)
+        else:
+            # CURRENT_TIMESTAMP is UTC with second precision
+            modified = None
+            if row['updated_at']:
+                modified = datetime.strptime(row['updated_at'], '%Y-%m-%d %H:%M:%S').replace(
+                    tzinfo=timezone.utc
+                )
+            value = (row['version'], modified)
+
+        with self._lock:
+            self._value = value
+            self._checked = now
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+
+
+class CachedBody:
+    """A serialized response body plus its compressed variants."""
+
+    def __init__(self, body, mimetype, headers):
+        self.body = body
+        self.mimetype = mimetype
+        self.headers = headers
+        self.variants = {'identity': body}
+        self.lock = threading.Lock()
+
+    @property
+    def size(self):
+        return sum(len(v) for v in self.variants.values())
+
+    def variant(self, encoding):
+        """Return the body in `encoding`, compressing it on first use."""
+        with self.lock:
+            data = self.variants.get(encoding)
+            if data is None:
+                if encoding == 'br':
+                    data = brotli.compress(self.body, quality=BROTLI_QUALITY)
+                else:
+                    data = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+                self.variants[encoding] = data
+            return data
+
+
+class ResponseCache:
+    """LRU of CachedBody objects bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_ENTRIES, max_bytes=RESPONSE_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def grew(self):
+        """Re-check the size limits after a variant was added."""
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        total = sum(e.size for e in self._entries.values())
+        while self._entries and (len(self._entries) > self.max_entries or total > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            total -= evicted.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+catalog_state = CatalogState()
+response_cache = ResponseCache()
+
+
+def _choose_encoding(body_size):
+    if body_size < MIN_COMPRESS_SIZE:
+        return 'identity'
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return 'identity'
+
+
+def _representation_etag(etag, encoding):
+    # Strong ETags must differ between encodings of the same resource
+    return etag if encoding == 'identity' else f'{etag}-{encoding}'
+
+
+def _finish(response, etag, last_modified, encoding):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Accept-Encoding')
+    response.vary.add('Authorization')
+    response.vary.add('Cookie')
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def _not_modified(etag, last_modified):
+    """Return a 304 if the client already holds the current representation."""
+    conditional = request.if_none_match
+    if conditional:
+        for encoding in ('identity', 'gzip', 'br'):
+            candidate = _representation_etag(etag, encoding)
+            if conditional.contains(candidate):
+                return _finish(current_app.response_class(status=304), candidate, last_modified, 'identity')
+        return None
+    since = request.if_modified_since
+    if since and last_modified and last_modified <= since:
+        return _finish(current_app.response_class(status=304), etag, last_modified, 'identity')
+    return None
+
+
+def catalog_cached(vary=None):
+    """Cache a catalog view's body per catalog version and query string.
+
+    Conditional requests (If-None-Match / If-Modified-Since) for the
+    current version and day get a 304 without running the view.  `vary` returns
+    anything else the body depends on, e.g. the logged-in user.  Views
+    can set `g.skip_response_cache` to keep a response out of the cache.
+    Requests with pending flash messages bypass the cache entirely, since
+    the page renders (and consumes) them.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if session.get('_flashes'):
+                CACHE_REQUESTS.inc(cache='responses', result='bypass')
+                return view(*args, **kwargs)
+
+            version, last_modified = catalog_state.get()
+            # Listings filter on deadline_date >= today, so a body is only
+            # valid for the day it was rendered, whatever the version
+            today = date.today()
+            day_started = datetime.combine(today, day_time.min).astimezone(timezone.utc)
+            if last_modified is None or last_modified < day_started:
+                last_modified = day_started
+            key = (
+                request.endpoint,
+                version,
+                today.isoformat(),
+                tuple(sorted(request.args.items(multi=True))),
+                vary() if vary else None,
+            )
+            # Derived from the key alone so every worker process agrees on it
+            etag = 'v{}-{}'.format(version, hashlib.sha1(repr(key).encode()).hexdigest()[:16])
+
+            response = _not_modified(etag, last_modified)
+            if response is not None:
+                CACHE_REQUESTS.inc(cache='responses', result='not_modified')
+                return response
+
+            entry = response_cache.get(key)
+            if entry is not None:
+                CACHE_REQUESTS.inc(cache='responses', result='hit')
+                encoding = _choose_encoding(len(entry.body))
+                body = entry.variant(encoding)
+                if encoding != 'identity':
+                    response_cache.grew()
+                response = current_app.response_class(body, mimetype=entry.mimetype)
+                for name, value in entry.headers:
+                    response.headers[name] = value
+                return _finish(response, _representation_etag(etag, encoding), last_modified, encoding)
+
+            CACHE_REQUESTS.inc(cache='responses', result='miss')
+            response = current_app.make_response(view(*args, **kwargs))
+            if (response.status_code != 200 or response.is_streamed
+                    or g.pop('skip_response_cache', False)):
+                return response
+
+            entry = CachedBody(
+                response.get_data(),
+                response.mimetype,
+                [(name, response.headers[name]) for name in CACHED_HEADERS if name in response.headers],
+            )
+            response_cache.put(key, entry)
+            encoding = _choose_encoding(len(entry.body))
+            if encoding != 'identity':
+                response.set_data(entry.variant(encoding))
+                response_cache.grew()
+            return _finish(response, _representation_etag(etag, encoding), last_modified, encoding)
+
+        return wrapper
+    return decorator
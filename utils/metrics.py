@@ -0,0 +1,291 @@
+import bisect
+import hmac
+import ipaddress
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from flask import abort, g, has_request_context, request
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+# Opt-in Server-Timing response header with total and database time
+TIMING_HEADERS = os.environ.get('METRICS_TIMING_HEADERS', '0') == '1'
+# /metrics is served to these addresses/networks, or to any client sending
+# `Authorization: Bearer <METRICS_TOKEN>`
+METRICS_ALLOW = tuple(
+    ipaddress.ip_network(entry.strip(), strict=False)
+    for entry in os.environ.get('METRICS_ALLOW', '127.0.0.1,::1').split(',') if entry.strip()
+)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' '))
+        for k, v in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, '') for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {value}'
+                for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(n, '') for n in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        with self._lock:
+            items = [(key, (list(s[0]), s[1], s[2])) for key, s in self._values.items()]
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [('le', bound)])
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {total}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class CallbackGauge:
+    """Gauge whose samples come from a callback returning {labels: value}."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames, callback):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def render(self):
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {value}'
+                for key, value in self.callback().items()]
+
+
+class Registry:
+    """Holds every metric and renders the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, labelnames, callback):
+        return self._register(CallbackGauge(name, documentation, labelnames, callback))
+
+    def render(self):
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            try:
+                samples = metric.render()
+            except Exception as e:
+                print(f"Error collecting metric {metric.name}: {e}")
+                continue
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.histogram(
+    'http_request_duration_seconds', 'Request latency by route',
+    ('route', 'method', 'status'),
+)
+QUERY_SECONDS = registry.histogram(
+    'sqlite_query_duration_seconds', 'SQLite statement latency by normalized SQL and handler',
+    ('handler', 'sql'),
+)
+RECOMMENDATION_SECONDS = registry.histogram(
+    'recommendation_duration_seconds', 'Time spent computing recommendations',
+    ('mode',),
+)
+EXTERNAL_FETCH_SECONDS = registry.histogram(
+    'external_fetch_duration_seconds', 'External provider request latency',
+    ('provider',),
+)
+EXTERNAL_FETCH_ERRORS = registry.counter(
+    'external_fetch_errors_total', 'Failed external provider requests',
+    ('provider', 'error'),
+)
+CACHE_REQUESTS = registry.counter(
+    'cache_requests_total', 'Cache lookups by cache and result (hit, stale, miss)',
+    ('cache', 'result'),
+)
+
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+
+
+# (url_rule, start time) of the request being served in this context, kept
+# by init_app's hooks so per-statement timing avoids Flask's context proxies
+_current_request = ContextVar('metrics_request', default=None)
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql):
+    """Collapse whitespace and replace literals so similar statements group together."""
+    sql = ' '.join(sql.split())
+    sql = _LITERAL_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('(?, ...)', sql)
+    return sql[:200]
+
+
+def record_query(sql, seconds):
+    current = _current_request.get()
+    if current is None:
+        handler = threading.current_thread().name
+    else:
+        handler = current[0].endpoint if current[0] else 'unmatched'
+    QUERY_SECONDS.observe(seconds, handler=handler, sql=normalize_sql(sql))
+    if TIMING_HEADERS and has_request_context():
+        g.db_seconds = g.get('db_seconds', 0.0) + seconds
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """sqlite3 connection that times every execute/executemany call."""
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            record_query(sql, time.perf_counter() - started)
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            record_query(sql, time.perf_counter() - started)
+
+
+def connection_factory():
+    """Connection class for init_db.connect()."""
+    return InstrumentedConnection if METRICS_ENABLED else sqlite3.Connection
+
+
+def _scrape_allowed():
+    if METRICS_TOKEN:
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() == 'bearer' and hmac.compare_digest(token.strip(), METRICS_TOKEN):
+            return True
+    try:
+        address = ipaddress.ip_address(request.remote_addr or '')
+    except ValueError:
+        return False
+    return any(address in network for network in METRICS_ALLOW)
+
+
+def init_app(app):
+    """Time every request and expose /metrics."""
+    if not METRICS_ENABLED:
+        return
+
+    @app.before_request
+    def _start_timer():
+        rule = request.url_rule
+        _current_request.set((rule, time.perf_counter()))
+
+    @app.after_request
+    def _record_request(response):
+        current = _current_request.get()
+        if current is None:
+            return response
+        _current_request.set(None)
+        rule, started = current
+        elapsed = time.perf_counter() - started
+        route = rule.rule if rule else 'unmatched'
+        REQUEST_SECONDS.observe(
+            elapsed, route=route, method=request.method, status=response.status_code
+        )
+        if TIMING_HEADERS:
+            response.headers['Server-Timing'] = 'app;dur={:.2f}, db;dur={:.2f}'.format(
+                elapsed * 1000, g.get('db_seconds', 0.0) * 1000
+            )
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        # Not advertised to clients that may not scrape it
+        if not _scrape_allowed():
+            abort(404)
+        return registry.render(), 200, {'Content-Type': 'text/plain; version=0.0.4'}